@@ -0,0 +1,71 @@
+# file: benchmarks/bench_columnar.py
+#
+# Membandingkan daftar objek MobSpawnedEvent/ChestEvent dengan buffer kolom SpawnColumns:
+# memori yang tertahan per spawn dan waktu query "semua peti GOLD dalam 60 detik terakhir".
+#
+#   python -m benchmarks.bench_columnar sesi_dungeon.pcapng
+#   python -m benchmarks.bench_columnar --synthetic 200000
+
+import argparse
+import sys
+import time
+
+from benchmarks.bench_event_memory import load_bodies, retained_bytes, synthetic_bodies
+from scanner import ChestEvent, MobSpawnedEvent, PhotonParser
+from scanner.columnar import SpawnColumns
+
+
+def best_of(repeat: int, func) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Benchmark daftar event vs buffer kolom SpawnColumns.")
+    arg_parser.add_argument("files", nargs="*", help="Sesi rekaman .pcap/.pcapng/.albcap")
+    arg_parser.add_argument("--synthetic", type=int, default=200000, help="Jumlah pesan sintetis jika tanpa file")
+    arg_parser.add_argument("--database", default="database.json")
+    arg_parser.add_argument("--quality", default="GOLD")
+    arg_parser.add_argument("--window", type=float, default=60.0, help="Jendela query dalam detik")
+    args = arg_parser.parse_args(argv)
+
+    bodies = load_bodies(args.files) if args.files else synthetic_bodies(args.synthetic, args.database)
+    batch = [(body, ts) for ts, body in bodies]
+    parser = PhotonParser(database_path=args.database)
+    spawn_types = (MobSpawnedEvent, ChestEvent)
+    event_bytes, events = retained_bytes(
+        lambda: [e for e in parser.parse_messages(batch) if type(e) in spawn_types and getattr(e, "opener_id", None) is None])
+    columns = SpawnColumns()
+    column_parser = PhotonParser(database_path=args.database, columns=columns)
+    column_parser.parse_messages(batch) # Menghangatkan TypeTable agar tidak ikut terukur
+    columns.clear()
+    column_bytes, _ = retained_bytes(lambda: column_parser.parse_messages(batch) and None)
+    if not events:
+        print("[!] Tidak ada spawn mob/peti di sesi ini.")
+        return 1
+
+    now = max(ts for ts, _body in bodies)
+    since = now - args.window
+
+    def query_objects():
+        return [e for e in events if type(e) is ChestEvent and e.chest_quality == args.quality
+                and e.capture_timestamp is not None and e.capture_timestamp >= since]
+
+    def query_columns():
+        return columns.chests(quality=args.quality, last_seconds=args.window, now=now)
+
+    found = len(query_objects())
+    assert found == len(query_columns()["entity_id"]), "Hasil query berbeda"
+    count = len(events)
+    print(f"[*] {count} spawn, {found} peti {args.quality} dalam {args.window:.0f} s terakhir")
+    print(f"[*] Daftar objek event : {event_bytes / count:8.1f} byte/spawn, query {best_of(5, query_objects) * 1e3:8.2f} ms")
+    print(f"[*] SpawnColumns       : {column_bytes / count:8.1f} byte/spawn, query {best_of(5, query_columns) * 1e3:8.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
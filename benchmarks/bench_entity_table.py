@@ -0,0 +1,88 @@
+# file: benchmarks/bench_entity_table.py
+#
+# Lookup entitas per spawn: database.json sebagai dict of dict (rantai dict.get, keanggotaan list,
+# startswith) dibandingkan EntityTable terkompilasi (satu lookup dict + tes bit). Juga mengukur
+# memori yang ditahan kedua bentuk database.
+#
+#   python -m benchmarks.bench_entity_table --lookups 500000
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from benchmarks.bench_event_memory import retained_bytes
+from scanner.entity_table import FLAG_CHEST, FLAG_MOB, EntityTable
+
+
+def legacy_classify(database, type_id_key):
+    """Salinan logika lama _handle_new_character/_handle_new_object untuk satu TypeIDKey."""
+    entity_details = database.get(str(type_id_key))
+    name, category, faction, tier, quality = "Unknown Entity", "UNKNOWN", "UNKNOWN", "0", None
+    if entity_details:
+        name = entity_details.get('name_en', type_id_key)
+        category = entity_details.get('category', "UNKNOWN")
+        faction = entity_details.get('faction', "UNKNOWN")
+        tier = entity_details.get('tier', "0")
+        quality = entity_details.get('quality')
+    if category in ["MOB", "BOSS", "MINIBOSS", "CHAMPION_MOB"]:
+        return 1, name, category, faction, tier
+    if category and category.startswith("CHEST_"):
+        return 2, name, category, quality
+    return 0
+
+
+def compiled_classify(table, type_id_key):
+    """Bentuk yang sama dengan handler PhotonParser: satu lookup dict, unpack, tes bit."""
+    record = table.records.get(type_id_key)
+    if record is None:
+        return 0
+    category, quality, tier, name, faction, flags = record
+    if flags & FLAG_MOB:
+        strings = table.strings
+        return 1, strings[name], table.categories[category], strings[faction], str(tier)
+    if flags & FLAG_CHEST:
+        return 2, table.strings[name], table.categories[category], table.qualities[quality]
+    return 0
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Benchmark lookup database entitas: dict of dict vs EntityTable.")
+    arg_parser.add_argument("--database", default="database.json")
+    arg_parser.add_argument("--lookups", type=int, default=500000)
+    arg_parser.add_argument("--miss-ratio", type=float, default=0.3,
+                            help="Porsi TypeIDKey yang tidak ada di database (pemain, NPC kota, dsb.)")
+    arg_parser.add_argument("--seed", type=int, default=1)
+    args = arg_parser.parse_args(argv)
+
+    with open(args.database, "r", encoding="utf-8") as f:
+        raw = f.read()
+    dict_bytes, database = retained_bytes(lambda: json.loads(raw))
+    table_bytes, table = retained_bytes(lambda: EntityTable(json.loads(raw)))
+    rng = random.Random(args.seed)
+    keys = list(database)
+    lookups = [rng.choice(keys) if rng.random() >= args.miss_ratio else f"PLAYER_{rng.randrange(100)}"
+               for _ in range(args.lookups)]
+    assert all(legacy_classify(database, key) == compiled_classify(table, key) for key in lookups[:20000])
+
+    def timed(func, source):
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            for key in lookups:
+                func(source, key)
+            best = min(best, time.perf_counter() - start)
+        return best / len(lookups) * 1e9
+
+    legacy_ns = timed(legacy_classify, database)
+    compiled_ns = timed(compiled_classify, table)
+    print(f"[*] {len(database)} entri, {len(lookups)} lookup ({args.miss_ratio:.0%} tidak ada di database)")
+    print(f"[*] Dict of dict  : {legacy_ns:7.1f} ns/lookup, {dict_bytes / 1024:8.1f} KiB")
+    print(f"[*] EntityTable   : {compiled_ns:7.1f} ns/lookup, {table_bytes / 1024:8.1f} KiB "
+          f"(x{legacy_ns / compiled_ns:.1f} lebih cepat)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+# file: benchmarks/bench_event_memory.py
+#
+# Mengukur memori per GameEvent yang disimpan: kelas event lama (dataclass biasa dengan __dict__,
+# raw_parameters selalu berisi dict parameter lengkap) dibandingkan event slotted/frozen tanpa
+# raw_parameters, dan dengan raw_parameters_ratio=1.0 (mode debug) sebagai pembanding.
+# Sumber pesan: sesi rekaman (.pcap/.pcapng/.albcap); tanpa file, dipakai sesi sintetis.
+#
+#   python -m benchmarks.bench_event_memory sesi_dungeon.pcapng sesi.albcap
+#   python -m benchmarks.bench_event_memory --synthetic 50000
+
+import argparse
+import gc
+import json
+import struct
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Optional, Tuple
+
+from scanner import ALBION_EVENT_CODES, ChestEvent, EntityDeathEvent, MobSpawnedEvent, PhotonParser, UnknownEvent
+from scanner.protocol16 import decode_parameter_table
+
+
+# --- Salinan kelas event lama (sebelum slots/frozen) ---
+
+@dataclass
+class LegacyGameEvent:
+    timestamp: float = field(default_factory=time.time, kw_only=True)
+    raw_event_code: Optional[int] = field(default=None, kw_only=True)
+    raw_parameters: Optional[Dict[int, Any]] = field(default=None, kw_only=True)
+    capture_timestamp: Optional[float] = field(default=None, kw_only=True)
+
+@dataclass
+class LegacyUnknownEvent(LegacyGameEvent):
+    event_code: int
+    parameters: Dict[int, Any]
+
+@dataclass
+class LegacyMobSpawnedEvent(LegacyGameEvent):
+    entity_id: int
+    type_id: str
+    name: str
+    position: Tuple[float, float]
+    max_health: Optional[float] = None
+    current_health: Optional[float] = None
+    category: Optional[str] = None
+    faction: Optional[str] = None
+    tier: Optional[str] = None
+
+@dataclass
+class LegacyEntityDeathEvent(LegacyGameEvent):
+    victim_id: int
+    victim_name: Optional[str] = None
+    victim_category: Optional[str] = None
+    killer_id: Optional[int] = None
+    killer_name: Optional[str] = None
+
+@dataclass
+class LegacyChestEvent(LegacyGameEvent):
+    chest_id: int
+    chest_type_id: str
+    chest_name: str
+    chest_quality: Optional[str] = None
+    chest_category: Optional[str] = None
+    position: Optional[Tuple[float, float]] = None
+    opener_id: Optional[int] = None
+
+
+_LEGACY_CLASSES = {
+    UnknownEvent: LegacyUnknownEvent,
+    MobSpawnedEvent: LegacyMobSpawnedEvent,
+    EntityDeathEvent: LegacyEntityDeathEvent,
+    ChestEvent: LegacyChestEvent,
+}
+
+
+# --- Sumber pesan ---
+
+def load_bodies(paths: List[str]) -> List[Tuple[float, bytes]]:
+    """Body pesan Photon (setelah reassembly dan de-duplikasi) dari file pcap/pcapng/albcap."""
+    from network_scanner.archive import RECORD_PHOTON, ArchiveReader
+    from network_scanner.decap import udp_datagram
+    from network_scanner.fragments import FragmentReassembler
+    from network_scanner.pcap import PcapReader
+    from network_scanner.sequence import ReliableSequenceTracker
+    from network_scanner.sniffer import iter_photon_messages
+
+    reassembler = FragmentReassembler()
+    sequences = ReliableSequenceTracker()
+    bodies = []
+
+    def add(ts, peer, payload):
+        for _cmd_type, body in iter_photon_messages(payload, reassembler, peer, sequences):
+            bodies.append((ts, bytes(body)))
+
+    for path in paths:
+        if path.endswith(".albcap"):
+            with ArchiveReader(path) as reader:
+                for record in reader.records():
+                    if record.kind == RECORD_PHOTON:
+                        add(record.ts, record.peer, record.data)
+        else:
+            with PcapReader(path) as reader:
+                for ts, linktype, frame in reader:
+                    datagram = udp_datagram(frame, linktype)
+                    if datagram is not None and 5056 in (datagram.src_port, datagram.dst_port):
+                        add(ts, (datagram.src, datagram.src_port), datagram.payload)
+    return bodies
+
+
+def _string(value: str) -> bytes:
+    data = value.encode()
+    return struct.pack(">H", len(data)) + data
+
+
+def _event(code: int, params: List[bytes]) -> bytes:
+    return bytes([4, code]) + struct.pack(">H", len(params)) + b"".join(params)
+
+
+def synthetic_bodies(count: int, database_path: str) -> List[Tuple[float, bytes]]:
+    """Campuran NewCharacter (dengan equipment/buff), NewObject peti, CharacterDeath dan ChestOpened."""
+    try:
+        with open(database_path, "r", encoding="utf-8") as f:
+            database = json.load(f)
+    except (OSError, ValueError):
+        database = {}
+    mobs = [key for key, entry in database.items() if entry.get("category") in ("MOB", "BOSS", "MINIBOSS")] or ["T4_MOB"]
+    chests = [key for key, entry in database.items() if str(entry.get("category", "")).startswith("CHEST_")] or ["CHEST"]
+
+    bodies = []
+    ts = 1700000000.0
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            body = _event(ALBION_EVENT_CODES["NewCharacter"], [
+                bytes([0, 105]) + struct.pack(">i", i),
+                bytes([1, 115]) + _string(mobs[i % len(mobs)]),
+                bytes([2, 115]) + _string("Mob"),
+                bytes([7, 102]) + struct.pack(">f", i * 0.5),
+                bytes([9, 102]) + struct.pack(">f", -i * 0.5),
+                bytes([15, 121]) + struct.pack(">HBff", 2, 102, 1200.0, 1500.0),
+                bytes([20, 110]) + struct.pack(">i", 10) + struct.pack(">10i", *range(10)),
+                bytes([22, 97]) + struct.pack(">H", 4) + b"".join(_string(f"BUFF_{n}") for n in range(4)),
+            ])
+        elif kind == 1:
+            body = _event(ALBION_EVENT_CODES["NewObject"], [
+                bytes([0, 105]) + struct.pack(">i", i),
+                bytes([1, 115]) + _string(chests[i % len(chests)]),
+                bytes([2, 121]) + struct.pack(">HBff", 2, 102, i * 0.25, i * 0.75),
+            ])
+        elif kind == 2:
+            body = _event(ALBION_EVENT_CODES["CharacterDeath"], [
+                bytes([0, 105]) + struct.pack(">i", i - 2),
+                bytes([1, 105]) + struct.pack(">i", 1),
+                bytes([5, 115]) + _string("Pemain"),
+            ])
+        else:
+            body = _event(ALBION_EVENT_CODES["ChestOpened"], [
+                bytes([0, 105]) + struct.pack(">i", i - 2),
+                bytes([1, 105]) + struct.pack(">i", 1),
+                bytes([2, 115]) + _string(chests[i % len(chests)]),
+            ])
+        bodies.append((ts + i * 0.01, body))
+    return bodies
+
+
+# --- Pengukuran ---
+
+def to_legacy(event, body: bytes):
+    """Event lama: kelas dengan __dict__ dan raw_parameters berisi dict hasil decode penuh."""
+    values = {f.name: getattr(event, f.name) for f in fields(event)}
+    values["raw_parameters"] = decode_parameter_table(body, 2)[0]
+    return _LEGACY_CLASSES[type(event)](**values)
+
+
+def retained_bytes(build) -> Tuple[int, list]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    retained = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, retained
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Benchmark memori per GameEvent: kelas lama vs slotted/frozen.")
+    arg_parser.add_argument("files", nargs="*", help="Sesi rekaman .pcap/.pcapng/.albcap")
+    arg_parser.add_argument("--synthetic", type=int, default=40000, help="Jumlah pesan sintetis jika tanpa file")
+    arg_parser.add_argument("--database", default="database.json")
+    args = arg_parser.parse_args(argv)
+
+    bodies = load_bodies(args.files) if args.files else synthetic_bodies(args.synthetic, args.database)
+    parser = PhotonParser(database_path=args.database)
+    debug_parser = PhotonParser(database_path=args.database, raw_parameters_ratio=1.0)
+    pairs = [(event, body) for ts, body in bodies
+             for event in parser.parse_messages([(body, ts)])]
+    if not pairs:
+        print("[!] Tidak ada GameEvent yang dihasilkan dari sesi ini.")
+        return 1
+    source = f"{len(args.files)} file" if args.files else "sesi sintetis"
+    print(f"[*] {len(bodies)} pesan dari {source}, {len(pairs)} GameEvent disimpan")
+
+    legacy_bytes, _ = retained_bytes(lambda: [to_legacy(event, body) for event, body in pairs])
+    new_bytes, _ = retained_bytes(lambda: parser.parse_messages([(body, ts) for ts, body in bodies]))
+    debug_bytes, _ = retained_bytes(lambda: debug_parser.parse_messages([(body, ts) for ts, body in bodies]))
+    count = len(pairs)
+    print(f"[*] Kelas lama (__dict__, raw_parameters selalu) : {legacy_bytes / count:8.1f} byte/event")
+    print(f"[*] Slotted + frozen, tanpa raw_parameters      : {new_bytes / count:8.1f} byte/event "
+          f"(x{legacy_bytes / max(new_bytes, 1):.1f} lebih kecil)")
+    print(f"[*] Slotted + frozen, raw_parameters_ratio=1.0  : {debug_bytes / count:8.1f} byte/event")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
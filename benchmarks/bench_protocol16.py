@@ -0,0 +1,335 @@
+# file: benchmarks/bench_protocol16.py
+#
+# Micro-benchmark codec Protocol16 bersama (scanner.protocol16) terhadap dua decoder lama yang
+# digantikannya: parse_photon_parameters versi lama di sniffer.py (big-endian, rantai if/elif)
+# dan PhotonParser._deserialize_photon_value di atas BinaryStream io.BytesIO (little-endian).
+# Salinan kedua decoder lama disimpan di bawah ini apa adanya agar tetap bisa dibandingkan.
+#
+#   python -m benchmarks.bench_protocol16 [--tables 20000] [--repeat 5]
+
+import argparse
+import binascii
+import io
+import struct
+import sys
+import time
+
+import scanner.protocol16 as protocol16
+from scanner.protocol16 import decode_lazy_parameter_table, decode_parameter_table
+
+# --- Salinan decoder lama: sniffer.parse_photon_parameters ---
+
+_LEGACY_NULL, _LEGACY_STRING, _LEGACY_BYTE, _LEGACY_SHORT = 0x2a, 0x73, 0x62, 0x6b
+_LEGACY_INTEGER, _LEGACY_LONG, _LEGACY_BOOLEAN, _LEGACY_BYTE_ARRAY = 0x69, 0x6c, 0x6f, 0x78
+
+
+def legacy_sniffer_parameters(payload: bytes, offset: int) -> tuple:
+    params = {}
+    current_offset = offset
+    try:
+        param_count = struct.unpack(">H", payload[current_offset : current_offset + 2])[0]
+        current_offset += 2
+        for _ in range(param_count):
+            if current_offset + 1 >= len(payload): break
+            param_code = payload[current_offset]
+            param_type = payload[current_offset + 1]
+            current_offset += 2
+            value = None
+
+            if param_type == _LEGACY_STRING:
+                if current_offset + 2 > len(payload): break
+                str_len = struct.unpack(">H", payload[current_offset : current_offset + 2])[0]
+                current_offset += 2
+                if current_offset + str_len > len(payload): break
+                value = str(payload[current_offset : current_offset + str_len], "utf-8", errors="replace")
+                current_offset += str_len
+            elif param_type == _LEGACY_BYTE:
+                if current_offset >= len(payload): break
+                value = payload[current_offset]
+                current_offset += 1
+            elif param_type == _LEGACY_SHORT:
+                if current_offset + 2 > len(payload): break
+                value = struct.unpack(">h", payload[current_offset : current_offset + 2])[0]
+                current_offset += 2
+            elif param_type == _LEGACY_INTEGER:
+                if current_offset + 4 > len(payload): break
+                value = struct.unpack(">i", payload[current_offset : current_offset + 4])[0]
+                current_offset += 4
+            elif param_type == _LEGACY_LONG:
+                if current_offset + 8 > len(payload): break
+                value = struct.unpack(">q", payload[current_offset : current_offset + 8])[0]
+                current_offset += 8
+            elif param_type == _LEGACY_BOOLEAN:
+                if current_offset >= len(payload): break
+                value = payload[current_offset] != 0
+                current_offset += 1
+            elif param_type == _LEGACY_NULL:
+                value = None
+            elif param_type == _LEGACY_BYTE_ARRAY:
+                if current_offset + 4 > len(payload): break
+                array_len = struct.unpack(">i", payload[current_offset : current_offset + 4])[0]
+                current_offset += 4
+                if current_offset + array_len > len(payload): break
+                byte_val = bytes(payload[current_offset : current_offset + array_len])
+                try:
+                    decoded_str = byte_val.decode('utf-8', errors='ignore')
+                    if all(32 <= ord(char) <= 126 for char in decoded_str.strip()) and len(decoded_str.strip()) > 0 :
+                        value = decoded_str.strip()
+                    else:
+                         value = f"hex:{binascii.hexlify(byte_val).decode()}"
+                except:
+                    value = f"hex:{binascii.hexlify(byte_val).decode()}"
+                current_offset += array_len
+            else:
+                break
+
+            params[param_code] = value
+    except Exception:
+        pass
+    return params, current_offset
+
+
+# --- Salinan decoder lama: PhotonParser di atas BinaryStream (io.BytesIO, little-endian) ---
+
+class _LegacyBinaryStream:
+    def __init__(self, base_stream_bytes: bytes):
+        self._stream = io.BytesIO(base_stream_bytes)
+
+    def read_byte(self) -> int:
+        return struct.unpack('<B', self._stream.read(1))[0]
+
+    def read_bool(self) -> bool:
+        return self.read_byte() != 0
+
+    def read_short(self) -> int:
+        return struct.unpack('<h', self._stream.read(2))[0]
+
+    def read_unsigned_short(self) -> int:
+        return struct.unpack('<H', self._stream.read(2))[0]
+
+    def read_int(self) -> int:
+        return struct.unpack('<i', self._stream.read(4))[0]
+
+    def read_long(self) -> int:
+        return struct.unpack('<q', self._stream.read(8))[0]
+
+    def read_float(self) -> float:
+        return struct.unpack('<f', self._stream.read(4))[0]
+
+    def read_double(self) -> float:
+        return struct.unpack('<d', self._stream.read(8))[0]
+
+    def read_string(self, encoding='utf-8') -> str:
+        length = self.read_unsigned_short()
+        if length == 0:
+            return ""
+        if length > 8192:
+            raise ValueError(f"Panjang string terlalu besar: {length}")
+        return self._stream.read(length).decode(encoding)
+
+    def read_bytes(self, length: int) -> bytes:
+        return self._stream.read(length)
+
+    def tell(self) -> int:
+        return self._stream.tell()
+
+
+def _legacy_parameter_table(stream):
+    param_count = stream.read_short()
+    parameters = {}
+    for _ in range(param_count):
+        key = stream.read_byte()
+        value = _legacy_photon_value(stream)
+        parameters[key] = value
+    return parameters
+
+
+def _legacy_photon_value(stream):
+    type_code = stream.read_byte()
+    if type_code == 0: return None
+    elif type_code == 42: return _legacy_parameter_table(stream)
+    elif type_code == 68: return stream.read_double()
+    elif type_code == 97:
+        size = stream.read_int()
+        return stream.read_bytes(size)
+    elif type_code == 98: return stream.read_byte()
+    elif type_code == 100: return stream.read_double()
+    elif type_code == 102: return stream.read_float()
+    elif type_code == 104: return _legacy_parameter_table(stream)
+    elif type_code == 105: return stream.read_int()
+    elif type_code == 107: return stream.read_short()
+    elif type_code == 108: return stream.read_long()
+    elif type_code == 110:
+        size = stream.read_int()
+        return [stream.read_int() for _ in range(size)]
+    elif type_code == 111: return stream.read_bool()
+    elif type_code == 115: return stream.read_string()
+    elif type_code == 118:
+        size = stream.read_short()
+        return [_legacy_photon_value(stream) for _ in range(size)]
+    elif type_code == 120:
+        size = stream.read_int()
+        return [stream.read_long() for _ in range(size)]
+    elif type_code == 121:
+        size = stream.read_short()
+        return [stream.read_string() for _ in range(size)]
+    raise ValueError(f"Tipe data Photon tidak dikenal: {type_code} at stream pos {stream.tell()-1}")
+
+
+def legacy_parser_parameters(body: bytes):
+    return _legacy_parameter_table(_LegacyBinaryStream(body))
+
+
+# --- Beban kerja ---
+
+def _scalar_table(endian: str, entity_id: int) -> bytes:
+    """Tabel mirip NewCharacter yang hanya memakai tipe skalar yang dikenal ketiga decoder."""
+    name = f"T{4 + entity_id % 5}_MOB_UNDEAD_SKELETON".encode()
+    fields = [
+        (0, 105, struct.pack(endian + "i", entity_id)),
+        (1, 115, struct.pack(endian + "H", len(name)) + name),
+        (2, 107, struct.pack(endian + "h", entity_id % 300)),
+        (3, 108, struct.pack(endian + "q", entity_id * 1000003)),
+        (4, 98, bytes([entity_id % 256])),
+        (5, 111, b"\x01"),
+        (6, 105, struct.pack(endian + "i", -entity_id)),
+        (7, 115, struct.pack(endian + "H", 6) + b"@MOB_1"),
+        (8, 107, struct.pack(endian + "h", 12)),
+        (9, 105, struct.pack(endian + "i", 7)),
+        (10, 108, struct.pack(endian + "q", 1 << 40)),
+        (252, 107, struct.pack(endian + "h", 2)),
+    ]
+    return struct.pack(endian + "h", len(fields)) + b"".join(bytes([key, code]) + value for key, code, value in fields)
+
+
+def _rich_table(entity_id: int) -> bytes:
+    """Tabel big-endian dengan array bertipe, dictionary dan float (hanya codec baru)."""
+    fields = [
+        (0, 105, struct.pack(">i", entity_id)),
+        (1, 115, struct.pack(">H", 6) + b"T6_MOB"),
+        (8, 121, struct.pack(">HBff", 2, 102, entity_id * 0.5, -entity_id * 0.25)),
+        (15, 121, struct.pack(">HB", 2, 102) + struct.pack(">ff", 1250.0, 1250.0)),
+        (20, 110, struct.pack(">i", 8) + struct.pack(">8i", *range(8))),
+        (21, 68, bytes([115, 105]) + struct.pack(">H", 2) + struct.pack(">H", 1) + b"a" + struct.pack(">i", 1)
+         + struct.pack(">H", 1) + b"b" + struct.pack(">i", 2)),
+        (22, 120, struct.pack(">i", 16) + bytes(range(16))),
+    ]
+    return struct.pack(">H", len(fields)) + b"".join(bytes([key, code]) + value for key, code, value in fields)
+
+
+def _new_character_table(entity_id: int) -> bytes:
+    """NewCharacter berat: selain kunci yang dibaca handler ada array equipment, buff dan tabel bersarang."""
+    name = b"T8_MOB_KEEPER_GIANT_BOSS"
+    def string(value: bytes) -> bytes:
+        return struct.pack(">H", len(value)) + value
+    fields = [
+        (0, 105, struct.pack(">i", entity_id)),
+        (1, 115, string(name)),
+        (2, 115, string(b"Keeper Giant")),
+        (7, 102, struct.pack(">f", 101.5)),
+        (9, 102, struct.pack(">f", -42.25)),
+        (15, 121, struct.pack(">HB", 2, 102) + struct.pack(">ff", 5000.0, 5000.0)),
+        (20, 110, struct.pack(">i", 10) + struct.pack(">10i", *range(3000, 3010))), # equipment
+        (21, 121, struct.pack(">HB", 10, 107) + struct.pack(">10h", *range(10))), # kualitas equipment
+        (22, 97, struct.pack(">H", 6) + b"".join(string(f"BUFF_{i}_PASSIVE".encode()) for i in range(6))),
+        (23, 122, struct.pack(">H", 4) + b"".join(bytes([105]) + struct.pack(">i", i) for i in range(4))),
+        (24, 104, struct.pack(">H", 3) + b"".join(bytes([98, i, 115]) + string(b"spell") for i in range(3))),
+        (25, 120, struct.pack(">i", 64) + bytes(64)),
+        (26, 108, struct.pack(">q", entity_id * 7)),
+        (27, 111, b"\x00"),
+    ]
+    return struct.pack(">H", len(fields)) + b"".join(bytes([key, code]) + value for key, code, value in fields)
+
+
+_HANDLER_KEYS = (0, 1, 2, 7, 9, 15) # Kunci yang dibaca _handle_new_character
+
+
+def eager_handler_access(table: bytes):
+    parameters = decode_parameter_table(table)[0]
+    return [parameters.get(key) for key in _HANDLER_KEYS]
+
+
+def lazy_handler_access(table: bytes):
+    parameters = decode_lazy_parameter_table(table)[0]
+    return [parameters.get(key) for key in _HANDLER_KEYS]
+
+
+def _typed_array_table(size: int) -> bytes:
+    """int[] equipment dan array float bertipe berukuran `size`."""
+    return (struct.pack(">H", 2)
+            + bytes([0, 110]) + struct.pack(">i", size) + struct.pack(f">{size}i", *range(size))
+            + bytes([1, 121]) + struct.pack(">HB", size, 102) + struct.pack(f">{size}f", *range(size)))
+
+
+def bench(fn, items, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Benchmark codec Protocol16 bersama vs decoder lama.")
+    arg_parser.add_argument("--tables", type=int, default=20000, help="Jumlah tabel parameter per putaran")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args(argv)
+
+    big_endian = [_scalar_table(">", i) for i in range(args.tables)]
+    little_endian = [_scalar_table("<", i) for i in range(args.tables)]
+    rich = [_rich_table(i) for i in range(args.tables)]
+
+    # Sanity: ketiga decoder harus sepakat pada tabel skalar
+    expected = decode_parameter_table(big_endian[1])[0]
+    if legacy_sniffer_parameters(big_endian[1], 0)[0] != expected or legacy_parser_parameters(little_endian[1]) != expected:
+        print("[!] Hasil decoder lama berbeda dari codec baru pada tabel skalar.")
+        return 1
+
+    def per_table(seconds):
+        return seconds / args.tables * 1e6
+
+    print(f"[*] {args.tables} tabel parameter ({len(big_endian[0])} byte, 12 parameter), best of {args.repeat}")
+    codec_time = bench(decode_parameter_table, big_endian, args.repeat)
+    sniffer_time = bench(lambda table: legacy_sniffer_parameters(table, 0), big_endian, args.repeat)
+    parser_time = bench(legacy_parser_parameters, little_endian, args.repeat)
+    print(f"[*] Codec Protocol16       : {per_table(codec_time):6.2f} us/tabel")
+    print(f"[*] Sniffer lama (if/elif) : {per_table(sniffer_time):6.2f} us/tabel (x{sniffer_time / codec_time:.1f})")
+    print(f"[*] PhotonParser lama      : {per_table(parser_time):6.2f} us/tabel (x{parser_time / codec_time:.1f})")
+
+    rich_time = bench(decode_parameter_table, rich, args.repeat)
+    print(f"[*] Codec, tabel kaya ({len(rich[0])} byte: array bertipe, dictionary, int[]): "
+          f"{per_table(rich_time):6.2f} us/tabel (tidak didukung decoder lama)")
+
+    heavy = [_new_character_table(i) for i in range(args.tables)]
+    if eager_handler_access(heavy[1]) != lazy_handler_access(heavy[1]):
+        print("[!] Tabel lazy menghasilkan nilai berbeda dari decode penuh.")
+        return 1
+    eager_time = bench(eager_handler_access, heavy, args.repeat)
+    lazy_time = bench(lazy_handler_access, heavy, args.repeat)
+    print(f"[*] NewCharacter berat ({len(heavy[0])} byte, {len(_HANDLER_KEYS)} kunci dibaca handler):")
+    print(f"      decode penuh : {per_table(eager_time):6.2f} us/tabel")
+    print(f"      lazy         : {per_table(lazy_time):6.2f} us/tabel (x{eager_time / lazy_time:.1f})")
+
+    if protocol16.numpy is None:
+        print("[!] numpy tidak terinstal; perbandingan array bertipe struct vs numpy dilewati.")
+        return 0
+    print("[*] Array bertipe besar (int[] + float[]), struct -> list vs numpy.frombuffer -> ndarray:")
+    threshold = protocol16.NUMPY_MIN_ELEMENTS
+    try:
+        for size in (8, 32, 96, 128, 512):
+            tables = [_typed_array_table(size)] * max(1, args.tables // 4)
+            protocol16.NUMPY_MIN_ELEMENTS = 1 << 30
+            struct_time = bench(decode_parameter_table, tables, args.repeat)
+            protocol16.NUMPY_MIN_ELEMENTS = 0
+            numpy_time = bench(decode_parameter_table, tables, args.repeat)
+            print(f"      {size:4d} elemen: struct {struct_time / len(tables) * 1e6:7.2f} us, "
+                  f"numpy {numpy_time / len(tables) * 1e6:7.2f} us (x{struct_time / numpy_time:.1f})")
+    finally:
+        protocol16.NUMPY_MIN_ELEMENTS = threshold
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
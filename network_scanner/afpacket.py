@@ -0,0 +1,158 @@
+# file: network_scanner/afpacket.py
+#
+# Backend capture Linux: socket AF_PACKET dengan ring TPACKET_V3 yang di-mmap.
+# Kernel menulis frame langsung ke ring (per blok), filter BPF dijalankan di kernel, dan
+# userspace membaca satu blok berisi banyak frame sekaligus tanpa callback per paket.
+
+import mmap
+import select
+import socket
+import struct
+from typing import Iterator, List, Optional, Tuple
+
+from .bpf import Instruction, attach_filter, reject_all_filter
+
+# --- Konstanta linux/if_packet.h ---
+SOL_PACKET = 263
+PACKET_RX_RING = 5
+PACKET_STATISTICS = 6
+PACKET_VERSION = 10
+TPACKET_V3 = 2
+ETH_P_ALL = 0x0003
+
+TP_STATUS_KERNEL = 0
+TP_STATUS_USER = 1
+
+_TPACKET_REQ3 = struct.Struct("IIIIIII") # block_size, block_nr, frame_size, frame_nr, retire_blk_tov, sizeof_priv, feature_req_word
+_BLOCK_HEADER = struct.Struct("III") # block_status, num_pkts, offset_to_first_pkt (tpacket_hdr_v1, offset 8)
+_BLOCK_STATUS_OFFSET = 8
+_TPACKET3_HDR = struct.Struct("IIIIIIH") # next_offset, sec, nsec, snaplen, len, status, mac
+_TPACKET_STATS_V3 = struct.Struct("III") # packets, drops, freeze_q_cnt
+
+Batch = List[Tuple[float, memoryview]]
+
+
+def is_supported() -> bool:
+    return hasattr(socket, "AF_PACKET")
+
+
+class AfPacketRing:
+    """
+    Ring RX TPACKET_V3. `read_batch()` mengembalikan semua frame dari satu blok sebagai list
+    (timestamp, memoryview). View tersebut menunjuk langsung ke memori ring dan hanya valid
+    sampai `read_batch()` dipanggil lagi atau `release_batch()`/`close()` dipanggil; setelah itu
+    view di-release sehingga pemakaian yang terlambat menghasilkan error, bukan data basi.
+    """
+    def __init__(self, interface: str, bpf_program: Optional[List[Instruction]] = None,
+                 block_size: int = 1 << 20, block_count: int = 64, frame_size: int = 2048,
+                 block_timeout_ms: int = 10):
+        if not is_supported():
+            raise OSError("AF_PACKET hanya tersedia di Linux.")
+        if block_size % mmap.PAGESIZE:
+            raise ValueError("block_size harus kelipatan ukuran page.")
+        self.interface = interface
+        self.block_size = block_size
+        self.block_count = block_count
+        self._block_index = 0
+        self._pending_block: Optional[int] = None
+        self._pending_views: List[memoryview] = []
+
+        self._sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
+        try:
+            # Pasang filter tolak-semua dulu supaya ring tidak terisi paket sebelum filter asli aktif.
+            attach_filter(self._sock, reject_all_filter())
+            self._sock.setsockopt(SOL_PACKET, PACKET_VERSION, TPACKET_V3)
+            req = _TPACKET_REQ3.pack(block_size, block_count, frame_size,
+                                     (block_size // frame_size) * block_count, block_timeout_ms, 0, 0)
+            self._sock.setsockopt(SOL_PACKET, PACKET_RX_RING, req)
+            self._ring = mmap.mmap(self._sock.fileno(), block_size * block_count,
+                                   mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+            self._view = memoryview(self._ring)
+            self._sock.bind((interface, ETH_P_ALL))
+            if bpf_program is not None:
+                self.set_filter(bpf_program)
+        except Exception:
+            self._sock.close()
+            raise
+        self._poller = select.poll()
+        self._poller.register(self._sock.fileno(), select.POLLIN | select.POLLERR)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def fileno(self) -> int:
+        return self._sock.fileno()
+
+    def set_filter(self, bpf_program: List[Instruction]):
+        """Mengganti filter kernel; bisa dipanggil kapan saja selama capture berjalan."""
+        attach_filter(self._sock, bpf_program)
+
+    def stats(self) -> Tuple[int, int]:
+        """(paket diterima, paket di-drop kernel) sejak pemanggilan terakhir; counter di-reset kernel."""
+        raw = self._sock.getsockopt(SOL_PACKET, PACKET_STATISTICS, _TPACKET_STATS_V3.size)
+        packets, drops, _freeze = _TPACKET_STATS_V3.unpack(raw)
+        return packets, drops
+
+    def _block_ready(self, index: int) -> bool:
+        status = struct.unpack_from("I", self._view, index * self.block_size + _BLOCK_STATUS_OFFSET)[0]
+        return bool(status & TP_STATUS_USER)
+
+    def release_batch(self):
+        """Mengembalikan blok yang sedang dipegang ke kernel."""
+        if self._pending_block is None:
+            return
+        for view in self._pending_views:
+            view.release()
+        self._pending_views = []
+        struct.pack_into("I", self._view, self._pending_block * self.block_size + _BLOCK_STATUS_OFFSET, TP_STATUS_KERNEL)
+        self._pending_block = None
+
+    def read_batch(self, timeout: Optional[float] = None) -> Batch:
+        """
+        Menunggu satu blok siap (maksimal `timeout` detik, None = blok selamanya) dan mengembalikan
+        frame-frame di dalamnya. List kosong berarti timeout.
+        """
+        self.release_batch()
+        index = self._block_index
+        if not self._block_ready(index):
+            timeout_ms = None if timeout is None else int(timeout * 1000)
+            self._poller.poll(timeout_ms)
+            if not self._block_ready(index):
+                return []
+
+        base = index * self.block_size
+        _status, num_pkts, offset = _BLOCK_HEADER.unpack_from(self._view, base + _BLOCK_STATUS_OFFSET)
+        batch: Batch = []
+        pkt = base + offset
+        for _ in range(num_pkts):
+            next_offset, sec, nsec, snaplen, _length, _status, mac = _TPACKET3_HDR.unpack_from(self._view, pkt)
+            frame = self._view[pkt + mac:pkt + mac + snaplen]
+            self._pending_views.append(frame)
+            batch.append((sec + nsec / 1e9, frame))
+            pkt += next_offset
+
+        self._pending_block = index
+        self._block_index = (index + 1) % self.block_count
+        return batch
+
+    def batches(self, stop_event=None, poll_interval: float = 0.2) -> Iterator[Batch]:
+        """Iterator batch sampai `stop_event` di-set. Batch sebelumnya dilepas saat batch berikutnya diminta."""
+        try:
+            while stop_event is None or not stop_event.is_set():
+                batch = self.read_batch(timeout=poll_interval)
+                if batch:
+                    yield batch
+        finally:
+            self.release_batch()
+
+    def close(self):
+        self.release_batch()
+        try:
+            self._view.release()
+            self._ring.close()
+        except (BufferError, AttributeError):
+            pass
+        self._sock.close()
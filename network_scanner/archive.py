@@ -0,0 +1,400 @@
+# file: network_scanner/archive.py
+#
+# Arsip capture biner terindeks (.albcap) untuk payload Photon mentah.
+#
+#   header file : magic "ALBCAP" + versi (8 byte)
+#   chunk       : header chunk (magic, jumlah record, panjang, ts awal/akhir, bitmap event code 256 bit)
+#                 diikuti record: ts (d), indeks peer (H), jenis (B), pad, panjang (I), data
+#   index       : salinan header chunk + offset setiap chunk
+#   tabel peer  : (panjang alamat, alamat, port) per peer
+#   footer      : offset index, jumlah chunk, jumlah peer, magic "ALBCIDX1"
+#
+# Reader memakai index untuk melompati chunk di luar rentang waktu atau yang tidak memuat event
+# code yang dicari. Jika footer tidak ada (program berhenti sebelum close()), chunk dipindai dari
+# header-nya saja. Contoh:
+#   python -m network_scanner.archive info sesi.albcap
+#   python -m network_scanner.archive dump sesi.albcap --start 1717000000 --end 1717000060 --event-code 23
+#   python -m network_scanner.archive convert parsed_photon_log_*.json -o sesi_lama.albcap
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .fragments import FragmentReassembler
+from .sniffer import PHOTON_MSG_TYPE_EVENT, iter_photon_messages
+
+FILE_MAGIC = b"ALBCAP\x00\x01"
+_CHUNK_MAGIC = b"CHNK"
+_FOOTER_MAGIC = b"ALBCIDX1"
+
+_CHUNK_HEADER = struct.Struct("<4sIIdd32s") # magic, record, byte data, ts awal, ts akhir, bitmap
+_INDEX_ENTRY = struct.Struct("<Q")         # offset chunk; diikuti _CHUNK_HEADER
+_RECORD_HEADER = struct.Struct("<dHBxI")    # ts, peer, jenis, panjang
+_PEER_ENTRY = struct.Struct("<BH")          # panjang alamat, port; diikuti alamat
+_FOOTER = struct.Struct("<QII8s")
+
+RECORD_PHOTON = 0 # Payload UDP Photon mentah
+RECORD_JSON = 1   # Dict hasil parse (UTF-8 JSON), dipakai konverter log lama yang tidak menyimpan payload
+
+NO_PEER = 0xFFFF
+
+
+class ArchiveFormatError(ValueError):
+    """Dilempar jika file bukan arsip .albcap yang valid."""
+
+
+class ChunkInfo(NamedTuple):
+    offset: int # Offset data record pertama (setelah header chunk)
+    records: int
+    size: int
+    ts_first: float
+    ts_last: float
+    event_codes: int # Bitmap: bit n menyala jika ada EventData dengan code n di chunk ini
+
+
+class ArchiveRecord(NamedTuple):
+    ts: float
+    peer: Optional[Tuple[bytes, int]]
+    kind: int
+    data: memoryview
+
+
+def photon_event_codes(payload, reassembler: Optional[FragmentReassembler] = None, peer=None) -> int:
+    """Bitmap event code dari semua EventData di satu datagram Photon."""
+    codes = 0
+    for _cmd_type, body in iter_photon_messages(payload, reassembler, peer):
+        if len(body) > 1 and body[0] & 0x7F == PHOTON_MSG_TYPE_EVENT:
+            codes |= 1 << body[1]
+    return codes
+
+
+def _json_event_codes(record: Dict[str, Any]) -> int:
+    codes = 0
+    for cmd in record.get("commands", ()):
+        for key in ("event_custom_code", "embedded_event_custom_code"):
+            code = cmd.get(key)
+            if isinstance(code, int) and 0 <= code < 256:
+                codes |= 1 << code
+    return codes
+
+
+def _codes_mask(event_codes: Iterable[int]) -> int:
+    mask = 0
+    for code in event_codes:
+        mask |= 1 << code
+    return mask
+
+
+class ArchiveWriter:
+    """
+    Menulis arsip .albcap. Record dikumpulkan per chunk di memori (maks. `chunk_bytes`) lalu
+    ditulis sekaligus, jadi memori tetap konstan berapa pun panjang sesinya.
+    """
+    def __init__(self, path: str, chunk_bytes: int = 1024 * 1024):
+        self.path = path
+        self.chunk_bytes = chunk_bytes
+        self._file = open(path, "wb")
+        self._file.write(FILE_MAGIC)
+        self._index: List[Tuple[int, bytes]] = []
+        self._peers: Dict[Tuple[bytes, int], int] = {}
+        # Fragmen disusun ulang hanya untuk mengisi bitmap event code; record tetap datagram mentah.
+        self._reassembler = FragmentReassembler()
+        self._reset_chunk()
+        self.records = 0
+
+    def _reset_chunk(self):
+        self._chunk = bytearray()
+        self._chunk_records = 0
+        self._chunk_first = float("inf")
+        self._chunk_last = float("-inf")
+        self._chunk_codes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _peer_index(self, peer) -> int:
+        if peer is None:
+            return NO_PEER
+        index = self._peers.get(peer)
+        if index is None:
+            if len(self._peers) >= NO_PEER:
+                return NO_PEER
+            index = self._peers[peer] = len(self._peers)
+        return index
+
+    def write_photon(self, ts: float, peer, payload) -> None:
+        """Menambahkan satu datagram Photon mentah. `peer` = (alamat bytes, port) atau None."""
+        codes = photon_event_codes(payload, self._reassembler, peer)
+        self._append(ts, self._peer_index(peer), RECORD_PHOTON, payload, codes)
+
+    def write_json(self, ts: float, peer, record: Dict[str, Any]) -> None:
+        data = json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+        self._append(ts, self._peer_index(peer), RECORD_JSON, data, _json_event_codes(record))
+
+    def _append(self, ts: float, peer_index: int, kind: int, data, codes: int):
+        self._chunk += _RECORD_HEADER.pack(ts, peer_index, kind, len(data))
+        self._chunk += data
+        self._chunk_records += 1
+        self._chunk_codes |= codes
+        if ts < self._chunk_first:
+            self._chunk_first = ts
+        if ts > self._chunk_last:
+            self._chunk_last = ts
+        self.records += 1
+        if len(self._chunk) >= self.chunk_bytes:
+            self.flush()
+
+    def flush(self):
+        """Menulis chunk yang sedang dikumpulkan (jika ada) ke disk."""
+        if not self._chunk_records:
+            return
+        header = _CHUNK_HEADER.pack(_CHUNK_MAGIC, self._chunk_records, len(self._chunk), self._chunk_first,
+                                    self._chunk_last, self._chunk_codes.to_bytes(32, "little"))
+        self._index.append((self._file.tell(), header))
+        self._file.write(header)
+        self._file.write(self._chunk)
+        self._file.flush()
+        self._reset_chunk()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        index_offset = self._file.tell()
+        for offset, header in self._index:
+            self._file.write(_INDEX_ENTRY.pack(offset))
+            self._file.write(header)
+        for (address, port), _index in sorted(self._peers.items(), key=lambda item: item[1]):
+            self._file.write(_PEER_ENTRY.pack(len(address), port))
+            self._file.write(address)
+        self._file.write(_FOOTER.pack(index_offset, len(self._index), len(self._peers), _FOOTER_MAGIC))
+        self._file.close()
+
+
+class ArchiveReader:
+    """
+    Membaca arsip .albcap lewat mmap. Data record adalah memoryview ke isi file (tanpa salinan)
+    dan hanya valid selama reader belum ditutup.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm: Optional[mmap.mmap] = None
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mm)
+        except ValueError:
+            self._view = memoryview(b"")
+        if bytes(self._view[:len(FILE_MAGIC)]) != FILE_MAGIC:
+            self.close()
+            raise ArchiveFormatError(f"'{path}' bukan arsip capture .albcap.")
+        self.peers: List[Tuple[bytes, int]] = []
+        self.indexed = self._read_footer()
+        if not self.indexed:
+            self.chunks = self._scan_chunks()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        try:
+            self._view.release()
+            if self._mm is not None:
+                self._mm.close()
+        except BufferError:
+            # Masih ada record (memoryview) yang dipegang pemanggil; biarkan GC yang menutup mmap.
+            pass
+        self._file.close()
+
+    @staticmethod
+    def _chunk_info(offset: int, header: tuple) -> ChunkInfo:
+        _magic, records, size, ts_first, ts_last, bitmap = header
+        return ChunkInfo(offset + _CHUNK_HEADER.size, records, size, ts_first, ts_last,
+                         int.from_bytes(bitmap, "little"))
+
+    def _read_footer(self) -> bool:
+        data = self._view
+        if len(data) < len(FILE_MAGIC) + _FOOTER.size:
+            return False
+        index_offset, chunk_count, peer_count, magic = _FOOTER.unpack_from(data, len(data) - _FOOTER.size)
+        if magic != _FOOTER_MAGIC:
+            return False
+        chunks = []
+        pos = index_offset
+        for _ in range(chunk_count):
+            (offset,) = _INDEX_ENTRY.unpack_from(data, pos)
+            pos += _INDEX_ENTRY.size
+            chunks.append(self._chunk_info(offset, _CHUNK_HEADER.unpack_from(data, pos)))
+            pos += _CHUNK_HEADER.size
+        for _ in range(peer_count):
+            length, port = _PEER_ENTRY.unpack_from(data, pos)
+            pos += _PEER_ENTRY.size
+            self.peers.append((bytes(data[pos:pos + length]), port))
+            pos += length
+        self.chunks = chunks
+        return True
+
+    def _scan_chunks(self) -> List[ChunkInfo]:
+        """Membangun index dari header chunk untuk arsip tanpa footer (tabel peer tidak tersedia)."""
+        data = self._view
+        chunks = []
+        pos = len(FILE_MAGIC)
+        while pos + _CHUNK_HEADER.size <= len(data):
+            header = _CHUNK_HEADER.unpack_from(data, pos)
+            if header[0] != _CHUNK_MAGIC or pos + _CHUNK_HEADER.size + header[2] > len(data):
+                break # Chunk terakhir terpotong
+            chunks.append(self._chunk_info(pos, header))
+            pos += _CHUNK_HEADER.size + header[2]
+        return chunks
+
+    def __len__(self) -> int:
+        return sum(chunk.records for chunk in self.chunks)
+
+    def __iter__(self) -> Iterator[ArchiveRecord]:
+        return self.records()
+
+    def time_range(self) -> Optional[Tuple[float, float]]:
+        if not self.chunks:
+            return None
+        return min(c.ts_first for c in self.chunks), max(c.ts_last for c in self.chunks)
+
+    def event_codes(self) -> List[int]:
+        bitmap = 0
+        for chunk in self.chunks:
+            bitmap |= chunk.event_codes
+        return [code for code in range(256) if bitmap >> code & 1]
+
+    def select_chunks(self, start: Optional[float] = None, end: Optional[float] = None,
+                      event_codes: Optional[Iterable[int]] = None) -> List[ChunkInfo]:
+        """Chunk yang mungkin berisi record dalam [start, end] dan salah satu `event_codes`."""
+        mask = _codes_mask(event_codes or ())
+        return [c for c in self.chunks
+                if (start is None or c.ts_last >= start) and (end is None or c.ts_first <= end)
+                and (event_codes is None or c.event_codes & mask)]
+
+    def records(self, start: Optional[float] = None, end: Optional[float] = None,
+                event_codes: Optional[Iterable[int]] = None) -> Iterator[ArchiveRecord]:
+        """
+        Menghasilkan record dalam urutan file. Chunk di luar rentang waktu atau tanpa event code
+        yang diminta dilewati lewat index; di dalam chunk, setiap record diperiksa lagi.
+        """
+        mask = _codes_mask(event_codes or ())
+        data = self._view
+        peers = self.peers
+        for chunk in self.select_chunks(start, end, event_codes):
+            pos = chunk.offset
+            for _ in range(chunk.records):
+                ts, peer_index, kind, length = _RECORD_HEADER.unpack_from(data, pos)
+                pos += _RECORD_HEADER.size
+                payload = data[pos:pos + length]
+                pos += length
+                if (start is not None and ts < start) or (end is not None and ts > end):
+                    continue
+                if event_codes is not None and not self.record_event_codes(kind, payload) & mask:
+                    continue
+                peer = peers[peer_index] if peer_index < len(peers) else None
+                yield ArchiveRecord(ts, peer, kind, payload)
+
+    @staticmethod
+    def record_event_codes(kind: int, payload: memoryview) -> int:
+        # Per record, fragmen tidak disusun ulang: event di pesan terfragmentasi hanya terlihat di
+        # bitmap chunk. Gunakan filter tanpa event_codes untuk mendapatkan semua fragmennya.
+        if kind == RECORD_PHOTON:
+            return photon_event_codes(payload)
+        if kind == RECORD_JSON:
+            return _json_event_codes(json.loads(bytes(payload)))
+        return 0
+
+
+def _legacy_timestamp(record: Dict[str, Any]) -> float:
+    if "capture_timestamp_epoch" in record:
+        return float(record["capture_timestamp_epoch"])
+    readable = record.get("timestamp_readable") or record.get("timestamp")
+    if not readable:
+        return 0.0
+    seconds, _, millis = str(readable).partition(".")
+    return time.mktime(time.strptime(seconds, "%Y-%m-%d %H:%M:%S")) + (int(millis) / 1000 if millis else 0.0)
+
+
+def _load_legacy_log(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, "rb") as f:
+        first = f.read(1)
+    if first == b"[":
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+    else:
+        from .session_log import read_session_log
+        yield from read_session_log(path)
+
+
+def convert_json_logs(paths: Sequence[str], archive_path: str) -> int:
+    """
+    Mengonversi log parsed_photon_log_*.json (atau log sesi NDJSON) ke arsip .albcap.
+    Log lama tidak menyimpan payload mentah, jadi setiap paket menjadi record RECORD_JSON.
+    Mengembalikan jumlah record yang ditulis.
+    """
+    with ArchiveWriter(archive_path) as writer:
+        for path in paths:
+            for record in _load_legacy_log(path):
+                writer.write_json(_legacy_timestamp(record), None, record)
+        return writer.records
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    cli = argparse.ArgumentParser(description="Arsip capture biner terindeks (.albcap).")
+    sub = cli.add_subparsers(dest="command", required=True)
+    info = sub.add_parser("info", help="Ringkasan arsip dan index chunk")
+    info.add_argument("file")
+    dump = sub.add_parser("dump", help="Cetak record dalam rentang waktu / event code")
+    dump.add_argument("file")
+    dump.add_argument("--start", type=float, default=None, help="Epoch awal")
+    dump.add_argument("--end", type=float, default=None, help="Epoch akhir")
+    dump.add_argument("--event-code", type=int, action="append", dest="event_codes")
+    convert = sub.add_parser("convert", help="Konversi log JSON/NDJSON lama ke .albcap")
+    convert.add_argument("files", nargs="+")
+    convert.add_argument("-o", "--output", required=True)
+    args = cli.parse_args(argv)
+
+    try:
+        if args.command == "convert":
+            start = time.perf_counter()
+            count = convert_json_logs(args.files, args.output)
+            print(f"[*] {count} record ditulis ke {args.output} ({os.path.getsize(args.output)} byte, "
+                  f"{time.perf_counter() - start:.2f}s)")
+            return 0
+
+        with ArchiveReader(args.file) as reader:
+            if args.command == "info":
+                span = reader.time_range()
+                print(f"[*] {args.file}: {len(reader)} record, {len(reader.chunks)} chunk, {len(reader.peers)} peer, "
+                      f"index {'footer' if reader.indexed else 'hasil pindai (footer tidak ada)'}")
+                if span:
+                    print(f"[*] Rentang waktu: {span[0]:.3f} - {span[1]:.3f} ({span[1] - span[0]:.1f}s)")
+                print(f"[*] Event code: {reader.event_codes()}")
+                return 0
+            for record in reader.records(args.start, args.end, args.event_codes):
+                if record.kind == RECORD_JSON:
+                    body = bytes(record.data).decode("utf-8")
+                else:
+                    body = record.data.hex()
+                print(f"{record.ts:.6f} {record.peer} {record.kind} {body}")
+                record.data.release()
+        return 0
+    except (OSError, ValueError) as e:
+        print(f"[!] Gagal memproses arsip: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
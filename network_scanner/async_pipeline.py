@@ -0,0 +1,219 @@
+# file: network_scanner/async_pipeline.py
+#
+# Inti asyncio: capture -> decode -> GameEvent -> subscriber, semuanya dijadwalkan oleh satu
+# event loop. Sumber paket:
+#   - AfPacketSource : fd ring AF_PACKET didaftarkan dengan loop.add_reader (tanpa thread sama sekali)
+#   - SnifferSource  : PacketSniffer (scapy) tetap di thread-nya sendiri; batch diambil lewat executor
+#   - PcapSource     : file pcap/pcapng, opsional mengikuti timestamp capture
+# Subscriber (lihat subscribers.py) masing-masing punya antrean terbatas dan satu task.
+#
+#   python -m network_scanner.async_pipeline --pcap sesi_dungeon.pcapng --speed 1
+#   python -m network_scanner.async_pipeline --interface eth0 --backend afpacket --webhook https://discord.com/api/webhooks/...
+
+import argparse
+import asyncio
+import sys
+import time
+from typing import Iterable, List, Optional, Sequence
+
+from .bpf import build_udp_filter, filter_expression
+from .decap import DLT_EN10MB, udp_datagram
+from .fragments import FragmentReassembler
+from .packet_queue import PacketQueue
+from .pcap import PcapReader
+from .sequence import ReliableSequenceTracker, connection_key
+from .sniffer import PacketSniffer, iter_photon_messages
+from .subscribers import DiscordWebhookSubscriber, LoggingSubscriber, Subscriber
+
+from scanner.utils.latency import LatencyRecorder
+
+
+class AfPacketSource:
+    """Ring AF_PACKET yang dibaca langsung di event loop setiap kali fd-nya siap dibaca."""
+    def __init__(self, interface: str, ports: Iterable[int] = (5056,), hosts: Iterable[str] = ()):
+        self.interface = interface
+        self.bpf_program = build_udp_filter(ports, hosts)
+
+    async def run(self, pipeline: "AsyncEventPipeline"):
+        from . import afpacket
+
+        loop = asyncio.get_running_loop()
+        ring = afpacket.AfPacketRing(self.interface, bpf_program=self.bpf_program)
+
+        def on_readable():
+            while True:
+                batch = ring.read_batch(timeout=0)
+                if not batch:
+                    return
+                for ts, frame in batch:
+                    datagram = udp_datagram(frame, DLT_EN10MB)
+                    if datagram is not None:
+                        pipeline.feed(ts, connection_key(datagram), datagram.payload)
+
+        loop.add_reader(ring.fileno(), on_readable)
+        try:
+            await pipeline.stopped.wait()
+        finally:
+            loop.remove_reader(ring.fileno())
+            ring.close()
+
+
+class SnifferSource:
+    """Jembatan executor untuk PacketSniffer (scapy); satu thread capture + satu thread executor saja."""
+    def __init__(self, interface: str, ports: Iterable[int] = (5056,), hosts: Iterable[str] = (),
+                 queue_size: int = 10000):
+        self.interface = interface
+        self.bpf_filter = filter_expression(ports, hosts)
+        self.queue_size = queue_size
+
+    async def run(self, pipeline: "AsyncEventPipeline"):
+        loop = asyncio.get_running_loop()
+        packet_queue = PacketQueue(maxsize=self.queue_size)
+        sniffer = PacketSniffer(packet_queue, self.bpf_filter, self.interface)
+        sniffer.start()
+        try:
+            while not pipeline.stopped.is_set() and not (packet_queue.closed and packet_queue.empty()):
+                batch = await loop.run_in_executor(None, packet_queue.get_batch, 256, 0.2)
+                for ts, peer, payload in batch:
+                    pipeline.feed(ts, peer, payload)
+                packet_queue.task_done(len(batch))
+                await asyncio.sleep(0) # Beri giliran ke subscriber di antara batch
+        finally:
+            sniffer.stop()
+            packet_queue.close()
+
+
+class PcapSource:
+    """File capture; speed=None secepat mungkin, speed=1.0 mengikuti jeda capture asli."""
+    def __init__(self, paths: Sequence[str], ports: Iterable[int] = (5056,), speed: Optional[float] = None):
+        self.paths = list(paths)
+        self.ports = frozenset(ports)
+        self.speed = speed if speed and speed > 0 else None
+
+    async def run(self, pipeline: "AsyncEventPipeline"):
+        first_ts = None
+        start = time.perf_counter()
+        for path in self.paths:
+            with PcapReader(path) as reader:
+                for index, (ts, linktype, frame) in enumerate(reader):
+                    if pipeline.stopped.is_set():
+                        return
+                    if first_ts is None:
+                        first_ts = ts
+                    if self.speed is not None:
+                        delay = start + (ts - first_ts) / self.speed - time.perf_counter()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                    elif index % 256 == 0:
+                        await asyncio.sleep(0)
+                    datagram = udp_datagram(frame, linktype)
+                    if datagram is None or (datagram.src_port not in self.ports and datagram.dst_port not in self.ports):
+                        continue
+                    pipeline.feed(ts, connection_key(datagram), datagram.payload)
+
+
+class AsyncEventPipeline:
+    """
+    Menjalankan satu sumber paket dan mendistribusikan GameEvent hasil PhotonParser ke semua
+    subscriber. Decode berjalan di event loop (tidak ada thread per paket atau per pesan);
+    feed() tidak pernah menunggu subscriber.
+    """
+    def __init__(self, parser, subscribers: Iterable[Subscriber], source,
+                 latency: Optional[LatencyRecorder] = None):
+        self.parser = parser
+        self.subscribers: List[Subscriber] = list(subscribers)
+        self.source = source
+        self.latency = latency or LatencyRecorder()
+        if getattr(parser, "latency", False) is None:
+            parser.latency = self.latency
+        for subscriber in self.subscribers:
+            subscriber.latency = self.latency
+        self.reassembler = FragmentReassembler()
+        self.sequences = ReliableSequenceTracker()
+        self.stopped: Optional[asyncio.Event] = None
+        self.packets = 0
+        self.events = 0
+
+    def feed(self, ts: float, peer, payload):
+        """Decode satu datagram dan bagikan GameEvent-nya. Dipanggil dari dalam event loop."""
+        self.packets += 1
+        self.latency.record_since_capture("dequeue", ts)
+        bodies = [bytes(body) for _cmd_type, body in iter_photon_messages(payload, self.reassembler, peer, self.sequences)]
+        if not bodies:
+            return
+        for event in self.parser.parse_messages(bodies, ts):
+            self.events += 1
+            for subscriber in self.subscribers:
+                if subscriber.wants(event):
+                    subscriber.offer(event)
+
+    def stop(self):
+        if self.stopped is not None:
+            self.stopped.set()
+
+    async def run(self):
+        """Berjalan sampai sumber habis atau stop() dipanggil, lalu menguras antrean subscriber."""
+        self.stopped = asyncio.Event()
+        tasks = []
+        for subscriber in self.subscribers:
+            subscriber.queue = asyncio.Queue(subscriber.queue_size)
+            await subscriber.start()
+            tasks.append(asyncio.create_task(subscriber.run(), name=f"subscriber-{subscriber.name}"))
+        try:
+            await self.source.run(self)
+        finally:
+            self.stopped.set()
+            for subscriber in self.subscribers:
+                try:
+                    await asyncio.wait_for(subscriber.queue.join(), timeout=5)
+                except asyncio.TimeoutError:
+                    print(f"[!] Subscriber '{subscriber.name}' tidak selesai menguras antrean.")
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for subscriber in self.subscribers:
+                await subscriber.close()
+
+    def format_stats(self) -> str:
+        parts = [f"Paket: {self.packets}, GameEvent: {self.events}", self.sequences.format_stats()]
+        if hasattr(self.parser, "prefilter_stats"):
+            prefilter = self.parser.prefilter_stats()
+            parts.append(f"Pesan di-decode: {prefilter['decoded']}, dilewati prefilter: {prefilter['skipped']}")
+        parts.extend(subscriber.format_stats() for subscriber in self.subscribers)
+        return " | ".join(parts)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    cli = argparse.ArgumentParser(description="Pipeline asyncio: capture -> decode -> GameEvent -> subscriber.")
+    cli.add_argument("--pcap", nargs="+", help="Baca dari file pcap/pcapng")
+    cli.add_argument("--speed", type=float, default=None, help="Pengali kecepatan replay pcap")
+    cli.add_argument("--interface", help="Antarmuka untuk capture live")
+    cli.add_argument("--backend", choices=["scapy", "afpacket"], default="scapy")
+    cli.add_argument("--webhook", help="URL webhook Discord untuk peti dan bos")
+    cli.add_argument("--database", default="database.json")
+    args = cli.parse_args(argv)
+
+    if args.pcap:
+        source = PcapSource(args.pcap, speed=args.speed)
+    elif args.interface:
+        source = AfPacketSource(args.interface) if args.backend == "afpacket" else SnifferSource(args.interface)
+    else:
+        print("[!] Berikan --pcap atau --interface.")
+        return 1
+
+    from scanner import PhotonParser
+    subscribers: List[Subscriber] = [LoggingSubscriber()]
+    if args.webhook:
+        subscribers.append(DiscordWebhookSubscriber(args.webhook))
+    pipeline = AsyncEventPipeline(PhotonParser(database_path=args.database), subscribers, source)
+    try:
+        asyncio.run(pipeline.run())
+    except KeyboardInterrupt:
+        print("\n[*] Pipeline dihentikan oleh pengguna.")
+    print(f"[*] Selesai. {pipeline.format_stats()}")
+    print(f"[*] Latensi per tahap:\n{pipeline.latency.summary()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
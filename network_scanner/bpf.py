@@ -0,0 +1,194 @@
+# file: network_scanner/bpf.py
+#
+# Perakit classic BPF kecil untuk filter "udp and (host ...) and (port ...)" di atas frame Ethernet.
+# Dipakai backend AF_PACKET (SO_ATTACH_FILTER) agar kita tidak butuh libpcap/tcpdump untuk
+# meng-compile filter, dan agar filter bisa dibangun ulang saat runtime.
+
+import ctypes
+import socket
+import struct
+from typing import Iterable, List, Tuple
+
+# --- Opcode classic BPF (linux/filter.h) ---
+BPF_LD_W_ABS = 0x20
+BPF_LD_H_ABS = 0x28
+BPF_LD_B_ABS = 0x30
+BPF_LD_H_IND = 0x48
+BPF_LDX_B_MSH = 0xb1
+BPF_JMP_JA = 0x05
+BPF_JMP_JEQ_K = 0x15
+BPF_JMP_JSET_K = 0x45
+BPF_RET_K = 0x06
+
+SO_ATTACH_FILTER = 26
+SO_DETACH_FILTER = 27
+
+ACCEPT_SNAPLEN = 0x40000
+
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_IPV6 = 0x86dd
+IP_PROTO_UDP = 17
+
+_SOCK_FILTER = struct.Struct("HBBI") # struct sock_filter { u16 code; u8 jt; u8 jf; u32 k; }
+
+Instruction = Tuple[int, int, int, int]
+
+
+class _Assembler:
+    """Assembler dua-pass: lompatan ditulis memakai label, lalu di-resolve menjadi offset relatif."""
+    def __init__(self):
+        self._code = [] # (opcode, jt_label|int, jf_label|int, k)
+        self._labels = {}
+
+    def label(self, name: str):
+        self._labels[name] = len(self._code)
+
+    def emit(self, opcode: int, k: int = 0, jt=0, jf=0):
+        self._code.append((opcode, jt, jf, k))
+
+    def assemble(self) -> List[Instruction]:
+        program = []
+        for pc, (opcode, jt, jf, k) in enumerate(self._code):
+            if opcode == BPF_JMP_JA and isinstance(k, str):
+                k = self._labels[k] - pc - 1
+            jt = self._resolve(jt, pc)
+            jf = self._resolve(jf, pc)
+            program.append((opcode, jt, jf, k))
+        return program
+
+    def _resolve(self, target, pc: int) -> int:
+        if not isinstance(target, str):
+            return target
+        offset = self._labels[target] - pc - 1
+        if not 0 <= offset <= 255:
+            raise ValueError(f"Lompatan BPF ke '{target}' terlalu jauh ({offset}); kurangi jumlah host/port.")
+        return offset
+
+
+def _ipv4_words(hosts: Iterable[str]) -> List[int]:
+    return sorted(set(struct.unpack("!I", socket.inet_aton(h))[0] for h in hosts))
+
+
+def build_udp_filter(ports: Iterable[int], hosts: Iterable[str] = (),
+                     exclude_hosts: Iterable[str] = ()) -> List[Instruction]:
+    """
+    Membangun program BPF yang setara dengan
+    "udp and (host h1 or host h2 ...) and (port p1 or port p2 ...)" untuk frame Ethernet.
+    Jika `hosts` kosong, hanya port yang dicek (IPv4 dan IPv6). Host hanya didukung untuk IPv4.
+    `exclude_hosts` (IPv4) selalu ditolak, meskipun port-nya cocok.
+    """
+    ports = sorted(set(int(p) for p in ports))
+    host_words = _ipv4_words(hosts)
+    exclude_words = _ipv4_words(exclude_hosts)
+    if not ports:
+        raise ValueError("Minimal satu port diperlukan untuk filter BPF.")
+
+    asm = _Assembler()
+    asm.emit(BPF_LD_H_ABS, 12)
+    asm.emit(BPF_JMP_JEQ_K, ETHERTYPE_IPV4, jt="ipv4", jf="not_ipv4")
+
+    asm.label("ipv4")
+    asm.emit(BPF_LD_B_ABS, 23)
+    asm.emit(BPF_JMP_JEQ_K, IP_PROTO_UDP, jt=0, jf="reject")
+    asm.emit(BPF_LD_H_ABS, 20)
+    asm.emit(BPF_JMP_JSET_K, 0x1fff, jt="reject", jf=0) # Fragmen non-pertama tidak punya header UDP
+    asm.emit(BPF_LDX_B_MSH, 14) # X = panjang header IPv4
+    for field_offset in (14, 16): # src port, dst port
+        asm.emit(BPF_LD_H_IND, field_offset)
+        for port in ports:
+            asm.emit(BPF_JMP_JEQ_K, port, jt="hosts4", jf=0)
+    asm.emit(BPF_JMP_JA, "reject")
+
+    asm.label("hosts4")
+    if exclude_words:
+        for field_offset in (26, 30):
+            asm.emit(BPF_LD_W_ABS, field_offset)
+            for word in exclude_words:
+                asm.emit(BPF_JMP_JEQ_K, word, jt="reject", jf=0)
+    if host_words:
+        for field_offset in (26, 30): # src ip, dst ip
+            asm.emit(BPF_LD_W_ABS, field_offset)
+            for word in host_words:
+                asm.emit(BPF_JMP_JEQ_K, word, jt="accept", jf=0)
+        asm.emit(BPF_JMP_JA, "reject")
+    else:
+        asm.emit(BPF_JMP_JA, "accept")
+
+    asm.label("not_ipv4")
+    if host_words:
+        asm.emit(BPF_JMP_JA, "reject")
+    else:
+        asm.emit(BPF_JMP_JEQ_K, ETHERTYPE_IPV6, jt=0, jf="reject")
+        asm.emit(BPF_LD_B_ABS, 20) # next header IPv6 (tanpa extension header)
+        asm.emit(BPF_JMP_JEQ_K, IP_PROTO_UDP, jt=0, jf="reject")
+        for field_offset in (54, 56):
+            asm.emit(BPF_LD_H_ABS, field_offset)
+            for port in ports:
+                asm.emit(BPF_JMP_JEQ_K, port, jt="accept", jf=0)
+        asm.emit(BPF_JMP_JA, "reject")
+
+    asm.label("accept")
+    asm.emit(BPF_RET_K, ACCEPT_SNAPLEN)
+    asm.label("reject")
+    asm.emit(BPF_RET_K, 0)
+    return asm.assemble()
+
+
+def filter_expression(ports: Iterable[int], hosts: Iterable[str] = (), exclude_hosts: Iterable[str] = ()) -> str:
+    """Ekspresi tcpdump/libpcap yang setara dengan build_udp_filter (untuk backend scapy)."""
+    port_filter = " or ".join(f"port {p}" for p in sorted(set(ports)))
+    hosts = sorted(set(hosts))
+    expression = f"udp and ({port_filter})"
+    if hosts:
+        host_filter = " or ".join(f"host {ip}" for ip in hosts)
+        expression = f"udp and ({host_filter}) and ({port_filter})"
+    exclude_hosts = sorted(set(exclude_hosts))
+    if exclude_hosts:
+        expression += " and not (" + " or ".join(f"host {ip}" for ip in exclude_hosts) + ")"
+    return expression
+
+
+def reject_all_filter() -> List[Instruction]:
+    return [(BPF_RET_K, 0, 0, 0)]
+
+
+def attach_filter(sock: socket.socket, program: List[Instruction]):
+    """Memasang (atau mengganti) filter BPF di socket. Kernel menyalin program saat setsockopt."""
+    code = b"".join(_SOCK_FILTER.pack(*ins) for ins in program)
+    buf = ctypes.create_string_buffer(code, len(code))
+    fprog = struct.pack("HL", len(program), ctypes.addressof(buf)) # struct sock_fprog
+    sock.setsockopt(socket.SOL_SOCKET, SO_ATTACH_FILTER, fprog)
+
+
+def run_filter(program: List[Instruction], frame) -> int:
+    """
+    Interpreter BPF minimal (subset yang dihasilkan modul ini) untuk memeriksa program di
+    userspace, misalnya terhadap isi file pcap. Mengembalikan nilai RET (0 = ditolak).
+    """
+    a = x = 0
+    pc = 0
+    n = len(frame)
+    while pc < len(program):
+        opcode, jt, jf, k = program[pc]
+        pc += 1
+        if opcode == BPF_RET_K:
+            return k
+        if opcode in (BPF_LD_W_ABS, BPF_LD_H_ABS, BPF_LD_B_ABS, BPF_LD_H_IND):
+            offset = k + x if opcode == BPF_LD_H_IND else k
+            size = 4 if opcode == BPF_LD_W_ABS else 1 if opcode == BPF_LD_B_ABS else 2
+            if offset + size > n:
+                return 0
+            a = int.from_bytes(frame[offset:offset + size], "big")
+        elif opcode == BPF_LDX_B_MSH:
+            if k >= n:
+                return 0
+            x = (frame[k] & 0x0f) * 4
+        elif opcode == BPF_JMP_JA:
+            pc += k
+        elif opcode == BPF_JMP_JEQ_K:
+            pc += jt if a == k else jf
+        elif opcode == BPF_JMP_JSET_K:
+            pc += jt if a & k else jf
+        else:
+            raise ValueError(f"Opcode BPF tidak didukung interpreter: {opcode:#x}")
+    return 0
@@ -0,0 +1,176 @@
+# file: network_scanner/decap.py
+#
+# Jalur cepat untuk mengambil payload UDP dari frame mentah: header dibaca di offset tetap
+# langsung dari memoryview, tanpa membangun objek protokol (scapy.Ether) per paket.
+# Payload yang dikembalikan adalah view ke frame asli, bukan salinan.
+
+import struct
+from typing import NamedTuple, Optional, Tuple
+
+# --- Tipe link-layer (nilai DLT/LINKTYPE dari libpcap) ---
+DLT_NULL = 0 # Loopback BSD/Windows (Npcap), family dalam urutan byte host
+DLT_EN10MB = 1
+DLT_RAW_BSD = 12 # DLT_RAW di sebagian besar BSD
+DLT_RAW_OPENBSD = 14
+DLT_RAW = 101
+DLT_LOOP = 108 # Loopback OpenBSD, family dalam urutan byte network
+DLT_LINUX_SLL = 113 # "any" di Linux (cooked capture v1)
+DLT_IPV4 = 228
+DLT_IPV6 = 229
+DLT_LINUX_SLL2 = 276
+
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_IPV6 = 0x86dd
+ETHERTYPE_VLAN = 0x8100
+ETHERTYPE_QINQ = 0x88a8
+ETHERTYPE_QINQ_OLD = 0x9100
+
+IP_PROTO_UDP = 17
+# Extension header IPv6 yang dilewati untuk mencari header UDP
+IPV6_EXT_HOP_BY_HOP = 0
+IPV6_EXT_ROUTING = 43
+IPV6_EXT_FRAGMENT = 44
+IPV6_EXT_AH = 51
+IPV6_EXT_DEST_OPTS = 60
+
+_VLAN_TYPES = (ETHERTYPE_VLAN, ETHERTYPE_QINQ, ETHERTYPE_QINQ_OLD)
+# Nilai AF_INET/AF_INET6 di header loopback berbeda per OS (Linux/BSD/Windows/macOS).
+_LOOP_AF_INET = (2,)
+_LOOP_AF_INET6 = (10, 24, 28, 30)
+
+_U16 = struct.Struct("!H")
+_U32_LE = struct.Struct("<I")
+_U32_BE = struct.Struct("!I")
+_UDP_HEADER = struct.Struct("!HHH") # src port, dst port, length
+
+
+class UdpDatagram(NamedTuple):
+    src: bytes
+    src_port: int
+    dst: bytes
+    dst_port: int
+    payload: memoryview
+
+
+def _network_offset(frame: memoryview, linktype: int) -> Tuple[int, int]:
+    """
+    Mengembalikan (versi_ip, offset_header_ip) untuk frame dengan linktype tertentu,
+    atau (0, 0) jika frame tidak membawa IPv4/IPv6.
+    """
+    n = len(frame)
+    if linktype == DLT_EN10MB:
+        if n < 14:
+            return 0, 0
+        offset = 12
+        ethertype = _U16.unpack_from(frame, offset)[0]
+        while ethertype in _VLAN_TYPES: # 802.1Q / 802.1ad (bisa bertumpuk)
+            offset += 4
+            if n < offset + 2:
+                return 0, 0
+            ethertype = _U16.unpack_from(frame, offset)[0]
+        offset += 2
+    elif linktype == DLT_LINUX_SLL:
+        if n < 16:
+            return 0, 0
+        ethertype = _U16.unpack_from(frame, 14)[0]
+        offset = 16
+    elif linktype == DLT_LINUX_SLL2:
+        if n < 20:
+            return 0, 0
+        ethertype = _U16.unpack_from(frame, 0)[0]
+        offset = 20
+    elif linktype in (DLT_NULL, DLT_LOOP):
+        if n < 4:
+            return 0, 0
+        family = _U32_BE.unpack_from(frame, 0)[0] if linktype == DLT_LOOP else _U32_LE.unpack_from(frame, 0)[0]
+        if family > 0xFFFF: # DLT_NULL dari host big-endian
+            family = _U32_BE.unpack_from(frame, 0)[0]
+        if family in _LOOP_AF_INET:
+            return (4, 4) if n > 4 and frame[4] >> 4 == 4 else (0, 0)
+        if family in _LOOP_AF_INET6:
+            return (6, 4) if n > 4 and frame[4] >> 4 == 6 else (0, 0)
+        return 0, 0
+    elif linktype in (DLT_RAW, DLT_RAW_BSD, DLT_RAW_OPENBSD, DLT_IPV4, DLT_IPV6):
+        if n < 1:
+            return 0, 0
+        version = frame[0] >> 4
+        return (version, 0) if version in (4, 6) else (0, 0)
+    else:
+        return 0, 0
+
+    if ethertype == ETHERTYPE_IPV4:
+        return 4, offset
+    if ethertype == ETHERTYPE_IPV6:
+        return 6, offset
+    return 0, 0
+
+
+def _udp_offset(frame: memoryview, version: int, ip: int) -> int:
+    """Offset header UDP, atau -1 jika paket bukan UDP / fragmen / terpotong."""
+    n = len(frame)
+    if version == 4:
+        if n < ip + 20:
+            return -1
+        if frame[ip + 9] != IP_PROTO_UDP:
+            return -1
+        if _U16.unpack_from(frame, ip + 6)[0] & 0x3FFF: # MF atau fragment offset != 0
+            return -1
+        udp = ip + (frame[ip] & 0x0F) * 4 # IHL > 5 berarti ada IPv4 options
+    else:
+        if n < ip + 40:
+            return -1
+        next_header = frame[ip + 6]
+        udp = ip + 40
+        while next_header != IP_PROTO_UDP:
+            if n < udp + 8:
+                return -1
+            if next_header in (IPV6_EXT_HOP_BY_HOP, IPV6_EXT_ROUTING, IPV6_EXT_DEST_OPTS):
+                next_header, ext_len = frame[udp], (frame[udp + 1] + 1) * 8
+            elif next_header == IPV6_EXT_AH:
+                next_header, ext_len = frame[udp], (frame[udp + 1] + 2) * 4
+            elif next_header == IPV6_EXT_FRAGMENT:
+                if _U16.unpack_from(frame, udp + 2)[0] & 0xFFF9: # offset != 0 atau M flag
+                    return -1
+                next_header, ext_len = frame[udp], 8
+            else:
+                return -1
+            udp += ext_len
+    return udp if n >= udp + 8 else -1
+
+
+def _payload_end(frame: memoryview, udp: int) -> int:
+    # Frame Ethernet bisa punya padding setelah payload; percayai panjang di header UDP.
+    udp_len = _U16.unpack_from(frame, udp + 4)[0]
+    return min(udp + udp_len, len(frame)) if udp_len >= 8 else len(frame)
+
+
+def udp_payload(frame, linktype: int = DLT_EN10MB) -> Optional[memoryview]:
+    """
+    Jalur tercepat: hanya payload UDP (memoryview ke frame asli) atau None jika frame
+    bukan datagram UDP utuh (non-IP, bukan UDP, fragmen IP, atau terpotong).
+    """
+    frame = memoryview(frame)
+    version, ip = _network_offset(frame, linktype)
+    if not version:
+        return None
+    udp = _udp_offset(frame, version, ip)
+    if udp < 0:
+        return None
+    return frame[udp + 8:_payload_end(frame, udp)]
+
+
+def udp_datagram(frame, linktype: int = DLT_EN10MB) -> Optional[UdpDatagram]:
+    """Seperti udp_payload, tetapi juga mengembalikan alamat dan port kedua sisi."""
+    frame = memoryview(frame)
+    version, ip = _network_offset(frame, linktype)
+    if not version:
+        return None
+    udp = _udp_offset(frame, version, ip)
+    if udp < 0:
+        return None
+    src_port, dst_port = _UDP_HEADER.unpack_from(frame, udp)[:2]
+    if version == 4:
+        src, dst = bytes(frame[ip + 12:ip + 16]), bytes(frame[ip + 16:ip + 20])
+    else:
+        src, dst = bytes(frame[ip + 8:ip + 24]), bytes(frame[ip + 24:ip + 40])
+    return UdpDatagram(src, src_port, dst, dst_port, frame[udp + 8:_payload_end(frame, udp)])
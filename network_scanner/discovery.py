@@ -0,0 +1,215 @@
+# file: network_scanner/discovery.py
+#
+# Penemuan server Albion otomatis. Alih-alih daftar IP manual, setiap datagram UDP di port game
+# diperiksa bentuk header Photon-nya (jumlah command, tipe command, dan panjang command yang pas
+# menutup datagram). Endpoint yang berulang kali lolos dicatat sebagai server; endpoint yang
+# berulang kali gagal dan tidak pernah lolos dimasukkan ke daftar tolak. Keduanya dipakai untuk
+# membangun ulang filter BPF kernel selama capture berjalan (lihat AfPacketRing.set_filter).
+
+import ipaddress
+import struct
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from .bpf import Instruction, build_udp_filter, filter_expression
+from .decap import UdpDatagram
+
+_COMMAND_HEADER = struct.Struct(">BBBBI") # type, channel, flags, reserved, length
+_MAX_COMMAND_TYPE = 12 # Tipe command Photon yang diketahui: 1 (ack) .. 12
+
+
+def looks_like_photon(payload) -> bool:
+    """
+    True jika datagram berbentuk paket Photon: header 12 byte, 1..255 command dengan tipe yang
+    dikenal, dan total panjang command tepat sama dengan sisa datagram.
+    """
+    size = len(payload)
+    if size < 12:
+        return False
+    command_count = payload[3]
+    if command_count == 0:
+        return False
+    offset = 12
+    for _ in range(command_count):
+        if offset + 12 > size:
+            return False
+        cmd_type, _channel, _flags, _reserved, cmd_len = _COMMAND_HEADER.unpack_from(payload, offset)
+        if not 1 <= cmd_type <= _MAX_COMMAND_TYPE or cmd_len < 12:
+            return False
+        offset += cmd_len
+    return offset == size
+
+
+def _interface_counter(interface: str, name: str) -> Optional[int]:
+    try:
+        with open(f"/sys/class/net/{interface}/statistics/{name}", "r") as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def interface_packet_count(interface: str) -> Optional[int]:
+    """rx_packets + tx_packets antarmuka (Linux). AF_PACKET melihat kedua arah; None jika tidak tersedia."""
+    rx = _interface_counter(interface, "rx_packets")
+    tx = _interface_counter(interface, "tx_packets")
+    if rx is None or tx is None:
+        return None
+    return rx + tx
+
+
+class _Endpoint:
+    __slots__ = ("photon", "rejected", "first_seen", "last_seen")
+
+    def __init__(self, now: float):
+        self.photon = 0
+        self.rejected = 0
+        self.first_seen = now
+        self.last_seen = now
+
+
+class ServerDiscovery:
+    """
+    Mempelajari endpoint server Photon di `ports`. Sisi datagram yang memakai port game dianggap
+    sisi server. Endpoint menjadi server setelah `confirm_packets` datagram berbentuk Photon, dan
+    masuk daftar tolak setelah `block_after` datagram gagal tanpa satu pun yang lolos.
+
+    `known_servers` (mis. ALBION_SERVER_IPS lama) langsung dianggap server. Hanya alamat IPv4 yang
+    bisa masuk filter host BPF; server IPv6 tetap lolos lewat filter port.
+
+    Kandidat yang belum diputuskan dibatasi: dibuang setelah `endpoint_ttl` detik tanpa datagram,
+    dan paling banyak `max_endpoints` (yang paling lama tidak terlihat dibuang lebih dulu).
+    """
+    def __init__(self, ports: Iterable[int] = (5056,), known_servers: Iterable[str] = (),
+                 confirm_packets: int = 3, block_after: int = 20, max_blocked: int = 32,
+                 max_endpoints: int = 4096, endpoint_ttl: Optional[float] = 300.0):
+        self.ports = frozenset(ports)
+        self.confirm_packets = confirm_packets
+        self.block_after = block_after
+        self.max_blocked = max_blocked
+        self.max_endpoints = max_endpoints
+        self.endpoint_ttl = endpoint_ttl
+        # Kandidat per IP, berurutan menurut last_seen (paling lama di depan)
+        self._endpoints: "OrderedDict[str, _Endpoint]" = OrderedDict()
+        self.endpoints_expired = 0
+        self.servers: Dict[str, float] = {} # IP -> waktu pertama kali dikonfirmasi
+        self.blocked: Dict[str, float] = {}
+        now = time.time()
+        for ip in known_servers:
+            self.servers[ip] = now
+        self.changed = False # Di-set saat daftar tolak berubah; dibersihkan oleh build_filter()
+
+        self.accepted = 0 # Datagram yang lolos pemeriksaan bentuk
+        self.shape_rejected = 0 # Datagram yang ditolak di userspace karena bukan Photon
+        self.kernel_rejected = 0 # Perkiraan paket yang ditolak filter kernel (lihat update_kernel_counters)
+        self.filter_rebuilds = 0
+        self._last_interface_count: Optional[int] = None
+
+    def _server_side(self, datagram: UdpDatagram) -> Optional[str]:
+        if datagram.src_port in self.ports:
+            address = datagram.src
+        elif datagram.dst_port in self.ports:
+            address = datagram.dst
+        else:
+            return None
+        return str(ipaddress.ip_address(bytes(address)))
+
+    def observe(self, datagram: UdpDatagram) -> bool:
+        """Memeriksa satu datagram. Mengembalikan True jika payload-nya boleh diteruskan ke parser."""
+        ip = self._server_side(datagram)
+        if ip is None:
+            self.shape_rejected += 1
+            return False
+        is_photon = looks_like_photon(datagram.payload)
+        if ip in self.servers:
+            # Server yang sudah dikenal tidak dihitung ulang; cukup cek bentuk paketnya.
+            if is_photon:
+                self.accepted += 1
+            else:
+                self.shape_rejected += 1
+            return is_photon
+
+        now = time.time()
+        endpoints = self._endpoints
+        endpoint = endpoints.get(ip)
+        if endpoint is None:
+            self._expire_endpoints(now)
+            endpoint = endpoints[ip] = _Endpoint(now)
+        else:
+            endpoints.move_to_end(ip)
+        endpoint.last_seen = now
+        if not is_photon:
+            endpoint.rejected += 1
+            self.shape_rejected += 1
+            if (not endpoint.photon and endpoint.rejected >= self.block_after
+                    and ip not in self.blocked and len(self.blocked) < self.max_blocked):
+                self.blocked[ip] = now
+                self.changed = True
+                print(f"[*] Discovery: endpoint {ip} bukan server Photon, ditolak di filter kernel.")
+            return False
+
+        self.accepted += 1
+        endpoint.photon += 1
+        if endpoint.photon >= self.confirm_packets:
+            self.servers[ip] = now
+            self.blocked.pop(ip, None)
+            del self._endpoints[ip]
+            print(f"[*] Discovery: server Albion baru ditemukan: {ip}")
+        return True
+
+    def _expire_endpoints(self, now: float):
+        # Hanya dipanggil saat kandidat baru masuk; ujung depan adalah yang paling lama tidak terlihat.
+        endpoints = self._endpoints
+        if self.endpoint_ttl is not None:
+            deadline = now - self.endpoint_ttl
+            while endpoints:
+                ip, endpoint = next(iter(endpoints.items()))
+                if endpoint.last_seen >= deadline:
+                    break
+                del endpoints[ip]
+                self.endpoints_expired += 1
+        while len(endpoints) >= self.max_endpoints:
+            endpoints.popitem(last=False)
+            self.endpoints_expired += 1
+
+    def server_ips(self) -> List[str]:
+        return sorted(self.servers)
+
+    def ipv4_servers(self) -> List[str]:
+        return sorted(ip for ip in self.servers if ipaddress.ip_address(ip).version == 4)
+
+    def _ipv4_blocked(self) -> List[str]:
+        return sorted(ip for ip in self.blocked if ipaddress.ip_address(ip).version == 4)
+
+    def build_filter(self) -> List[Instruction]:
+        """
+        Filter kernel saat ini: semua UDP di port game kecuali endpoint yang sudah terbukti bukan
+        Photon. Server baru tetap terlihat, sedangkan sumber UDP lain di port yang sama tidak lagi
+        sampai ke userspace.
+        """
+        self.changed = False
+        self.filter_rebuilds += 1
+        return build_udp_filter(self.ports, exclude_hosts=self._ipv4_blocked())
+
+    def expression(self) -> str:
+        return filter_expression(self.ports, exclude_hosts=self._ipv4_blocked())
+
+    def update_kernel_counters(self, interface: str, socket_packets: int):
+        """
+        Memperbarui perkiraan paket yang ditolak filter kernel: selisih counter antarmuka
+        (/sys/class/net/<iface>/statistics) dikurangi paket yang diterima socket (PACKET_STATISTICS)
+        pada interval yang sama.
+        """
+        count = interface_packet_count(interface)
+        if count is None:
+            return
+        if self._last_interface_count is not None:
+            self.kernel_rejected += max(0, (count - self._last_interface_count) - socket_packets)
+        self._last_interface_count = count
+
+    def format_stats(self) -> str:
+        return (f"Server: {len(self.servers)} ({', '.join(self.server_ips()) or '-'}), "
+                f"Ditolak filter kernel: ~{self.kernel_rejected}, Ditolak bentuk Photon: {self.shape_rejected}, "
+                f"Lolos: {self.accepted}, Endpoint diblokir: {len(self.blocked)}, "
+                f"Kandidat: {len(self._endpoints)} (dibuang {self.endpoints_expired}), "
+                f"Filter dibangun ulang: {self.filter_rebuilds}x")
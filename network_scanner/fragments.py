@@ -0,0 +1,126 @@
+# file: network_scanner/fragments.py
+#
+# Reassembly command fragment Photon (tipe 8). Pesan reliable yang lebih besar dari MTU dipecah
+# menjadi beberapa fragmen; semua fragmen membawa start sequence number yang sama, total panjang
+# pesan, dan offset fragmen di dalam pesan.
+
+import struct
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+# Header fragmen setelah 12 byte header command:
+# start_sequence_number, fragment_count, fragment_number, total_length, fragment_offset
+FRAGMENT_HEADER = struct.Struct(">IIIII")
+
+
+class _PendingMessage:
+    __slots__ = ("buffer", "view", "received", "remaining", "fragment_count", "created")
+
+    def __init__(self, total_length: int, fragment_count: int, created: float):
+        self.buffer = bytearray(total_length) # Dialokasikan sekali; fragmen ditulis langsung ke posisinya
+        self.view = memoryview(self.buffer)
+        self.received = bytearray(fragment_count)
+        self.remaining = fragment_count
+        self.fragment_count = fragment_count
+        self.created = created
+
+
+class FragmentReassembler:
+    """
+    Menyusun ulang pesan terfragmentasi per (peer, channel, start_seq).
+
+    Memori dibatasi oleh `max_pending` pesan dan `max_pending_bytes` total buffer; pesan tertua
+    dibuang jika batas terlampaui, dan pesan yang tidak lengkap setelah `timeout` detik dibuang
+    (diperiksa secara malas setiap kali fragmen baru datang).
+    """
+    def __init__(self, max_pending: int = 64, max_pending_bytes: int = 4 * 1024 * 1024,
+                 timeout: float = 5.0, max_message_size: int = 1024 * 1024):
+        self.max_pending = max_pending
+        self.max_pending_bytes = max_pending_bytes
+        self.timeout = timeout
+        self.max_message_size = max_message_size
+        self._pending: "OrderedDict[tuple, _PendingMessage]" = OrderedDict()
+        self._pending_bytes = 0
+
+        self.completed = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.evicted_timeout = 0
+        self.evicted_capacity = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, peer: Hashable, channel: int, start_seq: int, fragment_count: int, fragment_number: int,
+            total_length: int, fragment_offset: int, data, now: Optional[float] = None) -> Optional[memoryview]:
+        """
+        Menambahkan satu fragmen. Mengembalikan memoryview pesan utuh saat fragmen terakhir masuk,
+        selain itu None.
+        """
+        now = time.monotonic() if now is None else now
+        self._evict_expired(now)
+
+        size = len(data)
+        if (fragment_count == 0 or fragment_number >= fragment_count or total_length == 0
+                or total_length > self.max_message_size or fragment_offset + size > total_length):
+            self.rejected += 1
+            return None
+
+        key = (peer, channel, start_seq)
+        pending = self._pending.get(key)
+        if pending is None:
+            if fragment_count == 1:
+                self.completed += 1
+                return memoryview(data) if size == total_length else None
+            self._make_room(total_length)
+            pending = _PendingMessage(total_length, fragment_count, now)
+            self._pending[key] = pending
+            self._pending_bytes += total_length
+        elif pending.fragment_count != fragment_count or len(pending.buffer) != total_length:
+            self.rejected += 1
+            return None
+
+        if pending.received[fragment_number]:
+            self.duplicates += 1 # Retransmit fragmen yang sama
+            return None
+        pending.view[fragment_offset:fragment_offset + size] = data
+        pending.received[fragment_number] = 1
+        pending.remaining -= 1
+        if pending.remaining:
+            return None
+
+        del self._pending[key]
+        self._pending_bytes -= total_length
+        self.completed += 1
+        return pending.view
+
+    def _evict_expired(self, now: float):
+        # OrderedDict terurut berdasarkan waktu pembuatan, jadi cukup periksa dari depan.
+        while self._pending:
+            key, oldest = next(iter(self._pending.items()))
+            if now - oldest.created < self.timeout:
+                break
+            self._drop(key)
+            self.evicted_timeout += 1
+
+    def _make_room(self, incoming_bytes: int):
+        while self._pending and (len(self._pending) >= self.max_pending
+                                 or self._pending_bytes + incoming_bytes > self.max_pending_bytes):
+            self._drop(next(iter(self._pending)))
+            self.evicted_capacity += 1
+
+    def _drop(self, key):
+        pending = self._pending.pop(key)
+        self._pending_bytes -= len(pending.buffer)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "pending_bytes": self._pending_bytes,
+            "completed": self.completed,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "evicted_timeout": self.evicted_timeout,
+            "evicted_capacity": self.evicted_capacity,
+        }
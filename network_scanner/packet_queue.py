@@ -0,0 +1,155 @@
+# file: network_scanner/packet_queue.py
+#
+# Antrean paket antara thread capture dan consumer. put() tidak pernah blok (thread capture
+# tidak boleh tertahan), get_batch() blok sampai ada data lalu mengambil banyak item sekaligus.
+# Saat penuh, kebijakan drop menentukan paket mana yang dikorbankan, dan semuanya dihitung.
+
+import itertools
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+# --- Jenis paket (ditentukan oleh producer, lihat sniffer.classify_payload) ---
+KIND_OTHER = 0
+KIND_ACK = 1 # Datagram yang hanya berisi ACK
+KIND_EVENT = 2 # Datagram yang membawa EventData (atau fragmen yang mungkin berisi event)
+
+# --- Kebijakan drop ---
+DROP_OLDEST = "drop-oldest"
+DROP_ACKS_FIRST = "drop-acks-first"
+NEVER_DROP_EVENTS = "never-drop-events"
+DROP_POLICIES = (DROP_OLDEST, DROP_ACKS_FIRST, NEVER_DROP_EVENTS)
+
+
+class PacketQueue:
+    """
+    Antrean terbatas dengan kebijakan drop:
+      - drop-oldest       : buang paket tertua, apa pun jenisnya.
+      - drop-acks-first   : buang ACK tertua dulu; jika tidak ada ACK, paket tertua.
+      - never-drop-events : buang paket non-event (ACK dulu) untuk memberi tempat event; paket event
+                            tidak pernah dibuang, sehingga antrean boleh melewati maxsize (dicatat
+                            sebagai 'overflow').
+    Urutan capture tetap terjaga: item diberi nomor urut dan get_batch menggabungkan sub-antrean
+    per jenis berdasarkan nomor tersebut.
+    """
+    def __init__(self, maxsize: int = 10000, policy: str = DROP_OLDEST):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Kebijakan drop tidak dikenal: {policy}. Pilihan: {', '.join(DROP_POLICIES)}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self._queues = {KIND_OTHER: deque(), KIND_ACK: deque(), KIND_EVENT: deque()}
+        self._size = 0
+        self._seq = itertools.count()
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+
+        self.enqueued = 0
+        self.processed = 0
+        self.overflow = 0
+        self.dropped = {KIND_OTHER: 0, KIND_ACK: 0, KIND_EVENT: 0}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def put(self, item: Any, kind: int = KIND_OTHER) -> bool:
+        """Menambahkan item tanpa pernah blok. Mengembalikan False jika item itu sendiri yang dibuang."""
+        with self._cond:
+            if self._closed:
+                return False
+            if self._size >= self.maxsize and not self._make_room(kind):
+                self.dropped[kind] += 1
+                return False
+            self._queues[kind].append((next(self._seq), item))
+            self._size += 1
+            self.enqueued += 1
+            self._cond.notify()
+            return True
+
+    def _make_room(self, incoming_kind: int) -> bool:
+        """Membuang satu item sesuai kebijakan. False berarti item yang datang harus dibuang."""
+        acks, others, events = self._queues[KIND_ACK], self._queues[KIND_OTHER], self._queues[KIND_EVENT]
+        if self.policy == DROP_OLDEST:
+            victim_kind = self._oldest_kind()
+        elif self.policy == DROP_ACKS_FIRST:
+            victim_kind = KIND_ACK if acks else self._oldest_kind()
+        else: # NEVER_DROP_EVENTS
+            if acks:
+                victim_kind = KIND_ACK
+            elif others:
+                victim_kind = KIND_OTHER
+            elif incoming_kind == KIND_EVENT:
+                self.overflow += 1
+                return True
+            else:
+                return False
+        self._queues[victim_kind].popleft()
+        self._size -= 1
+        self.dropped[victim_kind] += 1
+        return True
+
+    def _oldest_kind(self) -> int:
+        oldest_kind, oldest_seq = KIND_OTHER, None
+        for kind, q in self._queues.items():
+            if q and (oldest_seq is None or q[0][0] < oldest_seq):
+                oldest_kind, oldest_seq = kind, q[0][0]
+        return oldest_kind
+
+    def get_batch(self, max_items: int = 256, timeout: Optional[float] = None) -> List[Any]:
+        """
+        Blok sampai minimal satu item tersedia (atau timeout / close), lalu mengambil hingga
+        `max_items` item dalam urutan capture. List kosong berarti timeout atau antrean ditutup.
+        """
+        with self._cond:
+            if not self._size and not self._closed:
+                self._cond.wait_for(lambda: self._size or self._closed, timeout)
+            batch = []
+            non_empty = [q for q in self._queues.values() if q]
+            while len(batch) < max_items and non_empty:
+                if len(non_empty) == 1:
+                    q = non_empty[0]
+                    take = min(max_items - len(batch), len(q))
+                    batch.extend(q.popleft()[1] for _ in range(take))
+                    break
+                q = min(non_empty, key=lambda d: d[0][0])
+                batch.append(q.popleft()[1])
+                if not q:
+                    non_empty.remove(q)
+            self._size -= len(batch)
+            return batch
+
+    def task_done(self, count: int = 1):
+        """Dipanggil consumer setelah `count` item selesai diproses."""
+        with self._cond:
+            self.processed += count
+
+    def close(self):
+        """Menolak put() berikutnya dan membangunkan consumer yang sedang menunggu."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "enqueued": self.enqueued,
+                "processed": self.processed,
+                "queued": self._size,
+                "dropped": sum(self.dropped.values()),
+                "dropped_acks": self.dropped[KIND_ACK],
+                "dropped_events": self.dropped[KIND_EVENT],
+                "dropped_other": self.dropped[KIND_OTHER],
+                "overflow": self.overflow,
+            }
+
+    def format_stats(self) -> str:
+        s = self.stats()
+        return (f"Masuk: {s['enqueued']}, Diproses: {s['processed']}, Antre: {s['queued']}, "
+                f"Drop: {s['dropped']} (ACK {s['dropped_acks']}, Event {s['dropped_events']}, Lain {s['dropped_other']}), "
+                f"Overflow: {s['overflow']}")
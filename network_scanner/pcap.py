@@ -0,0 +1,152 @@
+# file: network_scanner/pcap.py
+
+import mmap
+import struct
+from typing import Iterator, Optional, Tuple
+
+# --- Magic number format file ---
+PCAP_MAGIC_USEC = 0xa1b2c3d4
+PCAP_MAGIC_NSEC = 0xa1b23c4d
+PCAPNG_BLOCK_SHB = 0x0A0D0D0A
+PCAPNG_BYTE_ORDER_MAGIC = 0x1A2B3C4D
+
+# --- Tipe blok pcapng yang kita pedulikan ---
+PCAPNG_BLOCK_IDB = 0x00000001
+PCAPNG_BLOCK_OPB = 0x00000002 # Packet Block (usang, tapi masih ditulis tool lama)
+PCAPNG_BLOCK_SPB = 0x00000003
+PCAPNG_BLOCK_EPB = 0x00000006
+
+PCAPNG_OPT_ENDOFOPT = 0
+PCAPNG_OPT_IF_TSRESOL = 9
+
+
+class PcapFormatError(ValueError):
+    """Dilempar jika file bukan pcap/pcapng yang valid atau terpotong di tengah header."""
+
+
+class PcapReader:
+    """
+    Pembaca file pcap dan pcapng murni Python, tanpa scapy.
+    File di-mmap sehingga setiap frame yang dihasilkan adalah memoryview ke isi file
+    (tanpa salinan). View tersebut hanya valid selama reader belum ditutup.
+
+    Iterasi menghasilkan tuple (timestamp_epoch, linktype, frame).
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mm: Optional[mmap.mmap] = None
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mm)
+        except ValueError: # File kosong tidak bisa di-mmap
+            self._view = memoryview(b"")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        try:
+            self._view.release()
+            if self._mm is not None:
+                self._mm.close()
+        except BufferError:
+            # Masih ada frame (memoryview) yang dipegang pemanggil; biarkan GC yang menutup mmap.
+            pass
+        self._file.close()
+
+    def __iter__(self) -> Iterator[Tuple[float, int, memoryview]]:
+        data = self._view
+        if len(data) < 4:
+            return
+        if struct.unpack_from("<I", data, 0)[0] == PCAPNG_BLOCK_SHB:
+            yield from self._iter_pcapng(data)
+        else:
+            yield from self._iter_pcap(data)
+
+    def _iter_pcap(self, data: memoryview) -> Iterator[Tuple[float, int, memoryview]]:
+        if len(data) < 24:
+            raise PcapFormatError(f"Header global pcap terpotong: {self.path}")
+        for endian in ("<", ">"):
+            magic = struct.unpack_from(endian + "I", data, 0)[0]
+            if magic in (PCAP_MAGIC_USEC, PCAP_MAGIC_NSEC):
+                break
+        else:
+            raise PcapFormatError(f"Magic number pcap tidak dikenal di '{self.path}'.")
+
+        divisor = 1e9 if magic == PCAP_MAGIC_NSEC else 1e6
+        linktype = struct.unpack_from(endian + "I", data, 20)[0] & 0x0FFFFFFF # 4 bit atas = FCS info
+        record_header = struct.Struct(endian + "IIII")
+        offset = 24
+        end = len(data)
+        while offset + 16 <= end:
+            ts_sec, ts_frac, incl_len, _orig_len = record_header.unpack_from(data, offset)
+            offset += 16
+            if offset + incl_len > end: # Record terakhir terpotong (capture dihentikan paksa)
+                break
+            yield ts_sec + ts_frac / divisor, linktype, data[offset:offset + incl_len]
+            offset += incl_len
+
+    def _iter_pcapng(self, data: memoryview) -> Iterator[Tuple[float, int, memoryview]]:
+        end = len(data)
+        offset = 0
+        endian = "<"
+        interfaces = [] # list of (linktype, snaplen, ts_divisor)
+
+        while offset + 12 <= end:
+            block_type = struct.unpack_from(endian + "I", data, offset)[0]
+            if block_type == PCAPNG_BLOCK_SHB:
+                # Urutan byte ditentukan ulang di setiap Section Header Block.
+                bom = data[offset + 8:offset + 12].tobytes()
+                endian = "<" if struct.unpack("<I", bom)[0] == PCAPNG_BYTE_ORDER_MAGIC else ">"
+                interfaces = []
+            block_len = struct.unpack_from(endian + "I", data, offset + 4)[0]
+            if block_len < 12 or offset + block_len > end:
+                break # Blok terpotong di akhir file
+            body = offset + 8
+            body_end = offset + block_len - 4
+
+            if block_type == PCAPNG_BLOCK_IDB:
+                linktype, _reserved, snaplen = struct.unpack_from(endian + "HHI", data, body)
+                interfaces.append((linktype, snaplen, self._read_tsresol(data, body + 8, body_end, endian)))
+            elif block_type == PCAPNG_BLOCK_EPB:
+                if_id, ts_high, ts_low, cap_len, _orig = struct.unpack_from(endian + "IIIII", data, body)
+                if if_id < len(interfaces):
+                    linktype, _snaplen, divisor = interfaces[if_id]
+                    start = body + 20
+                    yield ((ts_high << 32) | ts_low) / divisor, linktype, data[start:start + cap_len]
+            elif block_type == PCAPNG_BLOCK_SPB:
+                if interfaces:
+                    linktype, snaplen, _divisor = interfaces[0]
+                    orig_len = struct.unpack_from(endian + "I", data, body)[0]
+                    cap_len = min(orig_len, body_end - body - 4)
+                    if snaplen:
+                        cap_len = min(cap_len, snaplen)
+                    # SPB tidak membawa timestamp; gunakan 0.0 agar replay tetap berjalan.
+                    yield 0.0, linktype, data[body + 4:body + 4 + cap_len]
+            elif block_type == PCAPNG_BLOCK_OPB:
+                if_id, _drops, ts_high, ts_low, cap_len, _orig = struct.unpack_from(endian + "HHIIII", data, body)
+                if if_id < len(interfaces):
+                    linktype, _snaplen, divisor = interfaces[if_id]
+                    start = body + 20
+                    yield ((ts_high << 32) | ts_low) / divisor, linktype, data[start:start + cap_len]
+
+            offset += block_len
+
+    @staticmethod
+    def _read_tsresol(data: memoryview, offset: int, end: int, endian: str) -> float:
+        """Membaca opsi if_tsresol dari IDB. Default pcapng adalah mikrodetik."""
+        while offset + 4 <= end:
+            code, length = struct.unpack_from(endian + "HH", data, offset)
+            if code == PCAPNG_OPT_ENDOFOPT:
+                break
+            if code == PCAPNG_OPT_IF_TSRESOL and length >= 1:
+                resol = data[offset + 4]
+                if resol & 0x80:
+                    return float(2 ** (resol & 0x7F))
+                return float(10 ** resol)
+            offset += 4 + ((length + 3) & ~3)
+        return 1e6
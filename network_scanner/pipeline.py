@@ -0,0 +1,445 @@
+# file: network_scanner/pipeline.py
+#
+# Mode pipeline multi-proses:
+#
+#   [proses capture] --ring shared_memory--> [N proses decoder PhotonParser] --Queue--> [reorder] --> consumer
+#
+# Proses capture menjalankan PacketSniffer (atau membaca file pcap), menyusun ulang fragmen, lalu
+# menulis setiap body pesan Photon ke slot ring di multiprocessing.shared_memory. Pesan ke-`seq`
+# selalu ditangani worker `seq % N`, sehingga tiap worker cukup membaca slot miliknya secara
+# berurutan tanpa koordinasi antar-worker. Hasil decode dikirim kembali bersama `seq`, dan tahap
+# reorder di proses utama mengembalikan event ke urutan capture sebelum diberikan ke consumer.
+#
+# Worker hanya men-decode (PhotonParser dengan correlate=False). State per entitas (EntityTracker
+# untuk melengkapi CharacterDeath/ChestOpened, reset saat Join) hanya ada di proses utama dan
+# diterapkan setelah reorder, karena pesan satu entitas tersebar ke semua worker. PlayerMovement
+# dan HealthUpdate tidak di-decode di mode ini (MovementTracker/HealthAggregator membutuhkan
+# body pesan di proses yang memegang state); gunakan replay atau sniffer satu proses untuk itu.
+#
+#   python -m network_scanner.pipeline --workers 4 --pcap sesi_dungeon.pcapng
+
+import argparse
+import multiprocessing
+import os
+import queue
+import struct
+import sys
+import time
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Iterator, List, Optional, Sequence
+
+from .decap import udp_datagram
+from .fragments import FragmentReassembler
+from .packet_queue import DROP_OLDEST, PacketQueue
+from .pcap import PcapReader
+from .sequence import ReliableSequenceTracker, connection_key
+from .sniffer import PacketSniffer, iter_photon_messages
+
+# --- Layout shared memory ---
+# Header ring: write_seq (Q), dropped_full (Q), overflowed (Q), lalu consumed[worker] (Q per worker)
+_RING_HEADER = struct.Struct("QQQ")
+_COUNTER = struct.Struct("Q")
+# Header slot: seq (Q), capture_ts (d), length (I), flags (I)
+_SLOT_HEADER = struct.Struct("QdII")
+SLOT_FLAG_OVERFLOW = 1 # Body terlalu besar untuk slot, dikirim lewat antrean overflow worker
+
+_RESULT_BATCH = 64
+
+
+@dataclass
+class PcapSource:
+    """Sumber paket dari file pcap/pcapng (untuk benchmark dan reproduksi tanpa klien game)."""
+    paths: Sequence[str]
+    ports: Sequence[int] = (5056,)
+    blocking = True # File bisa menunggu decoder; tidak ada paket yang hilang karena ring penuh
+
+    def run(self, publish, stop_event):
+        reassembler = FragmentReassembler()
+        sequences = ReliableSequenceTracker()
+        ports = frozenset(self.ports)
+        for path in self.paths:
+            with PcapReader(path) as reader:
+                for ts, linktype, frame in reader:
+                    if stop_event.is_set():
+                        return
+                    datagram = udp_datagram(frame, linktype)
+                    if datagram is None or (datagram.src_port not in ports and datagram.dst_port not in ports):
+                        continue
+                    peer = connection_key(datagram)
+                    for _cmd_type, body in iter_photon_messages(datagram.payload, reassembler, peer, sequences):
+                        publish(ts, body)
+
+
+@dataclass
+class LiveSource:
+    """Sumber paket dari PacketSniffer (scapy atau afpacket) yang berjalan di proses capture."""
+    interface_name: str
+    bpf_filter: str
+    backend: str = "scapy"
+    bpf_program: Optional[list] = None
+    queue_size: int = 10000
+    drop_policy: str = DROP_OLDEST
+    blocking = False # Capture live tidak boleh tertahan; pesan di-drop (dan dihitung) saat ring penuh
+
+    def run(self, publish, stop_event):
+        packet_queue = PacketQueue(maxsize=self.queue_size, policy=self.drop_policy)
+        sniffer = PacketSniffer(packet_queue, self.bpf_filter, self.interface_name,
+                                backend=self.backend, bpf_program=self.bpf_program)
+        sniffer.start()
+        reassembler = FragmentReassembler()
+        sequences = ReliableSequenceTracker()
+        try:
+            while not stop_event.is_set() and (sniffer.is_alive() or not packet_queue.empty()):
+                batch = packet_queue.get_batch(max_items=256, timeout=0.2)
+                for ts, peer, payload in batch:
+                    for _cmd_type, body in iter_photon_messages(payload, reassembler, peer, sequences):
+                        publish(ts, body)
+                packet_queue.task_done(len(batch))
+        finally:
+            sniffer.stop()
+            sniffer.join(timeout=5)
+            print(f"[*] Statistik antrean capture: {packet_queue.format_stats()}")
+            print(f"[*] Statistik reliable sequence: {sequences.format_stats()}")
+
+
+class _RingLayout:
+    def __init__(self, slots: int, slot_size: int, workers: int):
+        self.slots = slots
+        self.slot_size = slot_size
+        self.workers = workers
+        self.max_body = slot_size - _SLOT_HEADER.size
+        self.consumed_offset = _RING_HEADER.size
+        self.slots_offset = self.consumed_offset + _COUNTER.size * workers
+        self.total_size = self.slots_offset + slots * slot_size
+
+    def slot_offset(self, seq: int) -> int:
+        return self.slots_offset + (seq % self.slots) * self.slot_size
+
+    def consumed_at(self, worker: int) -> int:
+        return self.consumed_offset + worker * _COUNTER.size
+
+
+def _capture_main(source, shm_name: str, layout: _RingLayout, semaphores, overflow_queues,
+                  stop_event, capture_done):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buf = shm.buf
+    state = {"seq": 0, "dropped_full": 0, "overflowed": 0}
+    blocking = getattr(source, "blocking", False)
+
+    def publish(ts: float, body):
+        seq = state["seq"]
+        # Slot ini sebelumnya berisi seq - slots; hanya boleh ditimpa jika pemiliknya sudah memprosesnya.
+        previous = seq - layout.slots
+        if previous >= 0:
+            owner_offset = layout.consumed_at(previous % layout.workers)
+            owner_index = previous // layout.workers
+            while blocking and _COUNTER.unpack_from(buf, owner_offset)[0] <= owner_index:
+                if stop_event.wait(0.0005):
+                    return
+            if _COUNTER.unpack_from(buf, owner_offset)[0] <= owner_index:
+                state["dropped_full"] += 1
+                _COUNTER.pack_into(buf, 8, state["dropped_full"])
+                return
+
+        offset = layout.slot_offset(seq)
+        worker = seq % layout.workers
+        length = len(body)
+        if length <= layout.max_body:
+            _SLOT_HEADER.pack_into(buf, offset, seq, ts, length, 0)
+            start = offset + _SLOT_HEADER.size
+            buf[start:start + length] = body
+        else:
+            _SLOT_HEADER.pack_into(buf, offset, seq, ts, length, SLOT_FLAG_OVERFLOW)
+            overflow_queues[worker].put(bytes(body))
+            state["overflowed"] += 1
+            _COUNTER.pack_into(buf, 16, state["overflowed"])
+        state["seq"] = seq + 1
+        _COUNTER.pack_into(buf, 0, seq + 1)
+        semaphores[worker].release()
+
+    try:
+        source.run(publish, stop_event)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        capture_done.set()
+        # Bangunkan semua worker agar bisa melihat capture_done.
+        for sem in semaphores:
+            sem.release()
+        del buf
+        shm.close()
+
+
+def _decoder_main(worker: int, shm_name: str, layout: _RingLayout, semaphore, overflow_queue,
+                  results, stop_event, capture_done, database_path: str):
+    from scanner import PhotonParser # Diimpor di proses worker (mode spawn di Windows)
+
+    parser = PhotonParser(database_path=database_path, correlate=False)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buf = shm.buf
+    k = 0 # Pesan ke-k milik worker ini = seq worker + k * workers
+    pending: List[tuple] = []
+    try:
+        while not stop_event.is_set():
+            if not semaphore.acquire(block=False):
+                if pending:
+                    results.put(pending)
+                    pending = []
+                if not semaphore.acquire(timeout=0.2):
+                    continue
+            seq = worker + k * layout.workers
+            if seq >= _COUNTER.unpack_from(buf, 0)[0]:
+                # Release dari capture_done, bukan pesan baru.
+                if capture_done.is_set():
+                    break
+                continue
+
+            offset = layout.slot_offset(seq)
+            slot_seq, ts, length, flags = _SLOT_HEADER.unpack_from(buf, offset)
+            if flags & SLOT_FLAG_OVERFLOW:
+                body = overflow_queue.get()
+            else:
+                start = offset + _SLOT_HEADER.size
+                body = bytes(buf[start:start + length])
+            k += 1
+            _COUNTER.pack_into(buf, layout.consumed_at(worker), k)
+
+            event = parser.parse_message(body, ts) if slot_seq == seq else None
+            pending.append((seq, ts, event))
+            if len(pending) >= _RESULT_BATCH:
+                results.put(pending)
+                pending = []
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if pending:
+            results.put(pending)
+        parser.close() # Proses worker keluar tanpa atexit; tulis sisa laporan diagnostik
+        results.put(("done", worker))
+        del buf
+        shm.close()
+
+
+class ReorderBuffer:
+    """
+    Mengembalikan hasil worker ke urutan seq. Jika seq berikutnya (kepala) tidak datang dalam `timeout`
+    detik (worker mati/tertahan), seq yang hilang dilewati sampai seq terkecil yang tertunda. Timer
+    dihitung per kepala: selama next_seq terus maju, tidak ada yang dilewati.
+    next_seq hanya pernah maju: hasil dengan seq yang sudah dilewati dibuang dan dihitung `late`.
+    """
+    def __init__(self, timeout: float = 2.0):
+        self.timeout = timeout
+        self.next_seq = 0
+        self.skipped = 0
+        self.late = 0
+        self._pending = {}
+        self._stalled_since: Optional[float] = None
+        self._stalled_seq = -1 # next_seq saat _stalled_since dicatat
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, seq: int, item) -> bool:
+        if seq < self.next_seq:
+            # Seq ini sudah dilewati (atau sudah diberikan); menyisipkannya sekarang merusak urutan.
+            self.late += 1
+            return False
+        self._pending[seq] = item
+        return True
+
+    def ready(self) -> Iterator[object]:
+        """Item berurutan mulai next_seq sampai celah pertama."""
+        pending = self._pending
+        while self.next_seq in pending:
+            item = pending.pop(self.next_seq)
+            self.next_seq += 1
+            yield item
+
+    def check_stall(self, now: float) -> int:
+        """Melewati celah di depan jika sudah tertahan lebih dari timeout; mengembalikan jumlah seq yang dilewati."""
+        if not self._pending:
+            self._stalled_since = None
+            return 0
+        if self._stalled_since is None or self._stalled_seq != self.next_seq:
+            # Kepala baru (atau baru mulai tertahan): mulai hitung dari sekarang
+            self._stalled_since, self._stalled_seq = now, self.next_seq
+            return 0
+        if now - self._stalled_since <= self.timeout:
+            return 0
+        self._stalled_since = None
+        # Semua seq tertunda >= next_seq (yang lebih kecil ditolak add), jadi hanya maju.
+        skip_to = min(self._pending)
+        skipped = skip_to - self.next_seq
+        self.skipped += skipped
+        self.next_seq = skip_to
+        return skipped
+
+    def drain(self) -> Iterator[object]:
+        """Sisa item (saat semua worker selesai) dalam urutan seq, melewati celah yang tersisa."""
+        for seq in sorted(self._pending):
+            self.skipped += seq - self.next_seq
+            self.next_seq = seq + 1
+            yield self._pending.pop(seq)
+
+
+@dataclass
+class PipelineStats:
+    messages: int = 0
+    events: int = 0
+    dropped_full: int = 0
+    overflowed: int = 0 # Pesan yang lebih besar dari slot (dikirim lewat antrean overflow)
+    reorder_skipped: int = 0 # Seq yang dilewati karena worker tidak mengirim hasil dalam reorder_timeout
+    reorder_late: int = 0 # Hasil yang datang setelah seq-nya dilewati (dibuang agar urutan tetap terjaga)
+    elapsed: float = 0.0
+    started: float = field(default_factory=time.perf_counter)
+
+    def __str__(self):
+        rate = self.messages / self.elapsed if self.elapsed > 0 else 0.0
+        return (f"Pesan: {self.messages}, GameEvent: {self.events}, Drop (ring penuh): {self.dropped_full}, "
+                f"Overflow slot: {self.overflowed}, "
+                f"Dilewati reorder: {self.reorder_skipped}, Terlambat: {self.reorder_late} | {self.elapsed:.3f}s, {rate:,.0f} pesan/s")
+
+
+class MultiProcessPipeline:
+    """
+    Menjalankan capture di proses tersendiri dan decode di `workers` proses PhotonParser.
+    Gunakan sebagai context manager, lalu iterasi `events()` untuk GameEvent dalam urutan capture.
+    """
+    def __init__(self, source, workers: Optional[int] = None, slots: int = 8192, slot_size: int = 2048,
+                 database_path: str = "database.json", reorder_timeout: float = 2.0, parser=None):
+        self.source = source
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.layout = _RingLayout(slots, slot_size, self.workers)
+        self.database_path = database_path
+        self.reorder_timeout = reorder_timeout
+        # PhotonParser di proses utama yang memegang state entitas; correlate() dipanggil per event
+        # dalam urutan capture. Default: parser baru dengan EntityTracker bawaan.
+        self.parser = parser
+        self.stats = PipelineStats()
+        self._ctx = multiprocessing.get_context()
+        self._processes: List[multiprocessing.Process] = []
+        self._shm: Optional[shared_memory.SharedMemory] = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self):
+        if self.parser is None:
+            from scanner import PhotonParser
+            self.parser = PhotonParser(database_path=self.database_path)
+        ctx = self._ctx
+        self._shm = shared_memory.SharedMemory(create=True, size=self.layout.total_size)
+        self._shm.buf[:self.layout.slots_offset] = bytes(self.layout.slots_offset)
+        self._stop_event = ctx.Event()
+        self._capture_done = ctx.Event()
+        self._results = ctx.Queue()
+        semaphores = [ctx.Semaphore(0) for _ in range(self.workers)]
+        overflow_queues = [ctx.Queue() for _ in range(self.workers)]
+
+        for worker in range(self.workers):
+            self._processes.append(ctx.Process(
+                target=_decoder_main, name=f"photon-decoder-{worker}", daemon=True,
+                args=(worker, self._shm.name, self.layout, semaphores[worker], overflow_queues[worker],
+                      self._results, self._stop_event, self._capture_done, self.database_path)))
+        self._processes.append(ctx.Process(
+            target=_capture_main, name="photon-capture", daemon=True,
+            args=(self.source, self._shm.name, self.layout, semaphores, overflow_queues,
+                  self._stop_event, self._capture_done)))
+        self.stats = PipelineStats()
+        for process in self._processes:
+            process.start()
+
+    def events(self) -> Iterator[object]:
+        """Menghasilkan GameEvent dalam urutan capture sampai sumber habis atau stop() dipanggil."""
+        correlate = self.parser.correlate
+        reorder = ReorderBuffer(self.reorder_timeout)
+        stats = self.stats
+        workers_done = 0
+        while workers_done < self.workers:
+            try:
+                batch = self._results.get(timeout=0.2)
+            except queue.Empty:
+                batch = []
+            if isinstance(batch, tuple): # ("done", worker)
+                workers_done += 1
+                batch = []
+            for seq, ts, event in batch:
+                reorder.add(seq, event)
+
+            for event in reorder.ready():
+                stats.messages += 1
+                if event is not None:
+                    stats.events += 1
+                    yield correlate(event)
+            # Worker yang mati meninggalkan lubang; jangan tahan event lain selamanya.
+            reorder.check_stall(time.monotonic())
+            stats.reorder_skipped, stats.reorder_late = reorder.skipped, reorder.late
+
+        for event in reorder.drain():
+            stats.messages += 1
+            if event is not None:
+                stats.events += 1
+                yield correlate(event)
+        stats.reorder_skipped, stats.reorder_late = reorder.skipped, reorder.late
+        stats.elapsed = time.perf_counter() - stats.started
+
+    def stop(self):
+        if self._shm is None:
+            return
+        self._stop_event.set()
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        _write_seq, self.stats.dropped_full, self.stats.overflowed = _RING_HEADER.unpack_from(self._shm.buf, 0)
+        if not self.stats.elapsed:
+            self.stats.elapsed = time.perf_counter() - self.stats.started
+        self._processes = []
+        if self.parser is not None:
+            self.parser.close()
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    cli = argparse.ArgumentParser(description="Pipeline capture/decode multi-proses lewat ring shared memory.")
+    cli.add_argument("--workers", type=int, default=None, help="Jumlah proses decoder (default: jumlah core - 1)")
+    cli.add_argument("--pcap", nargs="+", help="Baca dari file pcap/pcapng alih-alih capture live")
+    cli.add_argument("--interface", help="Antarmuka untuk capture live")
+    cli.add_argument("--backend", choices=["scapy", "afpacket"], default="scapy")
+    cli.add_argument("--database", default="database.json")
+    cli.add_argument("--quiet", action="store_true", help="Jangan cetak setiap event")
+    args = cli.parse_args(argv)
+
+    from .bpf import build_udp_filter, filter_expression
+    if args.pcap:
+        source = PcapSource(args.pcap)
+    elif args.interface:
+        ports = [5056]
+        source = LiveSource(args.interface, filter_expression(ports), backend=args.backend,
+                            bpf_program=build_udp_filter(ports))
+    else:
+        print("[!] Berikan --pcap atau --interface.")
+        return 1
+
+    pipeline = MultiProcessPipeline(source, workers=args.workers, database_path=args.database)
+    print(f"[*] Pipeline dimulai dengan {pipeline.workers} worker decoder.")
+    try:
+        with pipeline:
+            for event in pipeline.events():
+                if not args.quiet:
+                    print(event)
+    except KeyboardInterrupt:
+        print("\n[*] Pipeline dihentikan oleh pengguna.")
+    print(f"[*] Selesai. {pipeline.stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+# file: network_scanner/replay.py
+#
+# Replay file pcap/pcapng melalui pipeline capture -> parse yang sama dengan sniffer live,
+# tanpa scapy dan tanpa klien game. Contoh:
+#   python -m network_scanner.replay sesi_dungeon.pcapng                # secepat mungkin
+#   python -m network_scanner.replay sesi_dungeon.pcapng --speed 2 --parse
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass, field
+from threading import Event
+from typing import Callable, Iterable, Optional, Sequence
+
+from .decap import udp_datagram
+from .fragments import FragmentReassembler
+from .pcap import PcapReader
+from .sequence import ReliableSequenceTracker, connection_key
+from .sniffer import PHOTON_MSG_TYPE_EVENT, extract_structured_photon_data, iter_photon_messages
+
+
+@dataclass
+class ReplayStats:
+    """
+    Statistik satu kali replay. Laju dihitung dari waktu dinding (bukan waktu capture); laju decode
+    tidak termasuk waktu ekstraksi command, yang dilaporkan terpisah.
+    """
+    frames: int = 0
+    packets: int = 0 # Datagram UDP Photon yang lolos filter port
+    commands: int = 0 # Command terstruktur (hanya jika ekstraksi command aktif)
+    events: int = 0 # Pesan EventData Photon (tipe 4)
+    game_events: int = 0 # GameEvent yang dihasilkan PhotonParser (hanya jika parser dipakai)
+    reassembled: int = 0 # Pesan utuh dari command fragmen (tipe 8)
+    retransmits: int = 0 # Command reliable/fragmen kiriman ulang yang dibuang sebelum decode
+    lost: int = 0 # Reliable sequence yang tidak pernah terlihat (kehilangan di capture)
+    payload_bytes: int = 0
+    capture_span: float = 0.0
+    elapsed: float = field(default=0.0)
+    extract_elapsed: float = 0.0 # Waktu di ekstraksi command terstruktur (jalur logging sniffer)
+
+    @property
+    def decode_elapsed(self) -> float:
+        """Waktu replay tanpa ekstraksi command; dasar laju paket/event jalur decode."""
+        return self.elapsed - self.extract_elapsed
+
+    @property
+    def packets_per_sec(self) -> float:
+        return self.packets / self.decode_elapsed if self.decode_elapsed > 0 else 0.0
+
+    @property
+    def events_per_sec(self) -> float:
+        return self.events / self.decode_elapsed if self.decode_elapsed > 0 else 0.0
+
+    def __str__(self):
+        text = (f"Frame: {self.frames}, Paket Photon: {self.packets}, "
+                f"Event: {self.events}, GameEvent: {self.game_events}, Reassembly: {self.reassembled}, "
+                f"Kiriman ulang: {self.retransmits}, Hilang: {self.lost}, Byte: {self.payload_bytes} | "
+                f"Durasi capture: {self.capture_span:.2f}s, Durasi replay: {self.elapsed:.3f}s | "
+                f"Decode: {self.packets_per_sec:,.0f} paket/s, {self.events_per_sec:,.0f} event/s")
+        if self.extract_elapsed:
+            rate = self.packets / self.extract_elapsed
+            text += f" | Ekstraksi command: {self.commands} command, {self.extract_elapsed:.3f}s, {rate:,.0f} paket/s"
+        return text
+
+
+class PcapReplay:
+    """
+    Memutar ulang satu atau beberapa file capture ke iter_photon_messages dan (opsional)
+    PhotonParser.parse_message.
+
+    Ekstraksi command terstruktur (extract_structured_photon_data, jalur logging sniffer) hanya
+    dijalankan jika `extract_commands` atau `on_packet` diberikan. Jalur itu men-decode ulang datagram
+    yang sama, jadi waktunya dicatat terpisah (extract_elapsed) dan tidak ikut laju decode.
+
+    speed=None (atau 0) memutar secepat mungkin; speed=1.0 mengikuti jeda timestamp capture
+    asli, speed=2.0 dua kali lebih cepat, dst.
+    """
+    def __init__(self, paths: Sequence[str], speed: Optional[float] = None, ports: Iterable[int] = (5056,),
+                 parser=None, extract_commands: bool = False,
+                 on_packet: Optional[Callable[[float, memoryview, list], None]] = None,
+                 on_event: Optional[Callable[[object], None]] = None):
+        self.paths = list(paths)
+        self.speed = speed if speed and speed > 0 else None
+        self.ports = frozenset(ports)
+        self.parser = parser
+        self.on_packet = on_packet
+        self.on_event = on_event
+        self.extract_commands = extract_commands or on_packet is not None
+        self.stop_event = Event()
+        self.stats = ReplayStats() # Statistik replay terakhir; tetap terisi sebagian jika run() terputus
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self) -> ReplayStats:
+        stats = self.stats = ReplayStats()
+        self.stop_event.clear() # Objek replay boleh dipakai ulang setelah stop()
+        # State reassembly/sequence per run. Jalur ekstraksi command punya state sendiri karena
+        # melihat datagram yang sama dengan jalur decode.
+        self._message_reassembler = FragmentReassembler()
+        self._message_sequences = ReliableSequenceTracker()
+        self._command_reassembler = FragmentReassembler()
+        self._command_sequences = ReliableSequenceTracker()
+        first_ts = last_ts = None
+        wall_start = time.perf_counter()
+
+        try:
+            for path in self.paths:
+                if self.stop_event.is_set():
+                    break
+                with PcapReader(path) as reader:
+                    for ts, linktype, frame in reader:
+                        if self.stop_event.is_set():
+                            break
+                        stats.frames += 1
+                        if first_ts is None:
+                            first_ts = ts
+                        last_ts = ts
+
+                        if self.speed is not None:
+                            delay = wall_start + (ts - first_ts) / self.speed - time.perf_counter()
+                            if delay > 0 and self.stop_event.wait(delay):
+                                break
+
+                        datagram = udp_datagram(frame, linktype)
+                        if datagram is None or (datagram.src_port not in self.ports and datagram.dst_port not in self.ports):
+                            continue
+                        self._process_payload(ts, connection_key(datagram), datagram.payload, stats)
+        finally:
+            # Juga saat terputus (Ctrl+C, file rusak): statistik sampai titik itu tetap lengkap
+            stats.elapsed = time.perf_counter() - wall_start
+            stats.reassembled = self._message_reassembler.completed
+            stats.retransmits = self._message_sequences.duplicates + self._message_sequences.stale
+            stats.lost = self._message_sequences.lost
+            if first_ts is not None:
+                stats.capture_span = last_ts - first_ts
+        return stats
+
+    def _process_payload(self, ts: float, peer, payload: memoryview, stats: ReplayStats):
+        stats.packets += 1
+        stats.payload_bytes += len(payload)
+        if self.extract_commands:
+            extract_start = time.perf_counter()
+            parsed_commands = extract_structured_photon_data(payload, self._command_reassembler, peer, self._command_sequences)
+            stats.extract_elapsed += time.perf_counter() - extract_start
+            stats.commands += len(parsed_commands)
+            if self.on_packet:
+                self.on_packet(ts, payload, parsed_commands)
+
+        for _cmd_type, body in iter_photon_messages(payload, self._message_reassembler, peer, self._message_sequences):
+            if body[0] & 0x7F == PHOTON_MSG_TYPE_EVENT: # Bit 0x80 = flag enkripsi
+                stats.events += 1
+            if self.parser is not None:
+                game_event = self.parser.parse_message(bytes(body), ts)
+                if game_event is not None:
+                    stats.game_events += 1
+                    if self.on_event:
+                        self.on_event(game_event)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Replay file pcap/pcapng ke pipeline parser Photon (tanpa scapy).")
+    arg_parser.add_argument("files", nargs="+", help="File .pcap atau .pcapng")
+    arg_parser.add_argument("--speed", type=float, default=None,
+                            help="Pengali kecepatan terhadap timestamp capture asli (default: secepat mungkin)")
+    arg_parser.add_argument("--port", type=int, action="append", dest="ports",
+                            help="Port UDP game (boleh diulang, default 5056)")
+    arg_parser.add_argument("--parse", action="store_true", help="Jalankan juga PhotonParser.parse_message")
+    arg_parser.add_argument("--commands", action="store_true",
+                            help="Jalankan juga ekstraksi command terstruktur sniffer (diukur terpisah)")
+    arg_parser.add_argument("--database", default="database.json", help="Path database.json untuk PhotonParser")
+    arg_parser.add_argument("--all-events", action="store_true",
+                            help="Decode semua event/response, bukan hanya kode yang punya handler")
+    arg_parser.add_argument("--raw-parameters", type=float, default=0.0, metavar="RASIO",
+                            help="Porsi GameEvent yang menyimpan raw_parameters (1.0 = semua, mode debug)")
+    args = arg_parser.parse_args(argv)
+
+    parser = None
+    if args.parse:
+        from scanner import MessageInterest, PhotonParser
+        parser = PhotonParser(database_path=args.database,
+                              interest=MessageInterest.everything() if args.all_events else None,
+                              raw_parameters_ratio=args.raw_parameters)
+
+    mode = f"x{args.speed} (mengikuti timestamp capture)" if args.speed else "secepat mungkin"
+    print(f"[*] Replay {len(args.files)} file, mode: {mode}")
+    replay = PcapReplay(args.files, speed=args.speed, ports=args.ports or (5056,), parser=parser,
+                        extract_commands=args.commands)
+    exit_code = 0
+    try:
+        replay.run()
+        print(f"[*] Selesai. {replay.stats}")
+    except KeyboardInterrupt:
+        replay.stop()
+        print(f"\n[*] Replay dihentikan oleh pengguna. {replay.stats}")
+        exit_code = 1
+    except (OSError, ValueError) as e:
+        print(f"[!] Gagal membaca file capture: {e}")
+        exit_code = 1
+    finally:
+        # Selalu tutup parser agar sink diagnostik menulis laporan yang tersisa
+        if parser is not None:
+            prefilter = parser.prefilter_stats()
+            print(f"[*] Prefilter PhotonParser: {prefilter['decoded']} pesan di-decode, {prefilter['skipped']} dilewati")
+            parser.close()
+            if parser.diagnostics is not None:
+                print(f"[*] {parser.diagnostics.format_stats()}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+# file: network_scanner/sequence.py
+#
+# Pelacakan reliable sequence number Photon. Command reliable (6) dan fragmen (8) membawa nomor
+# urut per (peer, channel) di byte 8..11 header command. Server mengirim ulang command yang ACK-nya
+# belum diterima, dan capture kita melihat setiap kiriman ulang itu; tanpa de-duplikasi event
+# NewCharacter/NewObject muncul dua kali. Nomor yang tidak pernah terlihat sampai keluar dari
+# jendela berarti paket hilang di capture (bukan di jaringan, karena server pasti mengirim ulang).
+#
+# Kunci `peer` sebaiknya memuat kedua endpoint (lihat connection_key): koneksi baru dari klien yang
+# sama ke server yang sama biasanya memakai port lokal lain, sehingga mendapat jendela baru.
+
+from typing import Dict, Hashable, Tuple
+
+
+def connection_key(datagram) -> Tuple:
+    """Kunci koneksi (alamat asal, port asal, alamat tujuan, port tujuan) untuk tracker/reassembler."""
+    return (datagram.src, datagram.src_port, datagram.dst, datagram.dst_port)
+
+
+class _ChannelWindow:
+    __slots__ = ("highest", "seen")
+
+    def __init__(self, seq: int, full_mask: int):
+        self.highest = seq
+        self.seen = full_mask # Nomor sebelum seq pertama dianggap sudah terlihat
+
+
+class ReliableSequenceTracker:
+    """
+    Jendela geser `window` nomor per (peer, channel). `accept()` mengembalikan False untuk
+    kiriman ulang (nomor sudah terlihat atau sudah lebih tua dari jendela), sehingga command-nya
+    bisa dilewati sebelum parameter di-decode.
+
+    Lompatan yang tidak masuk akal tidak dihitung sebagai kehilangan, tetapi sebagai aliran baru:
+    - maju lebih dari `max_jump` (datagram non-Photon/nyasar di port yang sama);
+    - mundur minimal `restart_jump` ke nomor <= `restart_seq` (server/klien memulai ulang koneksi).
+    Lompatan maju >= window menghitung paling banyak `window` nomor yang hilang.
+
+    Statistik:
+      accepted    : command yang diteruskan
+      duplicates  : kiriman ulang yang dibuang
+      stale       : nomor lebih tua dari jendela (juga dibuang)
+      reordered   : nomor yang datang terlambat tapi mengisi celah
+      gaps        : celah yang terbuka saat nomor melompat (bisa terisi belakangan)
+      lost        : nomor yang keluar dari jendela tanpa pernah terlihat (kehilangan capture)
+      resets      : aliran baru (nomor mundur ke awal atau melompat jauh ke depan)
+    """
+    def __init__(self, window: int = 1024, max_jump: int = 65536, restart_seq: int = 64, restart_jump: int = 256):
+        self.window = window
+        self.max_jump = max(max_jump, window)
+        self.restart_seq = restart_seq
+        self.restart_jump = restart_jump
+        self._mask = (1 << window) - 1
+        self._channels: Dict[Tuple[Hashable, int], _ChannelWindow] = {}
+
+        self.accepted = 0
+        self.duplicates = 0
+        self.stale = 0
+        self.reordered = 0
+        self.gaps = 0
+        self.lost = 0
+        self.resets = 0
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+    def accept(self, peer: Hashable, channel: int, seq: int) -> bool:
+        key = (peer, channel)
+        state = self._channels.get(key)
+        if state is None:
+            self._channels[key] = _ChannelWindow(seq, self._mask)
+            self.accepted += 1
+            return True
+
+        distance = seq - state.highest
+        if distance > 0:
+            if distance > self.max_jump:
+                return self._restart(key, seq)
+            if distance >= self.window:
+                # Seluruh jendela lama keluar; shift sebesar `distance` tidak perlu dibangun.
+                self.lost += self.window - bin(state.seen).count("1")
+                self.gaps += self.window
+                state.seen = 1
+            else:
+                shifted = (state.seen << distance) | 1
+                # Bit yang keluar dari jendela: posisi yang nol belum pernah terlihat.
+                self.lost += distance - bin(shifted >> self.window).count("1")
+                state.seen = shifted & self._mask
+                if distance > 1:
+                    self.gaps += distance - 1
+            state.highest = seq
+            self.accepted += 1
+            return True
+
+        age = -distance
+        if seq <= self.restart_seq and age >= self.restart_jump or age >= self.window and seq < self.window:
+            # Nomor kembali ke awal: endpoint yang sama membuka koneksi baru.
+            return self._restart(key, seq)
+        if age >= self.window:
+            self.stale += 1
+            return False
+        bit = 1 << age
+        if state.seen & bit:
+            self.duplicates += 1
+            return False
+        state.seen |= bit
+        self.reordered += 1
+        self.accepted += 1
+        return True
+
+    def _restart(self, key: Tuple[Hashable, int], seq: int) -> bool:
+        self._channels[key] = _ChannelWindow(seq, self._mask)
+        self.resets += 1
+        self.accepted += 1
+        return True
+
+    def forget(self, peer: Hashable):
+        """Menghapus semua jendela milik `peer` (mis. saat koneksi ditutup)."""
+        for key in [key for key in self._channels if key[0] == peer]:
+            del self._channels[key]
+
+    def pending_gaps(self) -> int:
+        """Nomor di dalam jendela yang saat ini belum terlihat (masih bisa datang terlambat)."""
+        return sum(self.window - bin(state.seen).count("1") for state in self._channels.values())
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "channels": len(self._channels),
+            "accepted": self.accepted,
+            "duplicates": self.duplicates,
+            "stale": self.stale,
+            "reordered": self.reordered,
+            "gaps": self.gaps,
+            "pending_gaps": self.pending_gaps(),
+            "lost": self.lost,
+            "resets": self.resets,
+        }
+
+    def format_stats(self) -> str:
+        s = self.stats()
+        return (f"Diterima: {s['accepted']}, Duplikat dibuang: {s['duplicates'] + s['stale']}, "
+                f"Terlambat: {s['reordered']}, Celah terbuka: {s['pending_gaps']}, Hilang di capture: {s['lost']}, "
+                f"Reset: {s['resets']}")
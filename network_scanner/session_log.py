@@ -0,0 +1,232 @@
+# file: network_scanner/session_log.py
+#
+# Log sesi streaming pengganti all_parsed_session_data + json.dump(indent=2). Record ditulis
+# sebagai NDJSON ringkas (satu objek per baris) atau length-prefixed (4 byte big-endian + JSON),
+# opsional dikompresi per chunk. Setiap chunk dikompresi sebagai member/stream gzip atau xz yang
+# berdiri sendiri, jadi file tetap bisa dibaca `gzip.open`/`lzma.open`/zcat/xzcat walaupun
+# program berhenti di tengah sesi (paling banyak satu chunk terakhir yang hilang).
+#
+#   python -m network_scanner.session_log parsed_photon_log_20250101_120000.ndjson.gz
+
+import argparse
+import gzip
+import json
+import lzma
+import os
+import struct
+import sys
+import threading
+from collections import deque
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_LENGTH_PREFIXED = "lp"
+LOG_FORMATS = (FORMAT_NDJSON, FORMAT_LENGTH_PREFIXED)
+
+COMPRESSION_NONE = "none"
+COMPRESSION_GZIP = "gzip"
+COMPRESSION_LZMA = "lzma"
+LOG_COMPRESSIONS = (COMPRESSION_NONE, COMPRESSION_GZIP, COMPRESSION_LZMA)
+
+_EXTENSIONS = {FORMAT_NDJSON: ".ndjson", FORMAT_LENGTH_PREFIXED: ".lpj"}
+_COMPRESSION_EXTENSIONS = {COMPRESSION_NONE: "", COMPRESSION_GZIP: ".gz", COMPRESSION_LZMA: ".xz"}
+_GZIP_MAGIC = b"\x1f\x8b"
+_XZ_MAGIC = b"\xfd7zXZ\x00"
+_LENGTH = struct.Struct(">I")
+
+
+def log_filename(base: str, fmt: str = FORMAT_NDJSON, compression: str = COMPRESSION_NONE) -> str:
+    """Nama file lengkap dari nama dasar, mis. 'parsed_photon_log_X' -> 'parsed_photon_log_X.ndjson.gz'."""
+    return base + _EXTENSIONS[fmt] + _COMPRESSION_EXTENSIONS[compression]
+
+
+class SessionLogWriter:
+    """
+    Penulis log sesi dengan memori terbatas. write() hanya menaruh record ke antrean (tidak pernah
+    blok dan tidak melakukan serialisasi); thread latar belakang melakukan json.dumps, kompresi,
+    dan penulisan ke disk setiap `chunk_bytes` data mentah atau setiap `flush_interval` detik.
+    Jika antrean melebihi `max_pending` record (disk terlalu lambat), record baru dibuang dan dihitung.
+    """
+    def __init__(self, path: str, fmt: str = FORMAT_NDJSON, compression: str = COMPRESSION_NONE,
+                 chunk_bytes: int = 256 * 1024, flush_interval: float = 1.0, max_pending: int = 50000):
+        if fmt not in LOG_FORMATS:
+            raise ValueError(f"Format log tidak dikenal: {fmt}. Pilihan: {', '.join(LOG_FORMATS)}")
+        if compression not in LOG_COMPRESSIONS:
+            raise ValueError(f"Kompresi tidak dikenal: {compression}. Pilihan: {', '.join(LOG_COMPRESSIONS)}")
+        self.path = path
+        self.fmt = fmt
+        self.compression = compression
+        self.chunk_bytes = chunk_bytes
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._pending: deque = deque()
+        self._chunk = bytearray()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._file = open(path, "ab")
+
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        self.raw_bytes = 0
+        self.file_bytes = 0
+        self.chunks = 0
+
+        self._thread = threading.Thread(target=self._run, name="session-log-writer", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, record: Dict[str, Any]) -> bool:
+        """Menjadwalkan satu record. Mengembalikan False jika record dibuang karena antrean penuh."""
+        if self._stop.is_set() or len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return False
+        self._pending.append(record)
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._drain()
+            if self._chunk:
+                self._flush_chunk()
+        self._drain()
+        self._flush_chunk()
+
+    def _drain(self):
+        pending = self._pending
+        chunk = self._chunk
+        while pending:
+            record = pending.popleft()
+            try:
+                data = json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+            except (TypeError, ValueError):
+                self.errors += 1
+                continue
+            if self.fmt == FORMAT_NDJSON:
+                chunk += data
+                chunk += b"\n"
+            else:
+                chunk += _LENGTH.pack(len(data))
+                chunk += data
+            self.written += 1
+            if len(chunk) >= self.chunk_bytes:
+                self._flush_chunk()
+
+    def _flush_chunk(self):
+        if not self._chunk:
+            return
+        raw = bytes(self._chunk)
+        self._chunk.clear()
+        if self.compression == COMPRESSION_GZIP:
+            data = gzip.compress(raw, compresslevel=6)
+        elif self.compression == COMPRESSION_LZMA:
+            data = lzma.compress(raw, preset=3)
+        else:
+            data = raw
+        try:
+            self._file.write(data)
+            self._file.flush()
+        except OSError:
+            self.errors += 1
+            return
+        self.raw_bytes += len(raw)
+        self.file_bytes += len(data)
+        self.chunks += 1
+
+    def close(self):
+        """Menulis semua record yang tersisa lalu menutup file."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join()
+        self._file.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "pending": len(self._pending),
+            "raw_bytes": self.raw_bytes,
+            "file_bytes": self.file_bytes,
+            "chunks": self.chunks,
+        }
+
+    def format_stats(self) -> str:
+        s = self.stats()
+        ratio = f", rasio x{s['raw_bytes'] / s['file_bytes']:.1f}" if s["file_bytes"] and self.compression != COMPRESSION_NONE else ""
+        return (f"Record: {s['written']}, Drop: {s['dropped']}, Error: {s['errors']}, Chunk: {s['chunks']}, "
+                f"Byte: {s['file_bytes']}{ratio}")
+
+
+def _open_log(path: str):
+    with open(path, "rb") as f:
+        magic = f.read(len(_XZ_MAGIC))
+    if magic.startswith(_GZIP_MAGIC):
+        return gzip.open(path, "rb")
+    if magic.startswith(_XZ_MAGIC):
+        return lzma.open(path, "rb")
+    return open(path, "rb")
+
+
+def read_session_log(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Membaca log sesi (NDJSON atau length-prefixed, terkompresi atau tidak) secara streaming.
+    Format dan kompresi dideteksi dari isi file, bukan dari ekstensi. Record terakhir yang
+    terpotong (program berhenti saat menulis) dilewati.
+    """
+    with _open_log(path) as f:
+        try:
+            yield from _iter_records(f)
+        except EOFError:
+            return # Member/stream terakhir terpotong
+
+
+def _iter_records(f) -> Iterator[Dict[str, Any]]:
+    if f.peek(1)[:1] == b"{":
+        for line in f:
+            if not line.endswith(b"\n"):
+                return
+            if line.strip():
+                yield json.loads(line)
+        return
+    while True:
+        header = f.read(_LENGTH.size)
+        if len(header) < _LENGTH.size:
+            return
+        (length,) = _LENGTH.unpack(header)
+        data = f.read(length)
+        if len(data) < length:
+            return
+        yield json.loads(data)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    cli = argparse.ArgumentParser(description="Baca log sesi (NDJSON / length-prefixed) dan cetak sebagai NDJSON.")
+    cli.add_argument("files", nargs="+")
+    cli.add_argument("--count", action="store_true", help="Hanya cetak jumlah record per file")
+    args = cli.parse_args(argv)
+
+    for path in args.files:
+        if not os.path.exists(path):
+            print(f"[!] File tidak ditemukan: {path}", file=sys.stderr)
+            return 1
+        if args.count:
+            print(f"{path}: {sum(1 for _ in read_session_log(path))} record")
+            continue
+        for record in read_session_log(path):
+            sys.stdout.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,46 @@
 # file: network_scanner/sniffer.py
 
-import scapy.all as scapy
 from threading import Thread, Event
-from queue import Queue
 import platform
 import os
 import sys
 import time
+import signal
 import struct
 import binascii
-import json
+import socket
+import argparse
+from typing import Iterator, List, Optional, Tuple
+
+from . import afpacket
+from .bpf import Instruction, build_udp_filter, filter_expression
+from .fragments import FRAGMENT_HEADER, FragmentReassembler
+from .discovery import ServerDiscovery
+from .decap import DLT_EN10MB, DLT_LINUX_SLL, DLT_NULL, DLT_RAW, udp_datagram
+from .sequence import ReliableSequenceTracker, connection_key
+from .packet_queue import DROP_OLDEST, DROP_POLICIES, KIND_ACK, KIND_EVENT, KIND_OTHER, PacketQueue
+from .session_log import (COMPRESSION_GZIP, FORMAT_NDJSON, LOG_COMPRESSIONS, LOG_FORMATS,
+                          SessionLogWriter, log_filename)
+from scanner.protocol16 import decode_parameter_table
+from scanner.utils.latency import LatencyRecorder
+
+try:
+    import scapy.all as scapy
+except ImportError: # Mode replay (network_scanner.replay) tidak membutuhkan scapy
+    scapy = None
 
 def select_interface_and_show():
     """Menampilkan antarmuka dan meminta pengguna memasukkan nama antarmuka dari output scapy."""
     print("[*] Mencari antarmuka jaringan yang tersedia (menggunakan Scapy)...")
+    if scapy is None:
+        if afpacket.is_supported():
+            # Backend AF_PACKET cukup dengan nama antarmuka kernel (eth0, wlan0, ...).
+            print("[!] Scapy tidak terinstal. Antarmuka kernel yang tersedia:")
+            for _index, name in socket.if_nameindex():
+                print(f"    - {name}")
+            return input(">> Masukkan nama antarmuka: ")
+        print("[!] Scapy tidak terinstal. Instal scapy untuk capture live, atau gunakan 'python -m network_scanner.replay' untuk file pcap.")
+        return None
     try:
         scapy.show_interfaces() # Tampilkan antarmuka versi Scapy
     except Exception as e:
@@ -28,12 +55,41 @@ def select_interface_and_show():
     iface_name = input(">> Masukkan nama antarmuka dari daftar di atas: ")
     return iface_name
 
+def _scapy_linktype(packet) -> int:
+    """Menentukan linktype frame dari layer pertama paket scapy (Npcap loopback, Linux 'any', dll)."""
+    if isinstance(packet, scapy.Ether):
+        return DLT_EN10MB
+    if isinstance(packet, scapy.CookedLinux):
+        return DLT_LINUX_SLL
+    if isinstance(packet, scapy.Loopback):
+        return DLT_NULL
+    return DLT_RAW
+
 class PacketSniffer(Thread):
-    def __init__(self, packet_queue: Queue, bpf_filter: str, interface_name: str):
+    """
+    Thread capture. Backend "scapy" memakai scapy.sniff (lintas platform, Npcap di Windows);
+    backend "afpacket" (khusus Linux) membaca ring TPACKET_V3 per blok dengan filter BPF di kernel
+    (`bpf_program`, lihat bpf.build_udp_filter) tanpa callback Python per paket.
+    Payload UDP diambil langsung di thread ini lalu dimasukkan ke PacketQueue sebagai tuple
+    (timestamp_capture, peer, payload) bersama jenisnya, sehingga kebijakan drop antrean bisa
+    membedakan ACK dari event. `peer` adalah kunci koneksi (asal, port asal, tujuan, port tujuan),
+    lihat sequence.connection_key.
+
+    Dengan `discovery` (ServerDiscovery), datagram yang bukan berbentuk Photon dibuang sebelum
+    masuk antrean, dan pada backend afpacket filter kernel dibangun ulang setiap kali daftar
+    server/endpoint yang ditolak berubah.
+    """
+    def __init__(self, packet_queue: PacketQueue, bpf_filter: str, interface_name: str,
+                 backend: str = "scapy", bpf_program: Optional[List[Instruction]] = None,
+                 discovery: Optional[ServerDiscovery] = None):
         super().__init__(daemon=True)
         self.packet_queue = packet_queue
         self.bpf_filter = bpf_filter
         self.interface_name = interface_name
+        self.backend = backend
+        self.bpf_program = bpf_program
+        self.discovery = discovery
+        self.linktype = DLT_EN10MB # Diperbarui dari paket pertama untuk backend scapy
         self.stop_event = Event()
 
     def _check_privileges(self):
@@ -46,21 +102,40 @@ class PacketSniffer(Thread):
         return os.getuid() == 0
 
     def run(self):
+        if self.backend == "scapy" and scapy is None:
+            print("[!] KESALAHAN: Scapy tidak terinstal, capture live tidak bisa dijalankan.")
+            self.stop_event.set()
+            self.packet_queue.close()
+            return
+
         if not self._check_privileges():
             print("\n[!] KESALAHAN: Jalankan skrip ini sebagai Administrator/root.")
             self.stop_event.set()
+            self.packet_queue.close()
             return
         
         if not self.interface_name:
             print("[!] Nama antarmuka tidak valid. Keluar dari thread sniffer.")
             self.stop_event.set()
+            self.packet_queue.close()
             return
             
-        print(f"[*] Sniffer dimulai... Antarmuka: '{self.interface_name}', Filter: '{self.bpf_filter}'")
+        print(f"[*] Sniffer dimulai... Backend: {self.backend}, Antarmuka: '{self.interface_name}', Filter: '{self.bpf_filter}'")
+
+        if self.backend == "afpacket":
+            self._run_afpacket()
+            return
 
         def process_packet(packet):
-            if not self.packet_queue.full():
-                self.packet_queue.put(bytes(packet))
+            if process_packet.first:
+                self.linktype = _scapy_linktype(packet)
+                process_packet.first = False
+            datagram = udp_datagram(bytes(packet), self.linktype)
+            if datagram is not None and (self.discovery is None or self.discovery.observe(datagram)):
+                payload = datagram.payload
+                self.packet_queue.put((float(packet.time), connection_key(datagram), payload), classify_payload(payload))
+
+        process_packet.first = True
 
         try:
             scapy.sniff(
@@ -82,91 +157,113 @@ class PacketSniffer(Thread):
         finally:
             print("[*] Thread sniffer telah berhenti.")
             self.stop_event.set()
+            self.packet_queue.close()
+
+    def _run_afpacket(self):
+        discovery = self.discovery
+        bpf_program = discovery.build_filter() if discovery is not None else self.bpf_program
+        total_drops = 0
+        try:
+            with afpacket.AfPacketRing(self.interface_name, bpf_program=bpf_program) as ring:
+                if discovery is not None:
+                    ring.stats() # Reset counter socket agar sejajar dengan baseline counter antarmuka
+                    discovery.update_kernel_counters(self.interface_name, 0)
+                last_stats = time.monotonic()
+                for batch in ring.batches(self.stop_event):
+                    for ts, frame in batch:
+                        datagram = udp_datagram(frame, DLT_EN10MB)
+                        if datagram is None or (discovery is not None and not discovery.observe(datagram)):
+                            continue
+                        # Salin: view ke ring tidak valid lagi setelah blok dikembalikan ke kernel.
+                        payload = bytes(datagram.payload)
+                        self.packet_queue.put((ts, connection_key(datagram), payload), classify_payload(payload))
+                    if discovery is not None:
+                        if discovery.changed:
+                            ring.set_filter(discovery.build_filter())
+                        if time.monotonic() - last_stats >= 1.0:
+                            last_stats = time.monotonic()
+                            packets, drops = ring.stats()
+                            total_drops += drops
+                            discovery.update_kernel_counters(self.interface_name, packets)
+                _packets, drops = ring.stats()
+                total_drops += drops
+                if total_drops:
+                    print(f"[!] Kernel men-drop {total_drops} paket (ring penuh) selama capture.")
+        except PermissionError as e:
+            print(f"[!] Error Hak Akses: {e}. Backend AF_PACKET butuh root/CAP_NET_RAW.")
+        except OSError as e:
+            print(f"[!] Error AF_PACKET pada antarmuka '{self.interface_name}': {e}")
+        finally:
+            print("[*] Thread sniffer telah berhenti.")
+            self.stop_event.set()
+            self.packet_queue.close()
 
     def stop(self):
         if not self.stop_event.is_set():
             print("\n[*] Menghentikan sniffer...")
             self.stop_event.set()
 
-PHOTON_PARAM_TYPE_NULL = 0x2a
-PHOTON_PARAM_TYPE_DICT = 0x44
-PHOTON_PARAM_TYPE_STRING = 0x73
-PHOTON_PARAM_TYPE_BYTE = 0x62
-PHOTON_PARAM_TYPE_SHORT = 0x6b
-PHOTON_PARAM_TYPE_INTEGER = 0x69
-PHOTON_PARAM_TYPE_LONG = 0x6c
-PHOTON_PARAM_TYPE_FLOAT = 0x66
-PHOTON_PARAM_TYPE_DOUBLE = 0x64
-PHOTON_PARAM_TYPE_BOOLEAN = 0x6f
-PHOTON_PARAM_TYPE_BYTE_ARRAY = 0x78
-PHOTON_PARAM_TYPE_OBJECT_ARRAY = 0x79
-
-def parse_photon_parameters(payload: bytes, offset: int) -> tuple[dict, int]:
-    params = {}
-    current_offset = offset
-    try:
-        param_count = struct.unpack(">H", payload[current_offset : current_offset + 2])[0]
-        current_offset += 2
-        for _ in range(param_count):
-            if current_offset + 1 >= len(payload): break
-            param_code = payload[current_offset]
-            param_type = payload[current_offset + 1]
-            current_offset += 2
-            value = None
-            
-            if param_type == PHOTON_PARAM_TYPE_STRING:
-                if current_offset + 2 > len(payload): break
-                str_len = struct.unpack(">H", payload[current_offset : current_offset + 2])[0]
-                current_offset += 2
-                if current_offset + str_len > len(payload): break
-                value = payload[current_offset : current_offset + str_len].decode("utf-8", errors="replace")
-                current_offset += str_len
-            elif param_type == PHOTON_PARAM_TYPE_BYTE:
-                if current_offset >= len(payload): break
-                value = payload[current_offset]
-                current_offset += 1
-            elif param_type == PHOTON_PARAM_TYPE_SHORT:
-                if current_offset + 2 > len(payload): break
-                value = struct.unpack(">h", payload[current_offset : current_offset + 2])[0]
-                current_offset += 2
-            elif param_type == PHOTON_PARAM_TYPE_INTEGER:
-                if current_offset + 4 > len(payload): break
-                value = struct.unpack(">i", payload[current_offset : current_offset + 4])[0]
-                current_offset += 4
-            elif param_type == PHOTON_PARAM_TYPE_LONG:
-                if current_offset + 8 > len(payload): break
-                value = struct.unpack(">q", payload[current_offset : current_offset + 8])[0]
-                current_offset += 8
-            elif param_type == PHOTON_PARAM_TYPE_BOOLEAN:
-                if current_offset >= len(payload): break
-                value = payload[current_offset] != 0
-                current_offset += 1
-            elif param_type == PHOTON_PARAM_TYPE_NULL:
-                value = None
-            elif param_type == PHOTON_PARAM_TYPE_BYTE_ARRAY:
-                if current_offset + 4 > len(payload): break
-                array_len = struct.unpack(">i", payload[current_offset : current_offset + 4])[0]
-                current_offset += 4
-                if current_offset + array_len > len(payload): break
-                byte_val = payload[current_offset : current_offset + array_len]
-                try:
-                    decoded_str = byte_val.decode('utf-8', errors='ignore')
-                    if all(32 <= ord(char) <= 126 for char in decoded_str.strip()) and len(decoded_str.strip()) > 0 : 
-                        value = decoded_str.strip()
-                    else:
-                         value = f"hex:{binascii.hexlify(byte_val).decode()}"
-                except:
-                    value = f"hex:{binascii.hexlify(byte_val).decode()}"
-                current_offset += array_len
-            else:
-                break 
-            
-            params[param_code] = value
-    except Exception:
-        pass
-    return params, current_offset
+PHOTON_HEADER_LENGTH = 12
+PHOTON_COMMAND_HEADER_LENGTH = 12
+PHOTON_CMD_ACK = 1
+PHOTON_CMD_SEND_RELIABLE = 6
+PHOTON_CMD_SEND_UNRELIABLE = 7
+PHOTON_CMD_SEND_FRAGMENT = 8
+PHOTON_MSG_TYPE_EVENT = 4
+
+def _loggable_value(value):
+    """Nilai hasil decode dalam bentuk yang aman untuk log JSON (byte array: teks ASCII atau hex)."""
+    if isinstance(value, bytes):
+        decoded_str = value.decode('utf-8', errors='ignore').strip()
+        if decoded_str and all(32 <= ord(char) <= 126 for char in decoded_str):
+            return decoded_str
+        return f"hex:{binascii.hexlify(value).decode()}"
+    if isinstance(value, dict):
+        return {(k if k is None or isinstance(k, (str, int, float, bool)) else str(k)): _loggable_value(v)
+                for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_loggable_value(v) for v in value]
+    if hasattr(value, "tolist"): # ndarray dari array bertipe besar (lihat protocol16.NUMPY_MIN_ELEMENTS)
+        return value.tolist()
+    return value
 
-def extract_structured_photon_data(payload: bytes) -> list:
+def parse_photon_parameters(payload, offset: int) -> tuple[dict, int]:
+    """
+    Tabel parameter Protocol16 mulai `offset` (lewat codec bersama scanner.protocol16). Parameter
+    yang sudah terbaca sebelum data rusak/terpotong tetap dikembalikan.
+    """
+    params, current_offset = decode_parameter_table(payload, offset, strict=False)
+    return {code: _loggable_value(value) for code, value in params.items()}, current_offset
+
+def _parse_embedded_event(payload, data_offset: int, command_data: dict) -> bool:
+    """Mengisi field embedded_event_* dari data command reliable/unreliable (atau pesan hasil reassembly)."""
+    if data_offset + 1 < len(payload) and payload[data_offset] == 0xfd:
+        event_params, _ = parse_photon_parameters(payload, data_offset + 1)
+        custom_event_code = event_params.get(0)
+        custom_event_data = event_params.get(1)
+        if custom_event_code is not None:
+            command_data["embedded_event_custom_code"] = custom_event_code
+            if custom_event_data:
+                command_data["embedded_event_data"] = custom_event_data
+            return True
+    return False
+
+def _is_retransmit(payload, command_offset: int, sequences: Optional[ReliableSequenceTracker], peer) -> bool:
+    """True jika command reliable/fragmen di `command_offset` sudah pernah diterima dari `peer`."""
+    if sequences is None:
+        return False
+    reliable_seq = struct.unpack_from(">I", payload, command_offset + 8)[0]
+    return not sequences.accept(peer, payload[command_offset + 1], reliable_seq)
+
+def extract_structured_photon_data(payload: bytes, reassembler: Optional[FragmentReassembler] = None, peer=None,
+                                   sequences: Optional[ReliableSequenceTracker] = None) -> list:
+    """
+    Mem-parse semua command dalam satu datagram Photon menjadi list dict.
+    Jika `reassembler` diberikan, fragmen (tipe 8) dari `peer` yang sama disusun ulang dan pesan
+    utuhnya di-decode seperti command reliable biasa.
+    Jika `sequences` diberikan, command reliable/fragmen yang merupakan kiriman ulang hanya dicatat
+    sebagai duplikat (tanpa decode parameter).
+    """
     parsed_commands_in_packet = []
     if not payload or len(payload) < 12:
         return parsed_commands_in_packet
@@ -189,7 +286,10 @@ def extract_structured_photon_data(payload: bytes) -> list:
         }
         details_parsed_flag = False
 
-        if cmd_type == 4: 
+        if cmd_type in (PHOTON_CMD_SEND_RELIABLE, PHOTON_CMD_SEND_FRAGMENT) and _is_retransmit(payload, current_offset, sequences, peer):
+            command_data["duplicate_reliable_command"] = True
+
+        elif cmd_type == 4: 
             if data_offset + 1 < len(payload) and payload[data_offset] == 0xfd: # 253
                 event_params, _ = parse_photon_parameters(payload, data_offset + 1)
                 custom_event_code = event_params.get(0)
@@ -201,15 +301,21 @@ def extract_structured_photon_data(payload: bytes) -> list:
                     details_parsed_flag = True
         
         elif cmd_type == 6 or cmd_type == 7: 
-            if data_offset + 1 < len(payload) and payload[data_offset] == 0xfd: 
-                event_params, _ = parse_photon_parameters(payload, data_offset + 1)
-                custom_event_code = event_params.get(0)
-                custom_event_data = event_params.get(1)
-                if custom_event_code is not None:
-                    command_data["embedded_event_custom_code"] = custom_event_code
-                    if custom_event_data:
-                        command_data["embedded_event_data"] = custom_event_data
-                    details_parsed_flag = True
+            details_parsed_flag = _parse_embedded_event(payload, data_offset, command_data)
+
+        elif cmd_type == PHOTON_CMD_SEND_FRAGMENT:
+            if data_offset + FRAGMENT_HEADER.size <= len(payload):
+                start_seq, fragment_count, fragment_number, total_length, fragment_offset = FRAGMENT_HEADER.unpack_from(payload, data_offset)
+                command_data["fragment_start_sequence"] = start_seq
+                command_data["fragment_number"] = fragment_number
+                command_data["fragment_count"] = fragment_count
+                if reassembler is not None:
+                    fragment_data = memoryview(payload)[data_offset + FRAGMENT_HEADER.size : min(current_offset + cmd_len, len(payload))]
+                    message = reassembler.add(peer, payload[current_offset + 1], start_seq, fragment_count,
+                                              fragment_number, total_length, fragment_offset, fragment_data)
+                    if message is not None:
+                        command_data["reassembled_length_bytes"] = len(message)
+                        details_parsed_flag = _parse_embedded_event(message, 0, command_data)
         
         elif cmd_type == 2: 
             if data_offset < len(payload):
@@ -229,7 +335,100 @@ def extract_structured_photon_data(payload: bytes) -> list:
             
     return parsed_commands_in_packet
 
+def iter_photon_messages(payload, reassembler: Optional[FragmentReassembler] = None, peer=None,
+                         sequences: Optional[ReliableSequenceTracker] = None) -> Iterator[Tuple[int, memoryview]]:
+    """
+    Menelusuri command di dalam satu datagram Photon dan menghasilkan (command_type, body)
+    untuk command reliable (6) dan unreliable (7). `body` adalah memoryview yang dimulai
+    dari byte tipe pesan (setelah byte signature), sesuai yang diharapkan PhotonParser.parse_message.
+    Dengan `reassembler`, pesan dari fragmen (8) dihasilkan saat fragmen terakhirnya tiba.
+    Dengan `sequences`, command reliable/fragmen yang dikirim ulang dilewati.
+
+    Catatan: satu reassembler (atau tracker sequence) hanya boleh menerima setiap datagram sekali;
+    jangan memakai objek yang sama untuk extract_structured_photon_data atas payload yang sama.
+    """
+    view = memoryview(payload)
+    if len(view) < PHOTON_HEADER_LENGTH:
+        return
+
+    command_count = view[3]
+    current_offset = PHOTON_HEADER_LENGTH
+    for _ in range(command_count):
+        if current_offset + PHOTON_COMMAND_HEADER_LENGTH > len(view):
+            break
+        cmd_type = view[current_offset]
+        cmd_len = struct.unpack_from(">I", view, current_offset + 4)[0]
+        if cmd_len < PHOTON_COMMAND_HEADER_LENGTH:
+            break
+        cmd_end = min(current_offset + cmd_len, len(view))
+        if cmd_type in (PHOTON_CMD_SEND_RELIABLE, PHOTON_CMD_SEND_FRAGMENT) and _is_retransmit(view, current_offset, sequences, peer):
+            current_offset += cmd_len
+            continue
+        data_offset = current_offset + PHOTON_COMMAND_HEADER_LENGTH
+        if cmd_type == PHOTON_CMD_SEND_UNRELIABLE:
+            data_offset += 4 # unreliable sequence number
+        if cmd_type in (PHOTON_CMD_SEND_RELIABLE, PHOTON_CMD_SEND_UNRELIABLE) and data_offset + 2 <= cmd_end:
+            yield cmd_type, view[data_offset + 1:cmd_end] # Lewati byte signature (0xF3)
+        elif cmd_type == PHOTON_CMD_SEND_FRAGMENT and reassembler is not None and data_offset + FRAGMENT_HEADER.size <= cmd_end:
+            start_seq, fragment_count, fragment_number, total_length, fragment_offset = FRAGMENT_HEADER.unpack_from(view, data_offset)
+            message = reassembler.add(peer, view[current_offset + 1], start_seq, fragment_count, fragment_number,
+                                      total_length, fragment_offset, view[data_offset + FRAGMENT_HEADER.size:cmd_end])
+            if message is not None and len(message) >= 2:
+                yield cmd_type, message[1:]
+        current_offset += cmd_len
+
+def classify_payload(payload) -> int:
+    """
+    Klasifikasi murah untuk kebijakan drop PacketQueue: hanya membaca header command, tanpa
+    men-decode parameter. Fragmen dianggap event karena event besar dikirim terfragmentasi.
+    """
+    n = len(payload)
+    if n < PHOTON_HEADER_LENGTH:
+        return KIND_OTHER
+    command_count = payload[3]
+    current_offset = PHOTON_HEADER_LENGTH
+    only_acks = command_count > 0
+    for _ in range(command_count):
+        if current_offset + PHOTON_COMMAND_HEADER_LENGTH > n:
+            break
+        cmd_type = payload[current_offset]
+        if cmd_type == PHOTON_CMD_SEND_FRAGMENT:
+            return KIND_EVENT
+        if cmd_type in (PHOTON_CMD_SEND_RELIABLE, PHOTON_CMD_SEND_UNRELIABLE):
+            msg_type_offset = current_offset + PHOTON_COMMAND_HEADER_LENGTH + 1
+            if cmd_type == PHOTON_CMD_SEND_UNRELIABLE:
+                msg_type_offset += 4
+            if msg_type_offset < n and payload[msg_type_offset] & 0x7F == PHOTON_MSG_TYPE_EVENT:
+                return KIND_EVENT
+        if cmd_type != PHOTON_CMD_ACK:
+            only_acks = False
+        cmd_len = struct.unpack_from(">I", payload, current_offset + 4)[0]
+        if cmd_len < PHOTON_COMMAND_HEADER_LENGTH:
+            break
+        current_offset += cmd_len
+    return KIND_ACK if only_acks else KIND_OTHER
+
 if __name__ == "__main__":
+    cli = argparse.ArgumentParser(description="Sniffer paket Photon Albion Online.")
+    cli.add_argument("--backend", choices=["scapy", "afpacket"], default="scapy",
+                     help="Backend capture: scapy (default, lintas platform) atau afpacket (Linux, ring mmap + BPF kernel)")
+    cli.add_argument("--drop-policy", choices=DROP_POLICIES, default=DROP_OLDEST,
+                     help="Paket mana yang dibuang saat antrean penuh (default: drop-oldest)")
+    cli.add_argument("--queue-size", type=int, default=10000, help="Kapasitas antrean paket (default 10000)")
+    cli.add_argument("--log-format", choices=LOG_FORMATS, default=FORMAT_NDJSON,
+                     help="Format log sesi: ndjson (satu objek JSON per baris) atau lp (length-prefixed)")
+    cli.add_argument("--log-compression", choices=LOG_COMPRESSIONS, default=COMPRESSION_GZIP,
+                     help="Kompresi per chunk untuk log sesi (default: gzip)")
+    cli.add_argument("--discover", action="store_true",
+                     help="Temukan server Albion otomatis dari bentuk header Photon (daftar IP hanya dipakai sebagai awal); "
+                          "dengan backend afpacket filter kernel dibangun ulang selama capture")
+    cli.add_argument("--archive", action="store_true",
+                     help="Simpan juga payload Photon mentah ke arsip biner terindeks (.albcap)")
+    cli_args = cli.parse_args()
+    if cli_args.backend == "afpacket" and not afpacket.is_supported():
+        print("[!] Backend afpacket hanya tersedia di Linux.")
+        sys.exit(1)
+
     print("[*] Mempersiapkan pemilihan antarmuka jaringan...")
     selected_iface_name = select_interface_and_show()
 
@@ -255,16 +454,22 @@ if __name__ == "__main__":
     
     print(f"[*] Daftar IP Server yang akan digunakan (setelah digabung dan diurutkan): {ALBION_SERVER_IPS}")
     
-    host_filter = " or ".join([f"host {ip}" for ip in ALBION_SERVER_IPS])
     GAME_PORTS = [5056] 
-    port_filter = " or ".join([f"port {port}" for port in GAME_PORTS])
-    FINAL_BPF_FILTER = f"udp and ({host_filter}) and ({port_filter})"
+    server_discovery = None
+    if cli_args.discover:
+        server_discovery = ServerDiscovery(GAME_PORTS, known_servers=ALBION_SERVER_IPS)
+        FINAL_BPF_FILTER = server_discovery.expression()
+        print("[*] Mode discovery aktif: server baru dikenali dari bentuk header Photon.")
+    else:
+        FINAL_BPF_FILTER = filter_expression(GAME_PORTS, ALBION_SERVER_IPS)
 
     print(f"[*] Filter BPF yang akan digunakan: {FINAL_BPF_FILTER}")
 
-    packet_processing_queue = Queue(maxsize=10000)
+    packet_processing_queue = PacketQueue(maxsize=cli_args.queue_size, policy=cli_args.drop_policy)
     sniffer_thread = PacketSniffer(
-        packet_processing_queue, FINAL_BPF_FILTER, interface_name=selected_iface_name
+        packet_processing_queue, FINAL_BPF_FILTER, interface_name=selected_iface_name,
+        backend=cli_args.backend, bpf_program=build_udp_filter(GAME_PORTS, ALBION_SERVER_IPS),
+        discovery=server_discovery
     )
     sniffer_thread.start()
 
@@ -276,28 +481,41 @@ if __name__ == "__main__":
     print("[*] Menganalisis paket Photon (UDP)...")
     print("[!] Lakukan aksi di dalam game (masuk dungeon, dekati peti/mob) untuk melihat event.")
     
-    all_parsed_session_data = []
-    output_filename_base = f"parsed_photon_log_{time.strftime('%Y%m%d_%H%M%S')}"
-    file_counter = 0
-    max_entries_per_file = 5000 
-    current_entries_in_file = 0
+    session_stamp = time.strftime('%Y%m%d_%H%M%S')
+    session_log_path = log_filename(f"parsed_photon_log_{session_stamp}",
+                                    cli_args.log_format, cli_args.log_compression)
+    session_log = SessionLogWriter(session_log_path, cli_args.log_format, cli_args.log_compression)
+    print(f"[*] Log sesi ditulis secara streaming ke: {session_log_path}")
+    raw_archive = None
+    if cli_args.archive:
+        from .archive import ArchiveWriter # Impor lokal: archive sendiri mengimpor modul ini
+        raw_archive = ArchiveWriter(f"raw_photon_{session_stamp}.albcap")
+        print(f"[*] Payload mentah diarsipkan ke: {raw_archive.path}")
+
+    fragment_reassembler = FragmentReassembler()
+    reliable_sequences = ReliableSequenceTracker()
+    last_drop_count = 0
+    last_lost_count = 0
+    last_stats_report = time.monotonic()
+
+    latency = LatencyRecorder()
+    if hasattr(signal, "SIGUSR1"):
+        # Ringkasan latensi kapan saja tanpa menghentikan capture: kill -USR1 <pid>
+        signal.signal(signal.SIGUSR1, lambda _signum, _frame: print(f"[*] Latensi per tahap:\n{latency.summary()}"))
+        print(f"[*] Kirim SIGUSR1 ke PID {os.getpid()} untuk melihat ringkasan latensi.")
 
     try:
         while sniffer_thread.is_alive() or not packet_processing_queue.empty():
-            if not packet_processing_queue.empty():
-                packet_data_raw = packet_processing_queue.get()
-                payload = b""
-                try:
-                    eth_frame = scapy.Ether(packet_data_raw)
-                    if eth_frame.haslayer(scapy.IP) and eth_frame.haslayer(scapy.UDP):
-                        payload = bytes(eth_frame[scapy.UDP].payload)
-                except Exception:
-                    payload = packet_data_raw
-
+            batch = packet_processing_queue.get_batch(max_items=256, timeout=0.5)
+            for current_timestamp_obj, peer, payload in batch:
                 if payload:
-                    parsed_commands = extract_structured_photon_data(payload)
+                    latency.record_since_capture("dequeue", current_timestamp_obj)
+                    if raw_archive is not None:
+                        raw_archive.write_photon(current_timestamp_obj, peer[:2], payload) # Arsip menyimpan (alamat, port) pengirim
+                    extract_start = time.perf_counter()
+                    parsed_commands = extract_structured_photon_data(payload, fragment_reassembler, peer, reliable_sequences)
+                    latency.record("extract", time.perf_counter() - extract_start)
                     if parsed_commands: 
-                        current_timestamp_obj = time.time()
                         ms_timestamp = f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(current_timestamp_obj))}.{int(current_timestamp_obj * 1000) % 1000:03d}"
                         
                         packet_info = {
@@ -306,9 +524,8 @@ if __name__ == "__main__":
                             "packet_size_bytes": len(payload),
                             "commands": parsed_commands
                         }
-                        all_parsed_session_data.append(packet_info)
-                        current_entries_in_file +=1
-                        
+                        session_log.write(packet_info)
+
                         has_interesting_event = any(
                             "event_custom_code" in cmd or "embedded_event_custom_code" in cmd 
                             for cmd in parsed_commands
@@ -316,16 +533,17 @@ if __name__ == "__main__":
                         if has_interesting_event:
                             print(f"[*] Paket MENARIK pada {ms_timestamp} (Total Perintah: {len(parsed_commands)}) siap disimpan.")
 
-                        if current_entries_in_file >= max_entries_per_file:
-                            current_filename = f"{output_filename_base}_{file_counter}.json"
-                            with open(current_filename, 'w', encoding='utf-8') as f:
-                                json.dump(all_parsed_session_data, f, indent=2, ensure_ascii=False, sort_keys=False)
-                            print(f"[*] Data disimpan ke file: {current_filename} ({len(all_parsed_session_data)} entri paket)")
-                            all_parsed_session_data = [] 
-                            current_entries_in_file = 0
-                            file_counter += 1
-            else:
-                time.sleep(0.01)
+            packet_processing_queue.task_done(len(batch))
+
+            if time.monotonic() - last_stats_report >= 5.0:
+                last_stats_report = time.monotonic()
+                drop_count = packet_processing_queue.stats()["dropped"]
+                if drop_count != last_drop_count:
+                    last_drop_count = drop_count
+                    print(f"[!] Antrean paket kehilangan data. {packet_processing_queue.format_stats()}")
+                if reliable_sequences.lost != last_lost_count:
+                    last_lost_count = reliable_sequences.lost
+                    print(f"[!] Celah reliable sequence terdeteksi (paket hilang di capture). {reliable_sequences.format_stats()}")
     except KeyboardInterrupt:
         print("\n[*] Perintah berhenti diterima dari pengguna.")
     finally:
@@ -333,12 +551,18 @@ if __name__ == "__main__":
             sniffer_thread.stop()
             sniffer_thread.join(timeout=5)
         
-        if all_parsed_session_data:
-            current_filename = f"{output_filename_base}_{file_counter}.json"
-            with open(current_filename, 'w', encoding='utf-8') as f:
-                json.dump(all_parsed_session_data, f, indent=2, ensure_ascii=False, sort_keys=False)
-            print(f"[*] Sisa data ({len(all_parsed_session_data)} entri paket) disimpan ke: {current_filename}")
-        elif file_counter == 0 and current_entries_in_file == 0:
+        session_log.close()
+        if raw_archive is not None:
+            raw_archive.close()
+            print(f"[*] Arsip mentah disimpan ke: {raw_archive.path} ({raw_archive.records} record)")
+        if session_log.written:
+            print(f"[*] Log sesi disimpan ke: {session_log_path} ({session_log.format_stats()})")
+        else:
              print("[*] Tidak ada data yang berhasil diparsing untuk disimpan.")
 
+        print(f"[*] Statistik antrean paket: {packet_processing_queue.format_stats()}")
+        print(f"[*] Statistik reliable sequence: {reliable_sequences.format_stats()}")
+        print(f"[*] Latensi per tahap:\n{latency.summary()}")
+        if server_discovery is not None:
+            print(f"[*] Statistik discovery: {server_discovery.format_stats()}")
         print("[*] Program dihentikan.")
\ No newline at end of file
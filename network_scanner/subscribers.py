@@ -0,0 +1,193 @@
+# file: network_scanner/subscribers.py
+#
+# Subscriber async untuk AsyncEventPipeline. Setiap subscriber punya antrean asyncio terbatas
+# sendiri dan satu task consumer, jadi subscriber yang lambat (mis. webhook Discord) hanya
+# kehilangan event miliknya sendiri dan tidak menahan decoder atau subscriber lain.
+
+import asyncio
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from scanner.utils.latency import LatencyRecorder
+from scanner.utils.logging import logger
+
+
+class Subscriber:
+    """
+    Kelas dasar. Turunan mengimplementasikan `handle(event)` (async) dan boleh mengganti
+    `wants(event)` untuk menyaring event sebelum masuk antrean. Saat antrean penuh, event
+    tertua dibuang (dan dihitung) agar event terbaru tetap sampai.
+    """
+    name = "subscriber"
+
+    def __init__(self, queue_size: int = 1000):
+        self.queue_size = queue_size
+        self.queue: Optional[asyncio.Queue] = None
+        self.latency: Optional[LatencyRecorder] = None # Diisi AsyncEventPipeline
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def wants(self, event) -> bool:
+        return True
+
+    def offer(self, event):
+        """Dipanggil pipeline dari event loop; tidak pernah menunggu."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def start(self):
+        """Dipanggil sekali sebelum event pertama (membuka koneksi, file, dst.)."""
+
+    async def handle(self, event):
+        raise NotImplementedError
+
+    async def close(self):
+        """Dipanggil setelah antrean habis saat pipeline berhenti."""
+
+    async def run(self):
+        while True:
+            event = await self.queue.get()
+            try:
+                await self.handle(event)
+                self.delivered += 1
+                if self.latency is not None:
+                    self.latency.record_since_capture(f"subscriber:{self.name}", getattr(event, "capture_timestamp", None))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Subscriber '{self.name}' gagal memproses {event}: {e}")
+            finally:
+                self.queue.task_done()
+
+    def format_stats(self) -> str:
+        return f"{self.name}: terkirim {self.delivered}, drop {self.dropped}, error {self.errors}"
+
+
+class LoggingSubscriber(Subscriber):
+    """Mencatat setiap GameEvent ke logger aplikasi."""
+    name = "logger"
+
+    async def handle(self, event):
+        logger.info(str(event))
+
+
+class UiAdapterSubscriber(Subscriber):
+    """
+    Jembatan ke toolkit GUI yang tidak thread-safe/async (tkinter, Dear PyGui, Flet). Event
+    dikumpulkan selama `interval` detik lalu diserahkan sekaligus lewat `dispatch(callback)`,
+    misalnya `lambda fn: root.after(0, fn)` untuk tkinter, sehingga UI di-update beberapa kali
+    per detik dan bukan sekali per paket.
+    """
+    name = "ui"
+
+    def __init__(self, on_events: Callable[[List[Any]], None],
+                 dispatch: Optional[Callable[[Callable[[], None]], Any]] = None,
+                 interval: float = 0.25, queue_size: int = 5000):
+        super().__init__(queue_size)
+        self.on_events = on_events
+        self.dispatch = dispatch
+        self.interval = interval
+
+    async def run(self):
+        while True:
+            batch = [await self.queue.get()]
+            deadline = time.monotonic() + self.interval
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                if self.dispatch is None:
+                    self._render(batch)
+                else:
+                    self.dispatch(lambda events=batch: self._render(events))
+                self.delivered += len(batch)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Subscriber UI gagal memproses {len(batch)} event: {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _render(self, events: List[Any]):
+        self.on_events(events)
+        if self.latency is not None:
+            # Diukur setelah callback UI selesai: capture -> event tampil di widget
+            for event in events:
+                self.latency.record_since_capture("ui", getattr(event, "capture_timestamp", None))
+
+
+def default_discord_embed(event) -> Optional[Dict[str, Any]]:
+    """Embed Discord untuk event yang layak dikirim (peti dan bos); None untuk event lain."""
+    from scanner import ChestEvent, MobSpawnedEvent
+
+    if isinstance(event, ChestEvent) and not event.opener_id:
+        return {"title": f"Peti: {event.chest_name}", "color": 0xF1C40F,
+                "description": f"Kualitas: {event.chest_quality or 'N/A'}, Posisi: {event.position}"}
+    if isinstance(event, MobSpawnedEvent) and event.category in ("BOSS", "MINIBOSS"):
+        return {"title": f"{event.category}: {event.name}", "color": 0xE74C3C,
+                "description": f"Tier: {event.tier or 'N/A'}, Posisi: {event.position}"}
+    return None
+
+
+class DiscordWebhookSubscriber(Subscriber):
+    """
+    Mengirim embed ke webhook Discord dari satu task (bukan satu thread per pesan). Embed
+    digabung hingga 10 per request sesuai batas Discord, dan header Retry-After pada respons
+    429 dihormati. HTTP memakai requests di thread executor agar tidak butuh dependensi async baru.
+    """
+    name = "discord"
+    MAX_EMBEDS = 10
+
+    def __init__(self, webhook_url: str, formatter: Callable[[Any], Optional[Dict[str, Any]]] = default_discord_embed,
+                 username: str = "Dungeon Scanner", queue_size: int = 200):
+        super().__init__(queue_size)
+        self.webhook_url = webhook_url
+        self.formatter = formatter
+        self.username = username
+
+    def wants(self, event) -> bool:
+        return self.formatter(event) is not None
+
+    async def run(self):
+        while True:
+            events = [await self.queue.get()]
+            while len(events) < self.MAX_EMBEDS and not self.queue.empty():
+                events.append(self.queue.get_nowait())
+            try:
+                await self._post([self.formatter(e) for e in events])
+                self.delivered += len(events)
+                if self.latency is not None:
+                    for event in events:
+                        self.latency.record_since_capture(f"subscriber:{self.name}", getattr(event, "capture_timestamp", None))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Gagal mengirim {len(events)} embed ke Discord: {e}")
+            finally:
+                for _ in events:
+                    self.queue.task_done()
+
+    async def _post(self, embeds: List[Dict[str, Any]]):
+        import requests
+
+        payload = json.dumps({"username": self.username, "embeds": embeds})
+        headers = {"Content-Type": "application/json"}
+        for _attempt in range(3):
+            response = await asyncio.to_thread(requests.post, self.webhook_url, data=payload,
+                                               headers=headers, timeout=10)
+            if response.status_code != 429:
+                if response.status_code >= 400:
+                    raise RuntimeError(f"Status {response.status_code}: {response.text[:200]}")
+                return
+            retry_after = float(response.headers.get("Retry-After", "1"))
+            await asyncio.sleep(retry_after)
+        raise RuntimeError("Rate limit Discord tidak kunjung selesai.")
@@ -1,13 +1,23 @@
 import json
+import struct
 import time
-from dataclasses import dataclass, field # Menggunakan dataclasses untuk struktur event
-from typing import Dict, Any, Optional, Tuple, List
+from dataclasses import dataclass, field, replace # Menggunakan dataclasses untuk struktur event
+from typing import AbstractSet, Dict, Any, Iterable, Optional, Tuple, List
 
 # Asumsikan utilitas ini sudah ada dan berfungsi dari direktori .utils
 # Jika PhotonParser ada di scanner/__init__.py, maka impornya menjadi:
-from .utils.binary import BinaryStream
+from .protocol16 import (MSG_EVENT_DATA, MSG_OPERATION_RESPONSE, TYPE_BYTE_ARRAY, EventData, LazyParameterTable,
+                         OperationResponse, Protocol16Error,
+                         decode_message)
 # from .utils.config import Config # Uncomment jika Anda menggunakan Config di parser
 from .utils.logging import logger # Asumsikan logger sudah dikonfigurasi
+from .utils.latency import LatencyRecorder
+from .columnar import SpawnColumns
+from .diagnostics import KIND_EVENT, KIND_RESPONSE, DiagnosticsSink
+from .entities import KIND_CHARACTER, KIND_OBJECT, EntityTracker
+from .movement import MovementTracker
+from .entity_table import FLAG_CHEST, FLAG_MOB, EntityTable
+from .combat import HealthAggregator
 
 # --- Definisi Konstanta Tipe (untuk diimpor oleh gui.py) ---
 TYPE_EVENT_BOSS = "EVENT_BOSS"
@@ -76,19 +86,24 @@ load_translations()
 
 # --- Definisi Objek Event Terstruktur ---
 # Sebaiknya pindahkan ini ke file terpisah, misalnya scanner/events.py, lalu impor.
-@dataclass
+# Event bersifat slotted (tanpa __dict__) dan frozen: satu sesi panjang bisa menyimpan ratusan ribu
+# event, dan event dibagikan ke banyak subscriber sehingga tidak boleh diubah setelah dibuat.
+@dataclass(slots=True, frozen=True)
 class GameEvent:
     """Kelas dasar untuk semua event game yang dipancarkan."""
     # Semua field dengan default di kelas dasar harus keyword-only
     # jika kelas turunan akan menambahkan argumen posisi tanpa default.
     timestamp: float = field(default_factory=time.time, kw_only=True)
     raw_event_code: Optional[int] = field(default=None, kw_only=True)
+    # Hanya diisi jika PhotonParser dibuat dengan raw_parameters_ratio > 0 (debug/sampling)
     raw_parameters: Optional[Dict[int, Any]] = field(default=None, kw_only=True)
+    # Timestamp capture paket (epoch, dari backend capture) untuk mengukur latensi sampai UI
+    capture_timestamp: Optional[float] = field(default=None, kw_only=True)
 
     def __str__(self):
         return f"[{self.__class__.__name__}]"
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class UnknownEvent(GameEvent):
     """Event untuk kode yang tidak dikenal atau tidak ada handlernya."""
     event_code: int # Argumen posisi, tanpa default
@@ -97,7 +112,7 @@ class UnknownEvent(GameEvent):
     def __str__(self):
         return f"[{self.__class__.__name__}] Code: {self.event_code}, Params: {self.parameters}"
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MobSpawnedEvent(GameEvent):
     entity_id: int
     type_id: str # Type ID dari database.json (kunci internal_id)
@@ -114,7 +129,7 @@ class MobSpawnedEvent(GameEvent):
     def __str__(self):
         return f"[{self.__class__.__name__}] ID: {self.entity_id}, Type: {self.type_id}, Name: '{self.name}', Cat: {self.category}, Pos: {self.position}"
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EntityDeathEvent(GameEvent):
     victim_id: int # Argumen posisi, tanpa default
     # Field berikut opsional
@@ -126,7 +141,7 @@ class EntityDeathEvent(GameEvent):
     def __str__(self):
         return f"[{self.__class__.__name__}] Victim: {self.victim_id} ({self.victim_name or 'N/A'}) killed by Killer: {self.killer_id} ({self.killer_name or 'N/A'})"
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ChestEvent(GameEvent): 
     chest_id: int # Argumen posisi, tanpa default
     chest_type_id: str # Argumen posisi, tanpa default
@@ -141,6 +156,17 @@ class ChestEvent(GameEvent):
         action = "Opened" if self.opener_id else "Appeared"
         return f"[{self.__class__.__name__}] {action}: ID {self.chest_id}, Name '{self.chest_name}', Quality: {self.chest_quality}"
 
+@dataclass(slots=True, frozen=True)
+class ZoneChangedEvent(GameEvent):
+    """Response Join: klien masuk zona/cluster baru, semua entitas zona sebelumnya tidak berlaku."""
+    return_code: Optional[int] = None
+
+    def __str__(self):
+        return f"[{self.__class__.__name__}] RC: {self.return_code}"
+
+# chest_type_id untuk ChestOpened tanpa TypeIDKey; correlate() mengisinya dari peti yang dilacak
+UNKNOWN_CHEST_TYPE = "UNKNOWN_CHEST_TYPE"
+
 # --- Kode Event Albion Online (SANGAT PENTING: INI HANYA CONTOH PLACEHOLDER!) ---
 ALBION_EVENT_CODES = {
     "NewCharacter": 2,
@@ -153,10 +179,83 @@ ALBION_EVENT_CODES = {
     "ChestOpened": 157,
 }
 
+# Kode operasi yang response-nya ditangani parser
+ALBION_OPERATION_CODES = {
+    "Join": 2, # Masuk zona/cluster baru; entitas zona sebelumnya tidak berlaku lagi
+}
+
+# PlayerMovement: parameter 0 = id entitas, parameter 1 = byte array; posisi x dan z adalah dua
+# float little-endian mulai byte ke-9 dari array tersebut.
+MOVE_PARAM_ENTITY_ID = 0
+MOVE_PARAM_DATA = 1
+MOVE_POSITION_OFFSET = 9
+_MOVE_POSITION = struct.Struct("<ff")
+_BYTE_ARRAY_LENGTH = struct.Struct(">i")
+
+# HealthUpdate: 0 = id target, 2 = perubahan HP (negatif = damage), 3 = HP baru, 6 = id penyebab
+HEALTH_PARAM_TARGET_ID = 0
+HEALTH_PARAM_CHANGE = 2
+HEALTH_PARAM_NEW_HEALTH = 3
+HEALTH_PARAM_CAUSER_ID = 6
+
+# Semua kode event/op (1 byte); dipakai di MessageInterest untuk "decode semuanya"
+EVERY_CODE = frozenset(range(256))
+
+
+@dataclass
+class MessageInterest:
+    """
+    Kode yang perlu di-decode oleh PhotonParser. Pesan lain dikembalikan sebagai None tanpa
+    menyentuh tabel parameternya (mis. PlayerMovement dan HealthUpdate yang sangat sering).
+    None berarti "kode yang punya handler" (event_handlers / response_handlers parser), sehingga
+    handler yang ditambahkan belakangan otomatis ikut. OperationRequest tidak pernah di-decode
+    karena tidak menghasilkan GameEvent.
+    """
+    events: Optional[AbstractSet[int]] = None
+    responses: Optional[AbstractSet[int]] = None
+
+    @classmethod
+    def everything(cls) -> "MessageInterest":
+        """Decode semua event dan response (UnknownEvent untuk kode tanpa handler, log unknown_ids.txt)."""
+        return cls(events=EVERY_CODE, responses=EVERY_CODE)
+
 
 class PhotonParser:
-    def __init__(self, database_path='database.json'):
-        self._entity_database = self._load_entity_database(database_path)
+    def __init__(self, database_path='database.json', latency: Optional[LatencyRecorder] = None,
+                 interest: Optional[MessageInterest] = None, raw_parameters_ratio: float = 0.0,
+                 columns: Optional[SpawnColumns] = None, diagnostics: Optional[DiagnosticsSink] = None,
+                 entities: Optional[EntityTracker] = None, movement: Optional[MovementTracker] = None,
+                 combat: Optional[HealthAggregator] = None, correlate: bool = True):
+        # correlate=False: handler hanya men-decode (tanpa state entitas/kolom/combat). Dipakai worker
+        # pipeline multi-proses; proses yang melihat event dalam urutan capture memanggil correlate().
+        if not correlate and (movement is not None or combat is not None):
+            raise ValueError("movement dan combat membutuhkan correlate=True (state per entitas).")
+        self.correlate_events = correlate
+        # Jika diberikan, durasi decode ("parse") dan handler ("handler") dicatat per pesan
+        self.latency = latency
+        # Jika diberikan, handler spawn mob/peti juga menulis satu baris ke buffer kolom ini
+        self.columns = columns
+        # Event/response tak dikenal dan error handler dikelompokkan lalu ditulis di latar belakang.
+        # Tanpa sink eksplisit, DiagnosticsSink default (unknown_ids.txt) dibuat saat laporan pertama.
+        self.diagnostics = diagnostics
+        self._owns_diagnostics = False
+        # Mob dan peti yang sedang hidup di zona ini, untuk melengkapi CharacterDeath dan ChestOpened
+        self.entities = entities if entities is not None else EntityTracker()
+        # Riwayat posisi dari PlayerMovement. Tanpa tracker, PlayerMovement tetap dilewati prefilter.
+        self.movement = movement
+        # Agregasi damage/heal dari HealthUpdate. Tanpa agregator, HealthUpdate tetap dilewati prefilter.
+        self.combat = combat
+        # Porsi event yang menyimpan salinan parameter mentah di GameEvent.raw_parameters:
+        # 0.0 = tidak ada (default), 1.0 = semua (mode debug), 0.01 = satu dari setiap 100 event.
+        self.raw_parameters_ratio = raw_parameters_ratio
+        self._raw_parameters_budget = 0.0
+        self.interest = interest or MessageInterest()
+        self.messages_skipped = 0 # Pesan yang ditolak prefilter tanpa decode parameter
+        self.messages_decoded = 0
+        self._capture_timestamp: Optional[float] = None
+        self._parse_start = 0.0
+        # database.json dikompilasi sekali menjadi record integer (lihat entity_table.py)
+        self._entity_table = self._load_entity_database(database_path)
         self._unknown_event_codes_logged = set()
         self._unknown_response_opcodes_logged = set()
 
@@ -166,70 +265,144 @@ class PhotonParser:
             ALBION_EVENT_CODES.get("NewObject"): self._handle_new_object,
             ALBION_EVENT_CODES.get("ChestOpened"): self._handle_chest_opened,
         }
-        self.response_handlers = {}
+        if movement is not None:
+            self.event_handlers[ALBION_EVENT_CODES.get("PlayerMovement")] = self._handle_player_movement
+        if combat is not None:
+            self.event_handlers[ALBION_EVENT_CODES.get("HealthUpdate")] = self._handle_health_update
+        self.response_handlers = {
+            ALBION_OPERATION_CODES.get("Join"): self._handle_join_response,
+        }
 
-    def _load_entity_database(self, db_path):
+    def _load_entity_database(self, db_path) -> EntityTable:
         try:
-            with open(db_path, 'r', encoding='utf-8') as f:
-                db = json.load(f)
-                logger.info(f"Database entitas berhasil dimuat dari '{db_path}'. Total entitas: {len(db)}")
-                return db
+            table = EntityTable.from_file(db_path)
+            logger.info(f"Database entitas berhasil dimuat dari '{db_path}'. Total entitas: {len(table)}")
+            return table
         except FileNotFoundError:
             logger.error(f"PENTING: File database '{db_path}' tidak ditemukan. Jalankan build_database.py terlebih dahulu.")
-            return {}
+            return EntityTable({})
         except json.JSONDecodeError:
             logger.error(f"Error mem-parse database dari '{db_path}'.")
-            return {}
-
-    def _get_entity_details(self, internal_id_key: str) -> Optional[Dict[str, Any]]:
-        return self._entity_database.get(str(internal_id_key))
-
-    def parse_message(self, body: bytes) -> Optional[GameEvent]:
+            return EntityTable({})
+
+    def wants_message(self, msg_type: int, code: int) -> bool:
+        """Prefilter: True jika pesan dengan tipe dan kode event/op ini perlu di-decode."""
+        if msg_type == MSG_EVENT_DATA:
+            wanted = self.interest.events
+            return code in (self.event_handlers if wanted is None else wanted)
+        if msg_type == MSG_OPERATION_RESPONSE:
+            wanted = self.interest.responses
+            return code in (self.response_handlers if wanted is None else wanted)
+        return False
+
+    def prefilter_stats(self) -> Dict[str, int]:
+        return {"skipped": self.messages_skipped, "decoded": self.messages_decoded}
+
+    def parse_message(self, body: bytes, capture_timestamp: Optional[float] = None) -> Optional[GameEvent]:
         if not body:
             logger.warning("Menerima body pesan kosong.")
             return None
-        
-        stream = BinaryStream(body)
-        try:
-            msg_type = stream.read_byte()
-            
-            if msg_type == 2: # OperationRequest
-                op_code = stream.read_byte()
-                parameters = self._deserialize_parameter_table(stream)
-                # Tidak menghasilkan GameEvent untuk request saat ini
-                return None 
-            elif msg_type == 3: # OperationResponse
-                op_code = stream.read_byte()
-                return_code = stream.read_short()
-                debug_message_val = self._deserialize_photon_value(stream) 
-                debug_message = str(debug_message_val) if debug_message_val is not None else None
-                parameters = self._deserialize_parameter_table(stream)
-                return self._handle_operation_response(op_code, return_code, debug_message, parameters, raw_params=parameters)
-            elif msg_type == 4: # EventData
-                event_code = stream.read_byte() 
-                parameters = self._deserialize_parameter_table(stream)
-                return self._handle_event_data(event_code, parameters, raw_params=parameters)
+        if len(body) >= 2 and not self.wants_message(body[0], body[1]):
+            self.messages_skipped += 1
+            return None
+        self.messages_decoded += 1
+        return self._decode_and_dispatch(body, capture_timestamp)
+
+    def parse_messages(self, bodies: Iterable[Any], capture_timestamp: Optional[float] = None) -> List[GameEvent]:
+        """
+        Versi batch parse_message. Setiap item berupa buffer body, atau pasangan (body, capture_timestamp)
+        jika timestamp per pesan berbeda. Mengembalikan GameEvent dalam urutan masukan; pesan yang tidak
+        menghasilkan event (dilewati prefilter, request, gagal decode) tidak disertakan.
+        Set minat dan referensi method diambil sekali per batch, bukan sekali per pesan.
+        """
+        events: List[GameEvent] = []
+        append = events.append
+        decode = self._decode_and_dispatch
+        event_codes = self.event_handlers if self.interest.events is None else self.interest.events
+        response_codes = self.response_handlers if self.interest.responses is None else self.interest.responses
+        skipped = decoded = 0
+        for item in bodies:
+            if type(item) is tuple:
+                body, timestamp = item
             else:
-                logger.warning(f"Tipe pesan Photon tidak dikenal: {msg_type} pada awal stream. Body: {body[:20].hex()}")
-                return None
-        except IndexError: # Lebih spesifik dari Exception umum
-            logger.error(f"Stream berakhir prematur saat parsing tipe pesan Photon. Body: {body[:20].hex()}")
+                body, timestamp = item, capture_timestamp
+            if len(body) < 2:
+                skipped += 1
+                continue
+            msg_type, code = body[0], body[1]
+            if not ((msg_type == MSG_EVENT_DATA and code in event_codes)
+                    or (msg_type == MSG_OPERATION_RESPONSE and code in response_codes)):
+                skipped += 1
+                continue
+            decoded += 1
+            event = decode(body, timestamp)
+            if event is not None:
+                append(event)
+        self.messages_skipped += skipped
+        self.messages_decoded += decoded
+        return events
+
+    def _decode_and_dispatch(self, body, capture_timestamp: Optional[float]) -> Optional[GameEvent]:
+        self._capture_timestamp = capture_timestamp
+        self._parse_start = time.perf_counter()
+        try:
+            # Parameter di-decode saat diakses handler; kunci yang tidak dibaca tidak pernah dibangun
+            message = decode_message(body, lazy=True)
+            if isinstance(message, EventData):
+                self._record_parse_latency()
+                return self._handle_event_data(message.code, message.parameters,
+                                               raw_params=self._sample_raw_parameters(message.parameters))
+            elif isinstance(message, OperationResponse):
+                debug_message = str(message.debug_message) if message.debug_message is not None else None
+                self._record_parse_latency()
+                return self._handle_operation_response(message.op_code, message.return_code, debug_message,
+                                                       message.parameters,
+                                                       raw_params=self._sample_raw_parameters(message.parameters))
+            # OperationRequest: tidak menghasilkan GameEvent saat ini
+            return None
+        except Protocol16Error as pe: # Tipe tidak dikenal atau data terpotong
+            logger.error(f"Gagal men-decode pesan Photon: {pe}. Body Awal: {body[:30].hex()}")
             return None
-        except ValueError as ve: # Dari _deserialize_photon_value jika tipe tidak dikenal
-             logger.error(f"ValueError saat parsing pesan Photon: {ve}. Body Awal: {body[:30].hex()}")
-             return None
         except Exception as e: # Tangkap semua exception lain
             logger.error(f"Error umum saat parsing pesan Photon: {e}, Body Awal: {body[:30].hex()}")
             return None
 
+    def _sample_raw_parameters(self, parameters) -> Optional[Dict[int, Any]]:
+        """Salinan dict parameter untuk event yang terpilih sampling, selain itu None."""
+        if self.raw_parameters_ratio <= 0.0:
+            return None
+        # Akumulator deterministik: tepat raw_parameters_ratio dari seluruh event, tersebar merata
+        self._raw_parameters_budget += self.raw_parameters_ratio
+        if self._raw_parameters_budget < 1.0:
+            return None
+        self._raw_parameters_budget -= 1.0
+        return dict(parameters)
+
+    def _event_timestamp(self) -> float:
+        return self._capture_timestamp if self._capture_timestamp is not None else time.time()
+
+    def _record_parse_latency(self):
+        if self.latency is not None:
+            self.latency.record("parse", time.perf_counter() - self._parse_start)
+
+    def _timed_handler(self, handler, *args, **kwargs):
+        if self.latency is None:
+            return handler(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return handler(*args, **kwargs)
+        finally:
+            self.latency.record("handler", time.perf_counter() - start)
+
     def _handle_event_data(self, event_code: int, parameters: Dict[int, Any], raw_params) -> Optional[GameEvent]:
         handler = self.event_handlers.get(event_code)
         # Membuat instance GameEvent dengan kw_only args
-        base_event_kwargs = {'raw_event_code': event_code, 'raw_parameters': raw_params}
+        base_event_kwargs = {'raw_event_code': event_code, 'raw_parameters': raw_params,
+                             'capture_timestamp': self._capture_timestamp}
         if handler:
             try:
                 # Handler sekarang harus menerima **kwargs dan meneruskannya ke konstruktor eventnya
-                return handler(parameters, **base_event_kwargs)
+                return self._timed_handler(handler, parameters, **base_event_kwargs)
             except Exception as e:
                 logger.error(f"Error di handler untuk event code {event_code}: {e}. Params: {parameters}")
                 self._log_unknown_event_details(event_code, parameters, error=str(e))
@@ -243,10 +416,11 @@ class PhotonParser:
 
     def _handle_operation_response(self, op_code: int, return_code: int, debug_message: Optional[str], parameters: Dict[int, Any], raw_params) -> Optional[GameEvent]:
         handler = self.response_handlers.get(op_code)
-        base_event_kwargs = {'raw_event_code': op_code, 'raw_parameters': raw_params} # op_code sebagai raw_event_code
+        base_event_kwargs = {'raw_event_code': op_code, 'raw_parameters': raw_params, # op_code sebagai raw_event_code
+                             'capture_timestamp': self._capture_timestamp}
         if handler:
             try:
-                return handler(return_code, debug_message, parameters, **base_event_kwargs)
+                return self._timed_handler(handler, return_code, debug_message, parameters, **base_event_kwargs)
             except Exception as e:
                 logger.error(f"Error di handler response untuk OpCode {op_code}: {e}. Params: {parameters}")
                 self._log_unknown_response_details(op_code, return_code, debug_message, parameters, error=str(e))
@@ -263,6 +437,20 @@ class PhotonParser:
             entity_id = int(parameters.get(0))
             type_id_key = str(parameters.get(1)) 
 
+            if entity_id is None or not type_id_key:
+                logger.warning(f"Parameter ID atau TypeIDKey hilang di NewCharacter: {parameters}")
+                return None
+
+            table = self._entity_table
+            record = table.records.get(type_id_key)
+            if record is None:
+                logger.warning(f"TypeIDKey '{type_id_key}' tidak ditemukan di database untuk NewCharacter id {entity_id}.")
+                return None
+            category_code, _quality_code, tier, name_index, faction_index, flags = record
+            # Selain mob/boss: selesai sebelum posisi dan health di-decode
+            if not flags & FLAG_MOB:
+                return None
+
             pos_x = parameters.get(7) 
             pos_z = parameters.get(9) 
             position = (float(pos_x), float(pos_z)) if pos_x is not None and pos_z is not None else (0.0, 0.0)
@@ -272,44 +460,25 @@ class PhotonParser:
             if isinstance(health_array, list) and len(health_array) >= 2:
                 current_health = float(health_array[0])
                 max_health = float(health_array[1])
-            
-            if entity_id is None or not type_id_key:
-                logger.warning(f"Parameter ID atau TypeIDKey hilang di NewCharacter: {parameters}")
-                return None
-
-            entity_details = self._get_entity_details(type_id_key)
-            name_from_db, category_from_db, faction_from_db, tier_from_db = "Unknown Entity", "UNKNOWN", "UNKNOWN", "0"
 
-            if entity_details:
-                name_from_db = entity_details.get('name_en', type_id_key) # Gunakan name_en dari database
-                category_from_db = entity_details.get('category', "UNKNOWN")
-                faction_from_db = entity_details.get('faction', "UNKNOWN")
-                tier_from_db = entity_details.get('tier', "0")
-            else:
-                logger.warning(f"TypeIDKey '{type_id_key}' tidak ditemukan di database untuk NewCharacter id {entity_id}.")
-
-            name_from_event = parameters.get(2) 
-            # Prioritaskan nama dari database jika ada, kecuali jika kategori bukan MOB/BOSS
-            # atau jika nama dari event lebih spesifik (misalnya, nama pemain)
-            final_name = name_from_db
-            if category_from_db not in ["MOB", "BOSS", "MINIBOSS", "CHAMPION_MOB"] and name_from_event:
-                 final_name = str(name_from_event)
-            elif not entity_details and name_from_event: # Jika tidak ada di DB tapi ada nama di event
-                 final_name = str(name_from_event)
-
-
-            if category_from_db in ["MOB", "BOSS", "MINIBOSS", "CHAMPION_MOB"]:
-                # Gunakan get_translation untuk nama yang akan ditampilkan jika perlu
-                # translated_name = get_translation(entity_details.get('ingame_id_key'), final_name) if entity_details else final_name
-                # logger.info(f"MOB/BOSS SPAWNED: ID={entity_id}, TypeKey={type_id_key}, Name='{translated_name}', Cat={category_from_db}, Pos={position}, HP={current_health}/{max_health}")
-                return MobSpawnedEvent(
-                    entity_id=entity_id, type_id=type_id_key, name=final_name, # Simpan nama EN di event object
-                    position=position, max_health=max_health, current_health=current_health,
-                    category=category_from_db, faction=faction_from_db, tier=tier_from_db,
-                    **kwargs 
-                )
-            else:
-                return None
+            # Untuk mob/boss nama dari database selalu diprioritaskan di atas nama dari event
+            final_name = table.strings[name_index]
+            category_from_db = table.categories[category_code]
+            faction_from_db = table.strings[faction_index]
+            tier_from_db = str(tier)
+
+            if self.correlate_events:
+                self._track_mob(entity_id, type_id_key, self._event_timestamp(), final_name, category_from_db,
+                                position, current_health, max_health)
+            # Gunakan get_translation untuk nama yang akan ditampilkan jika perlu
+            # translated_name = get_translation(entity_details.get('ingame_id_key'), final_name) if entity_details else final_name
+            # logger.info(f"MOB/BOSS SPAWNED: ID={entity_id}, TypeKey={type_id_key}, Name='{translated_name}', Cat={category_from_db}, Pos={position}, HP={current_health}/{max_health}")
+            return MobSpawnedEvent(
+                entity_id=entity_id, type_id=type_id_key, name=final_name, # Simpan nama EN di event object
+                position=position, max_health=max_health, current_health=current_health,
+                category=category_from_db, faction=faction_from_db, tier=tier_from_db,
+                **kwargs 
+            )
         except Exception as e:
             logger.error(f"Error parsing NewCharacter (EvCode {kwargs.get('raw_event_code')}): {e}. Params: {parameters}")
             self._log_unknown_event_details(kwargs.get('raw_event_code'), parameters, error=str(e))
@@ -328,7 +497,11 @@ class PhotonParser:
             victim_name = str(victim_name_param) if victim_name_param else None
             killer_name = str(killer_name_param) if killer_name_param else None
             
-            victim_category = None # TODO: Dapatkan ini dari pelacakan entitas aktif
+            victim_category = None
+            victim = self._track_death(victim_id) if self.correlate_events else None
+            if victim is not None:
+                victim_category = victim.category
+                victim_name = victim_name or victim.name
 
             # logger.info(f"DEATH: VictimID={victim_id} ({victim_name or 'N/A'}), KillerID={killer_id} ({killer_name or 'N/A'})")
             return EntityDeathEvent(
@@ -346,24 +519,25 @@ class PhotonParser:
             object_id = int(parameters.get(0))
             type_id_key = str(parameters.get(1))
 
-            pos_array = parameters.get(2)
-            position = (float(pos_array[0]), float(pos_array[1])) if isinstance(pos_array, (list, tuple)) and len(pos_array) >= 2 else None
-
             if object_id is None or not type_id_key:
                 logger.warning(f"Parameter ID atau TypeIDKey hilang di NewObject: {parameters}")
                 return None
 
-            entity_details = self._get_entity_details(type_id_key)
-            name, category, quality = "Unknown Object", "UNKNOWN_OBJECT", None
-
-            if entity_details:
-                name = entity_details.get('name_en', type_id_key) # Gunakan name_en dari database
-                category = entity_details.get('category', "UNKNOWN_OBJECT")
-                quality = entity_details.get('quality')
-            else:
+            table = self._entity_table
+            record = table.records.get(type_id_key)
+            if record is None:
                 logger.warning(f"TypeIDKey '{type_id_key}' tidak ditemukan di database untuk NewObject id {object_id}.")
-
-            if category and category.startswith("CHEST_"):
+                return None
+            category_code, quality_code, _tier, name_index, _faction_index, flags = record
+
+            if flags & FLAG_CHEST:
+                pos_array = parameters.get(2)
+                position = (float(pos_array[0]), float(pos_array[1])) if isinstance(pos_array, (list, tuple)) and len(pos_array) >= 2 else None
+                name = table.strings[name_index]
+                category = table.categories[category_code]
+                quality = table.qualities[quality_code]
+                if self.correlate_events:
+                    self._track_chest(object_id, type_id_key, self._event_timestamp(), name, category, quality, position)
                 # translated_name = get_translation(entity_details.get('ingame_id_key'), name) if entity_details else name
                 # logger.info(f"CHEST SPAWNED (via NewObject): ID={object_id}, TypeKey={type_id_key}, Name='{translated_name}', Cat={category}, Quality={quality}, Pos={position}")
                 return ChestEvent(
@@ -384,29 +558,35 @@ class PhotonParser:
             opener_id = int(parameters.get(1))
             chest_type_id_key = str(parameters.get(2)) if parameters.get(2) else None # Mungkin tidak selalu ada
             
-            chest_name, chest_quality, chest_category = "Unknown Chest", None, None
-
-            if chest_type_id_key:
-                entity_details = self._get_entity_details(chest_type_id_key)
-                if entity_details:
-                    chest_name = entity_details.get('name_en', chest_type_id_key) # Gunakan name_en
-                    chest_quality = entity_details.get('quality')
-                    chest_category = entity_details.get('category')
+            chest_name, chest_quality, chest_category, position = "Unknown Chest", None, None, None
+            tracked = self._track_chest_opened(chest_id, opener_id, self._event_timestamp(), chest_type_id_key) \
+                if self.correlate_events else None
+            if tracked is not None:
+                position = tracked.position
+
+            if chest_type_id_key is None and tracked is not None:
+                # Tipe tidak ada di event buka: ambil dari NewObject saat peti muncul
+                chest_type_id_key = tracked.type_id
+                chest_name = tracked.name or chest_name
+                chest_quality = tracked.quality
+                chest_category = tracked.category
+            elif chest_type_id_key:
+                table = self._entity_table
+                record = table.get(chest_type_id_key)
+                if record is not None:
+                    chest_name = table.name(record)
+                    chest_quality = table.quality(record)
+                    chest_category = table.category(record)
                 else:
                     logger.warning(f"TypeIDKey '{chest_type_id_key}' tidak ditemukan di database untuk ChestOpened id {chest_id}.")
-            else:
-                # Jika type_id_key tidak ada di event buka, kita mungkin perlu melacaknya dari saat spawn.
-                # Untuk sekarang, kita tandai sebagai tidak diketahui jika tidak ada di event.
-                logger.warning(f"ChestOpened event untuk ID {chest_id} tanpa TypeIDKey di parameter. Info peti mungkin tidak lengkap.")
-                # Anda bisa mencoba mencari chest_id di daftar peti yang aktif/terlihat yang dilacak oleh DungeonTracker.
 
             # translated_name = get_translation(entity_details.get('ingame_id_key'), chest_name) if chest_type_id_key and entity_details else chest_name
             # logger.info(f"CHEST OPENED: ID={chest_id}, Name='{translated_name}', OpenerID={opener_id}, Quality={chest_quality}")
             return ChestEvent(
-                chest_id=chest_id, chest_type_id=chest_type_id_key or "UNKNOWN_CHEST_TYPE", 
+                chest_id=chest_id, chest_type_id=chest_type_id_key or UNKNOWN_CHEST_TYPE,
                 chest_name=chest_name, # Simpan name_en
                 chest_quality=chest_quality, chest_category=chest_category,
-                opener_id=opener_id,
+                position=position, opener_id=opener_id,
                 **kwargs
             )
         except Exception as e:
@@ -414,69 +594,141 @@ class PhotonParser:
             self._log_unknown_event_details(kwargs.get('raw_event_code'), parameters, error=str(e))
             return UnknownEvent(event_code=kwargs.get('raw_event_code'), parameters=parameters, **kwargs)
 
-    def _deserialize_parameter_table(self, stream: BinaryStream) -> Dict[int, Any]:
-        param_count = stream.read_short()
-        parameters = {}
-        for _ in range(param_count):
-            key = stream.read_byte() 
-            value = self._deserialize_photon_value(stream)
-            parameters[key] = value
-        return parameters
-
-    def _deserialize_photon_value(self, stream: BinaryStream) -> Any:
-        type_code = stream.read_byte()
-        if type_code == 0: return None
-        elif type_code == 42: return self._deserialize_parameter_table(stream)
-        elif type_code == 68: return stream.read_double()
-        elif type_code == 97:
-            size = stream.read_int() 
-            return stream.read_bytes(size)
-        elif type_code == 98: return stream.read_byte()
-        elif type_code == 100: return stream.read_double()
-        elif type_code == 102: return stream.read_float()
-        elif type_code == 104: return self._deserialize_parameter_table(stream)
-        elif type_code == 105: return stream.read_int()
-        elif type_code == 107: return stream.read_short()
-        elif type_code == 108: return stream.read_long()
-        elif type_code == 110:
-            size = stream.read_int()
-            return [stream.read_int() for _ in range(size)]
-        elif type_code == 111: return stream.read_bool()
-        elif type_code == 115: return stream.read_string() 
-        elif type_code == 118:
-            size = stream.read_short()
-            arr = [self._deserialize_photon_value(stream) for _ in range(size)]
-            return arr
-        elif type_code == 120:
-            size = stream.read_int()
-            return [stream.read_long() for _ in range(size)]
-        elif type_code == 121:
-            size = stream.read_short() 
-            return [stream.read_string() for _ in range(size)]
+    def _handle_player_movement(self, parameters: Dict[int, Any], **kwargs) -> None:
+        # Event tersibuk: tidak membuat GameEvent, posisi langsung ditulis ke ring buffer
+        entity_id = parameters.get(MOVE_PARAM_ENTITY_ID)
+        if entity_id is None:
+            return None
+        if isinstance(parameters, LazyParameterTable):
+            # Baca float langsung dari buffer pesan tanpa membuat salinan byte array
+            located = parameters.locate(MOVE_PARAM_DATA)
+            if located is None or located[0] != TYPE_BYTE_ARRAY:
+                return None
+            buf, offset = parameters.buffer, located[1]
+            length = _BYTE_ARRAY_LENGTH.unpack_from(buf, offset)[0]
+            if length < MOVE_POSITION_OFFSET + _MOVE_POSITION.size:
+                return None
+            x, z = _MOVE_POSITION.unpack_from(buf, offset + 4 + MOVE_POSITION_OFFSET)
         else:
-            logger.error(f"Tipe data Photon TIDAK DIKENAL dalam parameter: {type_code} at stream pos {stream.tell()-1}. Sisa stream mungkin tidak valid.")
-            raise ValueError(f"Tipe data Photon tidak dikenal: {type_code} at stream pos {stream.tell()-1}")
+            data = parameters.get(MOVE_PARAM_DATA)
+            if not isinstance(data, (bytes, bytearray)) or len(data) < MOVE_POSITION_OFFSET + _MOVE_POSITION.size:
+                return None
+            x, z = _MOVE_POSITION.unpack_from(data, MOVE_POSITION_OFFSET)
+        entity_id = int(entity_id)
+        timestamp = self._event_timestamp()
+        self.movement.update(entity_id, timestamp, x, z)
+        # Mob/peti yang dilacak ikut berpindah (termasuk di SpatialIndex jika ada)
+        self.entities.touch(entity_id, timestamp, (x, z))
+        return None
+
+    def _handle_health_update(self, parameters: Dict[int, Any], **kwargs) -> None:
+        # Seperti PlayerMovement: sangat sering, tidak membuat GameEvent
+        target_id = parameters.get(HEALTH_PARAM_TARGET_ID)
+        change = parameters.get(HEALTH_PARAM_CHANGE)
+        if target_id is None or change is None:
+            return None
+        target_id = int(target_id)
+        new_health = parameters.get(HEALTH_PARAM_NEW_HEALTH)
+        causer_id = parameters.get(HEALTH_PARAM_CAUSER_ID)
+        new_health = float(new_health) if new_health is not None else None
+        self.combat.update(target_id, self._event_timestamp(), float(change), new_health,
+                           int(causer_id) if causer_id is not None else None)
+        if new_health is not None:
+            tracked = self.entities.get(target_id)
+            if tracked is not None:
+                tracked.current_health = new_health
+        return None
+
+    def _handle_join_response(self, return_code: int, debug_message: Optional[str], parameters: Dict[int, Any],
+                              **kwargs) -> Optional[GameEvent]:
+        if self.correlate_events:
+            self._track_zone_change()
+        return ZoneChangedEvent(return_code=return_code, **kwargs)
+
+    # --- State per entitas (dipakai handler, atau correlate() untuk event dari parser correlate=False) ---
+
+    def _track_mob(self, entity_id, type_id, timestamp, name, category, position, current_health, max_health):
+        self.entities.spawn(entity_id, KIND_CHARACTER, type_id, timestamp, name=name, category=category,
+                            position=position, current_health=current_health, max_health=max_health)
+        if self.combat is not None:
+            self.combat.set_health(entity_id, current_health, max_health)
+        if self.columns is not None:
+            self.columns.append_mob(timestamp, entity_id, type_id, category, position, current_health)
+
+    def _track_chest(self, chest_id, type_id, timestamp, name, category, quality, position):
+        self.entities.spawn(chest_id, KIND_OBJECT, type_id, timestamp, name=name, category=category,
+                            quality=quality, position=position)
+        if self.columns is not None:
+            self.columns.append_chest(timestamp, chest_id, type_id, category, quality, position)
+
+    def _track_death(self, victim_id):
+        if self.combat is not None:
+            self.combat.set_health(victim_id, 0.0)
+        return self.entities.remove(victim_id)
+
+    def _track_chest_opened(self, chest_id, opener_id, timestamp, type_id):
+        tracked = self.entities.mark_opened(chest_id, opener_id, timestamp)
+        if tracked is None and type_id is None:
+            # Tidak ada di event dan peti tidak terlihat saat muncul (mis. capture dimulai di tengah zona)
+            logger.warning(f"ChestOpened event untuk ID {chest_id} tanpa TypeIDKey di parameter. Info peti mungkin tidak lengkap.")
+        return tracked
+
+    def _track_zone_change(self):
+        # Pindah zona: id entitas dipakai ulang di zona baru, jadi seluruh pelacakan direset
+        self.entities.clear()
+        if self.movement is not None:
+            self.movement.clear()
+        if self.combat is not None:
+            self.combat.clear()
+
+    def correlate(self, event: GameEvent) -> GameEvent:
+        """
+        Menerapkan event dari parser lain yang dibuat dengan correlate=False (mis. worker pipeline
+        multi-proses) ke state entitas parser ini, lalu melengkapi CharacterDeath/ChestOpened dari
+        entitas yang dilacak. Harus dipanggil dalam urutan capture. Parser dengan correlate=True
+        sudah melakukannya di handler; jangan panggil correlate() untuk event-nya sendiri.
+        """
+        timestamp = event.capture_timestamp if event.capture_timestamp is not None else event.timestamp
+        if isinstance(event, MobSpawnedEvent):
+            self._track_mob(event.entity_id, event.type_id, timestamp, event.name, event.category,
+                            event.position, event.current_health, event.max_health)
+        elif isinstance(event, ChestEvent):
+            if event.opener_id is None:
+                self._track_chest(event.chest_id, event.chest_type_id, timestamp, event.chest_name,
+                                  event.chest_category, event.chest_quality, event.position)
+                return event
+            type_missing = event.chest_type_id == UNKNOWN_CHEST_TYPE
+            tracked = self._track_chest_opened(event.chest_id, event.opener_id, timestamp,
+                                               None if type_missing else event.chest_type_id)
+            if tracked is None:
+                return event
+            if type_missing:
+                return replace(event, chest_type_id=tracked.type_id, chest_name=tracked.name or event.chest_name,
+                               chest_quality=tracked.quality, chest_category=tracked.category,
+                               position=tracked.position)
+            return replace(event, position=tracked.position)
+        elif isinstance(event, EntityDeathEvent):
+            victim = self._track_death(event.victim_id)
+            if victim is not None:
+                return replace(event, victim_category=victim.category, victim_name=event.victim_name or victim.name)
+        elif isinstance(event, ZoneChangedEvent):
+            self._track_zone_change()
+        return event
+
+    def _diagnostics_sink(self) -> DiagnosticsSink:
+        if self.diagnostics is None:
+            self.diagnostics = DiagnosticsSink()
+            self._owns_diagnostics = True
+        return self.diagnostics
 
     def _log_unknown_event_details(self, event_code, parameters, error=None):
-        log_entry = f"--- Unknown/Unhandled Event or Error ---\n"
-        log_entry += f"Timestamp: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
-        log_entry += f"EventCode: {event_code}\n"
-        log_entry += f"Parameters: {json.dumps(parameters, default=lambda o: f'<bytes len={len(o)}>' if isinstance(o, bytes) else repr(o), indent=2)}\n"
-        if error: log_entry += f"Error: {error}\n"
-        log_entry += f"--------------------------------------\n\n"
-        try:
-            with open('unknown_ids.txt', 'a', encoding='utf-8') as f: f.write(log_entry)
-        except IOError: logger.error("Gagal menulis ke unknown_ids.txt")
+        self._diagnostics_sink().report(KIND_EVENT, event_code, parameters, error=error)
 
     def _log_unknown_response_details(self, op_code, return_code, debug_message, parameters, error=None):
-        log_entry = f"--- Unknown/Unhandled Response or Error ---\n"
-        log_entry += f"Timestamp: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
-        log_entry += f"OperationCode: {op_code}\n"
-        log_entry += f"ReturnCode: {return_code}\n"
-        log_entry += f"DebugMessage: {debug_message}\n"
-        log_entry += f"Parameters: {json.dumps(parameters, default=lambda o: f'<bytes len={len(o)}>' if isinstance(o, bytes) else repr(o), indent=2)}\n"
-        if error: log_entry += f"Error: {error}\n"
-        log_entry += f"--------------------------------------\n\n"
-        try:
-            with open('unknown_ids.txt', 'a', encoding='utf-8') as f: f.write(log_entry)
-        except IOError: logger.error("Gagal menulis ke unknown_ids.txt")
+        self._diagnostics_sink().report(KIND_RESPONSE, op_code, parameters, error=error,
+                                        return_code=return_code, debug_message=debug_message)
+
+    def close(self):
+        """Menutup sink diagnostik default (menulis laporan yang tersisa). Sink eksplisit ditutup pemiliknya."""
+        if self._owns_diagnostics and self.diagnostics is not None:
+            self.diagnostics.close()
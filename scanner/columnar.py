@@ -0,0 +1,262 @@
+# file: scanner/columnar.py
+#
+# Buffer kolom (struct-of-arrays) untuk event spawn mob dan peti. Analitik dan overlay hanya
+# membutuhkan beberapa kolom (entity_id, indeks tipe, x, z, health, timestamp), jadi handler
+# PhotonParser menulis langsung ke sini tanpa membuat satu objek Python per event.
+#
+# Penyimpanan: daftar chunk berukuran tetap, tiap kolom satu array.array per chunk. Chunk baru
+# dialokasikan saat chunk terakhir penuh (tidak ada realokasi/penyalinan data lama). Jika NumPy
+# tersedia, view kolom adalah numpy.frombuffer di atas array.array tersebut (tanpa salin) dan
+# query berjalan tervektorisasi; tanpa NumPy, view berupa memoryview dan query memakai loop Python.
+
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+KIND_MOB = 0
+KIND_CHEST = 1
+
+# (nama kolom, typecode array.array)
+COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("timestamp", "d"),
+    ("entity_id", "q"),
+    ("type_index", "i"),
+    ("kind", "B"),
+    ("x", "f"),
+    ("z", "f"),
+    ("health", "f"),
+)
+_TYPECODES = dict(COLUMNS)
+NAN = float("nan")
+
+
+class TypeTable:
+    """
+    Interning type_id (kunci database) ke indeks integer kecil, beserta kategori dan kualitasnya.
+    Kolom type_index di buffer menyimpan indeks ini; filter kategori/kualitas diterjemahkan menjadi
+    himpunan indeks sekali per query, bukan per baris.
+    """
+    __slots__ = ("type_ids", "categories", "qualities", "_index")
+
+    def __init__(self):
+        self.type_ids: List[str] = []
+        self.categories: List[Optional[str]] = []
+        self.qualities: List[Optional[str]] = []
+        self._index: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.type_ids)
+
+    def intern(self, type_id: str, category: Optional[str] = None, quality: Optional[str] = None) -> int:
+        index = self._index.get(type_id)
+        if index is None:
+            index = len(self.type_ids)
+            self._index[type_id] = index
+            self.type_ids.append(type_id)
+            self.categories.append(category)
+            self.qualities.append(quality)
+        return index
+
+    def indices(self, category_prefix: Optional[str] = None, quality: Optional[str] = None) -> List[int]:
+        """Indeks tipe yang kategorinya diawali category_prefix dan/atau kualitasnya sama dengan quality."""
+        result = []
+        for index, (category, type_quality) in enumerate(zip(self.categories, self.qualities)):
+            if category_prefix is not None and not (category or "").startswith(category_prefix):
+                continue
+            if quality is not None and type_quality != quality:
+                continue
+            result.append(index)
+        return result
+
+
+class SpawnColumns:
+    """
+    Buffer kolom append-only untuk MobSpawnedEvent dan ChestEvent.
+
+    - append(...) dipanggil langsung oleh handler; biayanya tujuh penulisan indeks tanpa alokasi objek event.
+    - views() mengembalikan view per chunk tanpa salinan; view tetap valid selama chunk-nya tidak
+      dibuang (lihat max_chunks), dan baris yang ditambahkan kemudian tidak muncul di view lama.
+    - select(...) / chests(...) mengembalikan kolom baris yang cocok (salinan kecil hasil filter).
+
+    max_chunks membatasi memori: bila terlampaui, chunk tertua dibuang seluruhnya.
+    """
+
+    def __init__(self, chunk_rows: int = 8192, max_chunks: Optional[int] = None, types: Optional[TypeTable] = None):
+        if chunk_rows <= 0:
+            raise ValueError("chunk_rows harus positif.")
+        self.chunk_rows = chunk_rows
+        self.max_chunks = max_chunks
+        self.types = types if types is not None else TypeTable()
+        self._chunks: List[Dict[str, array]] = []
+        self._current: Optional[Dict[str, array]] = None
+        self._row = chunk_rows # Baris berikutnya di chunk terakhir; == chunk_rows berarti perlu chunk baru
+        self._dropped_rows = 0
+
+    def __len__(self) -> int:
+        if not self._chunks:
+            return 0
+        return (len(self._chunks) - 1) * self.chunk_rows + self._row
+
+    @property
+    def dropped_rows(self) -> int:
+        """Jumlah baris yang sudah dibuang karena max_chunks."""
+        return self._dropped_rows
+
+    def _new_chunk(self) -> Dict[str, array]:
+        # Chunk dialokasikan penuh di awal dan diisi per indeks: array.array yang sedang diekspor
+        # sebagai buffer (view NumPy/memoryview milik konsumen) tidak boleh diubah ukurannya.
+        chunk = {name: array(code, bytes(array(code).itemsize * self.chunk_rows)) for name, code in COLUMNS}
+        self._chunks.append(chunk)
+        if self.max_chunks is not None and len(self._chunks) > self.max_chunks:
+            self._chunks.pop(0)
+            self._dropped_rows += self.chunk_rows
+        self._current = chunk
+        self._row = 0
+        return chunk
+
+    def _rows(self, index: int) -> int:
+        return self._row if index == len(self._chunks) - 1 else self.chunk_rows
+
+    def append(self, kind: int, timestamp: float, entity_id: int, type_index: int,
+               x: float = NAN, z: float = NAN, health: float = NAN):
+        chunk = self._current
+        if self._row >= self.chunk_rows:
+            chunk = self._new_chunk()
+        row = self._row
+        chunk["timestamp"][row] = timestamp
+        chunk["entity_id"][row] = entity_id
+        chunk["type_index"][row] = type_index
+        chunk["kind"][row] = kind
+        chunk["x"][row] = x
+        chunk["z"][row] = z
+        chunk["health"][row] = health
+        self._row = row + 1
+
+    def append_mob(self, timestamp: float, entity_id: int, type_id: str, category: Optional[str],
+                   position: Optional[Tuple[float, float]], health: Optional[float]):
+        x, z = position if position is not None else (NAN, NAN)
+        self.append(KIND_MOB, timestamp, entity_id, self.types.intern(type_id, category),
+                    x, z, NAN if health is None else health)
+
+    def append_chest(self, timestamp: float, entity_id: int, type_id: str, category: Optional[str],
+                     quality: Optional[str], position: Optional[Tuple[float, float]]):
+        x, z = position if position is not None else (NAN, NAN)
+        self.append(KIND_CHEST, timestamp, entity_id, self.types.intern(type_id, category, quality), x, z)
+
+    def views(self) -> List[Dict[str, Any]]:
+        """
+        Satu dict {kolom: view} per chunk, tanpa menyalin data. Dengan NumPy berupa ndarray read-only
+        di atas buffer chunk; tanpa NumPy berupa memoryview.
+        """
+        result = []
+        for index, chunk in enumerate(self._chunks):
+            rows = self._rows(index)
+            if numpy is not None:
+                columns = {}
+                for name, code in COLUMNS:
+                    # frombuffer di atas array.array: berbagi memori; baris baru setelah ini tidak terlihat
+                    view = numpy.frombuffer(chunk[name], dtype=code, count=rows) if rows else numpy.empty(0, dtype=code)
+                    view.flags.writeable = False
+                    columns[name] = view
+            else:
+                columns = {name: memoryview(chunk[name])[:rows].toreadonly() for name, _code in COLUMNS}
+            result.append(columns)
+        return result
+
+    def column(self, name: str):
+        """Satu kolom utuh sebagai array berurutan (salinan, karena data tersebar di beberapa chunk)."""
+        code = _TYPECODES[name]
+        if numpy is not None:
+            parts = [columns[name] for columns in self.views()]
+            return numpy.concatenate(parts) if parts else numpy.empty(0, dtype=code)
+        merged = array(code)
+        for index, chunk in enumerate(self._chunks):
+            merged.extend(chunk[name][:self._rows(index)])
+        return merged
+
+    def select(self, kind: Optional[int] = None, since: Optional[float] = None, until: Optional[float] = None,
+               type_indices: Optional[Iterable[int]] = None) -> Dict[str, Any]:
+        """
+        Baris yang cocok dengan semua filter yang diberikan, sebagai dict {kolom: array}.
+        since/until adalah batas timestamp (inklusif); type_indices dari TypeTable.indices().
+        """
+        wanted_types = None if type_indices is None else list(type_indices)
+        if numpy is not None:
+            return self._select_numpy(kind, since, until, wanted_types)
+        return self._select_python(kind, since, until, wanted_types)
+
+    def _select_numpy(self, kind, since, until, wanted_types) -> Dict[str, Any]:
+        wanted = None if wanted_types is None else numpy.asarray(wanted_types, dtype=_TYPECODES["type_index"])
+        parts: Dict[str, list] = {name: [] for name, _code in COLUMNS}
+        for columns in self.views():
+            timestamps = columns["timestamp"]
+            if not len(timestamps):
+                continue
+            # Chunk yang seluruhnya di luar rentang waktu dilewati tanpa membuat mask
+            if since is not None and timestamps.max() < since:
+                continue
+            if until is not None and timestamps.min() > until:
+                continue
+            mask = numpy.ones(len(timestamps), dtype=bool)
+            if kind is not None:
+                mask &= columns["kind"] == kind
+            if since is not None:
+                mask &= timestamps >= since
+            if until is not None:
+                mask &= timestamps <= until
+            if wanted is not None:
+                mask &= numpy.isin(columns["type_index"], wanted)
+            if mask.any():
+                for name, _code in COLUMNS:
+                    parts[name].append(columns[name][mask])
+        return {name: numpy.concatenate(parts[name]) if parts[name] else numpy.empty(0, dtype=code)
+                for name, code in COLUMNS}
+
+    def _select_python(self, kind, since, until, wanted_types) -> Dict[str, Any]:
+        wanted = None if wanted_types is None else set(wanted_types)
+        result = {name: array(code) for name, code in COLUMNS}
+        for index, chunk in enumerate(self._chunks):
+            kinds, timestamps, type_column = chunk["kind"], chunk["timestamp"], chunk["type_index"]
+            for row in range(self._rows(index)):
+                if kind is not None and kinds[row] != kind:
+                    continue
+                if since is not None and timestamps[row] < since:
+                    continue
+                if until is not None and timestamps[row] > until:
+                    continue
+                if wanted is not None and type_column[row] not in wanted:
+                    continue
+                for name, _code in COLUMNS:
+                    result[name].append(chunk[name][row])
+        return result
+
+    def chests(self, quality: Optional[str] = None, last_seconds: Optional[float] = None,
+               now: Optional[float] = None) -> Dict[str, Any]:
+        """Peti (opsional per kualitas, mis. "GOLD") yang muncul dalam last_seconds terakhir."""
+        since = None
+        if last_seconds is not None:
+            since = (time.time() if now is None else now) - last_seconds
+        type_indices = self.types.indices(category_prefix="CHEST_", quality=quality) if quality is not None else None
+        return self.select(kind=KIND_CHEST, since=since, type_indices=type_indices)
+
+    def mobs(self, category: Optional[str] = None, last_seconds: Optional[float] = None,
+             now: Optional[float] = None) -> Dict[str, Any]:
+        """Mob (opsional per kategori, mis. "BOSS") yang muncul dalam last_seconds terakhir."""
+        since = None
+        if last_seconds is not None:
+            since = (time.time() if now is None else now) - last_seconds
+        type_indices = None
+        if category is not None:
+            type_indices = [index for index, type_category in enumerate(self.types.categories) if type_category == category]
+        return self.select(kind=KIND_MOB, since=since, type_indices=type_indices)
+
+    def clear(self):
+        self._chunks = []
+        self._current = None
+        self._row = self.chunk_rows
+        self._dropped_rows = 0
@@ -0,0 +1,205 @@
+# file: scanner/combat.py
+#
+# Agregasi HealthUpdate secara streaming: total damage/heal dalam jendela geser per entitas
+# (yang menerima) dan per penyerang (yang memberi), plus HP terakhir untuk HP% dan estimasi
+# time-to-kill boss.
+#
+# Jendela geser disimpan sebagai ring bucket waktu per baris ([baris, bucket] di NumPy). Update
+# O(1): bucket yang nomornya sudah kedaluwarsa di-nol-kan saat pertama kali ditulis ulang (lazy),
+# tanpa pemindaian periodik. Query menjumlahkan bucket yang masih di dalam jendela, vektor untuk
+# semua baris sekaligus.
+
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class WindowedTotals:
+    """
+    Total damage dan heal per id dalam jendela `buckets * bucket_seconds` detik terakhir.
+    Baris dialokasikan di awal (max_rows); saat penuh, id yang paling lama tidak diperbarui digantikan.
+    """
+
+    def __init__(self, window: float = 10.0, bucket_seconds: float = 0.5, max_rows: int = 4096):
+        if numpy is None:
+            raise ImportError("WindowedTotals membutuhkan NumPy (pip install numpy).")
+        self.bucket_seconds = bucket_seconds
+        self.buckets = max(1, int(round(window / bucket_seconds)))
+        self.window = self.buckets * bucket_seconds
+        self.max_rows = max_rows
+        self._damage = numpy.zeros((max_rows, self.buckets), dtype=numpy.float32)
+        self._heal = numpy.zeros((max_rows, self.buckets), dtype=numpy.float32)
+        self._epoch = numpy.full((max_rows, self.buckets), -1, dtype=numpy.int64) # Nomor bucket absolut
+        self._first = numpy.zeros(max_rows, dtype=numpy.float64)
+        self._last = numpy.zeros(max_rows, dtype=numpy.float64)
+        self._ids = numpy.zeros(max_rows, dtype=numpy.int64)
+        self._rows: Dict[int, int] = {}
+        self._free: List[int] = list(range(max_rows - 1, -1, -1))
+        self.replaced = 0
+        self.stale = 0 # Update yang lebih tua dari jendela bucket-nya (replay tidak berurutan)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _row(self, key: int, timestamp: float) -> int:
+        row = self._rows.get(key)
+        if row is not None:
+            return row
+        if self._free:
+            row = self._free.pop()
+        else:
+            row = int(numpy.argmin(self._last))
+            del self._rows[int(self._ids[row])]
+            self.replaced += 1
+        self._rows[key] = row
+        self._ids[row] = key
+        self._epoch[row] = -1
+        self._first[row] = timestamp
+        return row
+
+    def add(self, key: int, timestamp: float, damage: float = 0.0, heal: float = 0.0):
+        """
+        O(1): tambah ke bucket saat ini; bucket lama di slot yang sama di-reset di tempat. Update yang
+        datang terlambat masuk ke bucket-nya sendiri; jika slot itu sudah berisi bucket yang lebih baru
+        (update lebih tua dari satu jendela penuh), update diabaikan dan dihitung `stale`.
+        """
+        row = self._row(key, timestamp)
+        epoch = int(timestamp // self.bucket_seconds)
+        slot = epoch % self.buckets
+        stored = self._epoch[row, slot]
+        if stored > epoch:
+            self.stale += 1
+            return
+        if stored != epoch:
+            self._epoch[row, slot] = epoch
+            self._damage[row, slot] = damage
+            self._heal[row, slot] = heal
+        else:
+            if damage:
+                self._damage[row, slot] += damage
+            if heal:
+                self._heal[row, slot] += heal
+        if timestamp > self._last[row]:
+            self._last[row] = timestamp
+        elif timestamp < self._first[row]:
+            self._first[row] = timestamp
+
+    def remove(self, key: int) -> bool:
+        row = self._rows.pop(key, None)
+        if row is None:
+            return False
+        self._last[row] = 0.0
+        self._free.append(row)
+        return True
+
+    def clear(self):
+        self._rows.clear()
+        self._last[:] = 0.0
+        self._free = list(range(self.max_rows - 1, -1, -1))
+
+    def totals(self, now: float, keys: Optional[Iterable[int]] = None):
+        """
+        (ids, damage, heal, durasi) dalam jendela yang berakhir di `now`. Durasi = panjang jendela,
+        atau lebih pendek jika id baru terlihat (untuk DPS yang tidak diremehkan di awal).
+        """
+        if keys is None:
+            ids = numpy.fromiter(self._rows.keys(), dtype=numpy.int64, count=len(self._rows))
+            rows = numpy.fromiter(self._rows.values(), dtype=numpy.intp, count=len(self._rows))
+        else:
+            pairs = [(key, self._rows[key]) for key in keys if key in self._rows]
+            ids = numpy.array([key for key, _row in pairs], dtype=numpy.int64)
+            rows = numpy.array([row for _key, row in pairs], dtype=numpy.intp)
+        current = int(now // self.bucket_seconds)
+        live = self._epoch[rows] > current - self.buckets
+        damage = numpy.where(live, self._damage[rows], 0.0).sum(axis=1)
+        heal = numpy.where(live, self._heal[rows], 0.0).sum(axis=1)
+        duration = numpy.clip(now - self._first[rows], self.bucket_seconds, self.window)
+        return ids, damage, heal, duration
+
+
+class HealthAggregator:
+    """
+    Damage/heal per target dan per penyerang, serta HP terakhir per target.
+
+    - targets: WindowedTotals untuk damage yang diterima / heal yang diterima per entitas.
+    - attackers: WindowedTotals untuk damage yang diberikan / heal yang diberikan per penyebab.
+    """
+
+    def __init__(self, window: float = 10.0, bucket_seconds: float = 0.5, max_entities: int = 4096):
+        self.targets = WindowedTotals(window, bucket_seconds, max_entities)
+        self.attackers = WindowedTotals(window, bucket_seconds, max_entities)
+        self._health: Dict[int, List[Optional[float]]] = {} # entity_id -> [current, max]
+        self.updates = 0
+
+    def set_health(self, entity_id: int, current: Optional[float], maximum: Optional[float] = None):
+        """HP dari spawn (NewCharacter) atau HealthUpdate; max hanya diganti jika diberikan."""
+        health = self._health.get(entity_id)
+        if health is None:
+            self._health[entity_id] = [current, maximum]
+            return
+        if current is not None:
+            health[0] = current
+        if maximum is not None:
+            health[1] = maximum
+
+    def update(self, target_id: int, timestamp: float, change: float, new_health: Optional[float] = None,
+               attacker_id: Optional[int] = None):
+        """Satu HealthUpdate. change negatif = damage, positif = heal."""
+        self.updates += 1
+        damage, heal = (-change, 0.0) if change < 0 else (0.0, change)
+        self.targets.add(target_id, timestamp, damage, heal)
+        if attacker_id is not None:
+            self.attackers.add(attacker_id, timestamp, damage, heal)
+        if new_health is not None:
+            health = self._health.get(target_id)
+            if health is None:
+                self._health[target_id] = [new_health, None]
+                if len(self._health) > 2 * self.targets.max_rows:
+                    self._prune_health()
+            else:
+                health[0] = new_health
+
+    def _prune_health(self):
+        # HP hanya berguna untuk target yang masih punya baris; jarang dipanggil (amortized O(1))
+        rows = self.targets._rows
+        self._health = {key: value for key, value in self._health.items() if key in rows}
+
+    def remove(self, entity_id: int):
+        self.targets.remove(entity_id)
+        self.attackers.remove(entity_id)
+        self._health.pop(entity_id, None)
+
+    def clear(self):
+        self.targets.clear()
+        self.attackers.clear()
+        self._health.clear()
+
+    def status(self, now: float, entity_ids: Optional[Iterable[int]] = None) -> Dict[str, object]:
+        """
+        Status live per target (mis. id boss dari EntityTracker): HP%, DPS masuk bersih (damage - heal)
+        dalam jendela, dan estimasi time-to-kill (detik; inf jika tidak sedang turun).
+        Mengembalikan dict kolom array NumPy.
+        """
+        ids, damage, heal, duration = self.targets.totals(now, entity_ids)
+        current = numpy.array([self._health.get(i, (None, None))[0] for i in ids.tolist()], dtype=numpy.float64)
+        maximum = numpy.array([self._health.get(i, (None, None))[1] for i in ids.tolist()], dtype=numpy.float64)
+        net_dps = (damage - heal) / duration
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            hp_percent = numpy.where(maximum > 0, current / maximum * 100.0, numpy.nan)
+            ttk = numpy.where(net_dps > 0, numpy.maximum(current, 0.0) / net_dps, numpy.inf)
+        return {"ids": ids, "damage": damage, "heal": heal, "dps": net_dps,
+                "hp_percent": hp_percent, "ttk": ttk}
+
+    def top_attackers(self, now: float, count: int = 10):
+        """(ids, damage, dps) penyerang dengan damage terbesar dalam jendela."""
+        ids, damage, _heal, duration = self.attackers.totals(now)
+        order = numpy.argsort(-damage, kind="stable")[:count]
+        return ids[order], damage[order], damage[order] / duration[order]
+
+    def stats(self) -> Dict[str, int]:
+        return {"updates": self.updates, "targets": len(self.targets), "attackers": len(self.attackers),
+                "replaced": self.targets.replaced + self.attackers.replaced,
+                "stale": self.targets.stale + self.attackers.stale}
@@ -0,0 +1,220 @@
+# file: scanner/diagnostics.py
+#
+# Sink diagnostik untuk event/response yang tidak dikenal atau gagal di-handle. Pengganti penulisan
+# sinkron ke unknown_ids.txt (open + json.dumps(indent=2) per kejadian, di dalam jalur decode).
+#
+# report() hanya menghitung signature (kode + bentuk kunci/tipe parameter) dan menambah counter;
+# salinan parameter diambil untuk beberapa sampel pertama per signature saja. Thread latar belakang
+# menulis grup yang berubah setiap `flush_interval` detik, dan berhenti menulis sampel ketika file
+# mencapai `max_bytes`. Ledakan event rusak tidak lagi menahan parsing.
+
+import atexit
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+KIND_EVENT = "event"
+KIND_RESPONSE = "response"
+
+Signature = Tuple[str, int, bool, Tuple[Tuple[int, str], ...]]
+
+
+def parameter_shape(parameters) -> Tuple[Tuple[int, str], ...]:
+    """
+    Bentuk tabel parameter: pasangan (kunci, tipe) terurut. Untuk LazyParameterTable dipakai kode
+    tipe Protocol16 (tanpa decode nilai), untuk dict biasa nama tipe Python.
+    """
+    if parameters is None:
+        return ()
+    type_codes = getattr(parameters, "type_codes", None)
+    if type_codes is not None:
+        return tuple(sorted((key, chr(code)) for key, code in type_codes().items()))
+    return tuple(sorted((key, type(value).__name__) for key, value in parameters.items()))
+
+
+def _json_default(value):
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<bytes len={len(value)}>"
+    tolist = getattr(value, "tolist", None) # ndarray dari decode array besar
+    if tolist is not None:
+        return tolist()
+    return repr(value)
+
+
+@dataclass(slots=True)
+class DiagnosticGroup:
+    signature: Signature
+    first_seen: float
+    last_seen: float
+    count: int = 0
+    written_count: int = 0 # count saat grup terakhir ditulis ke disk
+    samples: List[Dict[str, Any]] = field(default_factory=list)
+    written_samples: int = 0
+    last_error: Optional[str] = None
+
+
+class DiagnosticsSink:
+    """
+    Pengelompok dan penulis diagnostik di latar belakang.
+
+    - max_samples: jumlah sampel payload yang disimpan (dan ditulis) per signature.
+    - max_groups: batas jumlah signature di memori; signature baru setelahnya hanya dihitung di `overflow`.
+    - max_bytes: batas ukuran file (termasuk isi yang sudah ada saat dibuka). Setelah tercapai, hanya
+      satu catatan penutup yang ditulis dan ringkasan berikutnya dibuang (dihitung di `dropped_writes`).
+    """
+    def __init__(self, path: str = "unknown_ids.txt", flush_interval: float = 5.0, max_samples: int = 3,
+                 max_groups: int = 1024, max_bytes: int = 4 * 1024 * 1024):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_samples = max_samples
+        self.max_groups = max_groups
+        self.max_bytes = max_bytes
+
+        self._groups: Dict[Signature, DiagnosticGroup] = {}
+        self._dirty: Dict[Signature, DiagnosticGroup] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        try:
+            self._file_bytes = os.path.getsize(path)
+        except OSError:
+            self._file_bytes = 0
+        self._capped = False
+
+        self.reports = 0
+        self.overflow = 0
+        self.written_bytes = 0
+        self.dropped_writes = 0
+        self.errors = 0
+
+        self._thread = threading.Thread(target=self._run, name="diagnostics-sink", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def report(self, kind: str, code: Optional[int], parameters, error: Optional[str] = None,
+               return_code: Optional[int] = None, debug_message: Optional[str] = None):
+        """Mencatat satu kejadian. Murah untuk signature yang sudah punya cukup sampel (tanpa decode/salin)."""
+        signature = (kind, -1 if code is None else code, error is not None, parameter_shape(parameters))
+        now = time.time()
+        with self._lock:
+            self.reports += 1
+            group = self._groups.get(signature)
+            if group is None:
+                if len(self._groups) >= self.max_groups:
+                    self.overflow += 1
+                    return
+                group = self._groups[signature] = DiagnosticGroup(signature, now, now)
+            group.count += 1
+            group.last_seen = now
+            if error is not None:
+                group.last_error = error
+            if len(group.samples) < self.max_samples:
+                sample = {"timestamp": now, "parameters": dict(parameters) if parameters is not None else None}
+                if kind == KIND_RESPONSE:
+                    sample["return_code"] = return_code
+                    sample["debug_message"] = debug_message
+                group.samples.append(sample)
+            self._dirty[signature] = group
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._flush()
+        self._flush()
+
+    def flush(self):
+        """Meminta thread latar belakang menulis sekarang (tidak menunggu)."""
+        self._wakeup.set()
+
+    def _flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            batch = []
+            for group in self._dirty.values():
+                # Salinan kecil di bawah lock; serialisasi JSON dilakukan di luar lock
+                batch.append((group.signature, group.first_seen, group.last_seen, group.count,
+                              group.count - group.written_count, group.samples[group.written_samples:],
+                              group.last_error))
+                group.written_count = group.count
+                group.written_samples = len(group.samples)
+            self._dirty.clear()
+        if self._capped:
+            self.dropped_writes += len(batch)
+            return
+        text = "".join(self._format_group(*entry) for entry in batch)
+        data = text.encode("utf-8")
+        if self._file_bytes + len(data) > self.max_bytes:
+            self._capped = True
+            self.dropped_writes += len(batch)
+            data = (f"--- Batas ukuran diagnostik ({self.max_bytes} byte) tercapai pada "
+                    f"{time.strftime('%Y-%m-%d %H:%M:%S')}; entri berikutnya tidak ditulis ---\n\n").encode("utf-8")
+        try:
+            with open(self.path, "ab") as f:
+                f.write(data)
+        except OSError:
+            self.errors += 1
+            return
+        self._file_bytes += len(data)
+        self.written_bytes += len(data)
+
+    @staticmethod
+    def _format_group(signature: Signature, first_seen: float, last_seen: float, count: int, new_count: int,
+                      samples: List[Dict[str, Any]], last_error: Optional[str]) -> str:
+        kind, code, _has_error, shape = signature
+        label = "Event" if kind == KIND_EVENT else "Response"
+        code_label = "EventCode" if kind == KIND_EVENT else "OperationCode"
+        entry = f"--- Unknown/Unhandled {label} or Error ---\n"
+        entry += f"{code_label}: {code}\n"
+        entry += f"Signature: [{', '.join(f'{key}:{type_name}' for key, type_name in shape)}]\n"
+        entry += f"Count: {count} (+{new_count})\n"
+        entry += (f"FirstSeen: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(first_seen))}, "
+                  f"LastSeen: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(last_seen))}\n")
+        if last_error:
+            entry += f"Error: {last_error}\n"
+        for sample in samples:
+            if kind == KIND_RESPONSE:
+                entry += f"ReturnCode: {sample['return_code']}, DebugMessage: {sample['debug_message']}\n"
+            try:
+                parameters = json.dumps(sample['parameters'], default=_json_default, indent=2)
+            except (TypeError, ValueError): # Kunci dict bersarang yang tidak bisa jadi kunci JSON
+                parameters = repr(sample['parameters'])
+            entry += f"Parameters: {parameters}\n"
+        entry += "--------------------------------------\n\n"
+        return entry
+
+    def close(self):
+        """Menulis grup yang tersisa lalu menghentikan thread."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join()
+        atexit.unregister(self.close)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            groups = len(self._groups)
+        return {
+            "reports": self.reports,
+            "groups": groups,
+            "overflow": self.overflow,
+            "written_bytes": self.written_bytes,
+            "dropped_writes": self.dropped_writes,
+            "errors": self.errors,
+        }
+
+    def format_stats(self) -> str:
+        s = self.stats()
+        return (f"Diagnostik: {s['reports']} laporan, {s['groups']} signature, Overflow: {s['overflow']}, "
+                f"Byte: {s['written_bytes']}, Drop: {s['dropped_writes']}")
@@ -0,0 +1,178 @@
+# file: scanner/entities.py
+#
+# Pelacak entitas yang sedang hidup/terlihat di zona saat ini (mob dari NewCharacter, peti dari
+# NewObject). PhotonParser memakainya untuk melengkapi event yang datang tanpa informasi tipe:
+# kategori korban di CharacterDeath dan tipe peti di ChestOpened, masing-masing satu lookup dict.
+#
+# Memori dibatasi dengan tiga cara: clear() saat pindah zona, TTL sejak entitas terakhir terlihat,
+# dan max_entities (entitas yang paling lama tidak terlihat dibuang lebih dulu). Record disimpan
+# dalam OrderedDict berurutan menurut last_seen, jadi kedaluwarsa cukup memeriksa ujung depan.
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .spatial import FLAG_OPENED, SpatialIndex
+
+KIND_CHARACTER = 0
+KIND_OBJECT = 1
+
+
+@dataclass(slots=True)
+class TrackedEntity:
+    entity_id: int
+    kind: int # KIND_CHARACTER atau KIND_OBJECT
+    type_id: str
+    name: Optional[str] = None
+    category: Optional[str] = None
+    quality: Optional[str] = None
+    position: Optional[Tuple[float, float]] = None
+    current_health: Optional[float] = None
+    max_health: Optional[float] = None
+    first_seen: float = 0.0
+    last_seen: float = 0.0
+    opened_by: Optional[int] = None # Untuk peti: id pembuka, None jika belum dibuka
+
+
+class EntityTracker:
+    """
+    Entitas aktif per id. Semua operasi O(1) (amortized untuk kedaluwarsa).
+
+    - ttl: detik sejak terakhir terlihat sebelum record dibuang (None = tanpa TTL).
+    - max_entities: batas keras jumlah record; yang paling lama tidak terlihat dibuang lebih dulu.
+    - spatial: SpatialIndex opsional yang diperbarui bersama tracker (insert/move/remove/clear),
+      untuk query radius dan tetangga terdekat atas entitas yang dilacak.
+    """
+
+    def __init__(self, ttl: Optional[float] = 1800.0, max_entities: int = 50000,
+                 spatial: Optional[SpatialIndex] = None):
+        self.ttl = ttl
+        self.max_entities = max_entities
+        self.spatial = spatial
+        self._entities: "OrderedDict[int, TrackedEntity]" = OrderedDict()
+        self.spawned = 0
+        self.died = 0
+        self.expired = 0
+        self.evicted = 0
+        self.zone_changes = 0
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def __contains__(self, entity_id: int) -> bool:
+        return entity_id in self._entities
+
+    def __iter__(self) -> Iterator[TrackedEntity]:
+        return iter(self._entities.values())
+
+    def get(self, entity_id: int) -> Optional[TrackedEntity]:
+        return self._entities.get(entity_id)
+
+    def spawn(self, entity_id: int, kind: int, type_id: str, timestamp: Optional[float] = None,
+              **fields) -> TrackedEntity:
+        """Mendaftarkan (atau menimpa) entitas dari NewCharacter/NewObject."""
+        now = time.time() if timestamp is None else timestamp
+        self.expire(now)
+        entities = self._entities
+        entities.pop(entity_id, None) # Id dipakai ulang oleh server: record lama diganti
+        record = TrackedEntity(entity_id, kind, type_id, first_seen=now, last_seen=now, **fields)
+        entities[entity_id] = record
+        self.spawned += 1
+        spatial = self.spatial
+        if spatial is not None:
+            if record.position is not None:
+                spatial.insert(entity_id, record.position[0], record.position[1], kind, record.category,
+                               record.quality, FLAG_OPENED if record.opened_by is not None else 0)
+            else:
+                spatial.remove(entity_id)
+        if len(entities) > self.max_entities:
+            evicted_id, _record = entities.popitem(last=False)
+            if spatial is not None:
+                spatial.remove(evicted_id)
+            self.evicted += 1
+        return record
+
+    def touch(self, entity_id: int, timestamp: Optional[float] = None,
+              position: Optional[Tuple[float, float]] = None) -> Optional[TrackedEntity]:
+        """Memperbarui last_seen (dan posisi jika diberikan) untuk entitas yang dilacak."""
+        record = self._entities.get(entity_id)
+        if record is None:
+            return None
+        record.last_seen = time.time() if timestamp is None else timestamp
+        if position is not None:
+            record.position = position
+            spatial = self.spatial
+            if spatial is not None and not spatial.move(entity_id, position[0], position[1]):
+                spatial.insert(entity_id, position[0], position[1], record.kind, record.category, record.quality)
+        self._entities.move_to_end(entity_id)
+        return record
+
+    def remove(self, entity_id: int) -> Optional[TrackedEntity]:
+        """Menghapus entitas yang mati dan mengembalikan record terakhirnya (None jika tidak dilacak)."""
+        record = self._entities.pop(entity_id, None)
+        if record is not None:
+            self.died += 1
+            if self.spatial is not None:
+                self.spatial.remove(entity_id)
+        return record
+
+    def mark_opened(self, entity_id: int, opener_id: Optional[int],
+                    timestamp: Optional[float] = None) -> Optional[TrackedEntity]:
+        """Menandai peti sudah dibuka. Record tetap dilacak (peti terbuka masih ada di dunia)."""
+        record = self.touch(entity_id, timestamp)
+        if record is not None:
+            record.opened_by = opener_id
+            if self.spatial is not None:
+                self.spatial.set_flags(entity_id, FLAG_OPENED)
+        return record
+
+    def within(self, x: float, z: float, radius: float, **filters) -> List[TrackedEntity]:
+        """Record entitas dalam radius, terdekat lebih dulu (filter: lihat SpatialIndex.within)."""
+        ids, _distances = self._require_spatial().within(x, z, radius, **filters)
+        return [self._entities[entity_id] for entity_id in ids.tolist()]
+
+    def nearest(self, x: float, z: float, k: int = 1, **filters) -> List[TrackedEntity]:
+        """k record entitas terdekat (filter: lihat SpatialIndex.nearest)."""
+        ids, _distances = self._require_spatial().nearest(x, z, k, **filters)
+        return [self._entities[entity_id] for entity_id in ids.tolist()]
+
+    def _require_spatial(self) -> SpatialIndex:
+        if self.spatial is None:
+            raise RuntimeError("EntityTracker dibuat tanpa SpatialIndex; query spasial tidak tersedia.")
+        return self.spatial
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Membuang record yang tidak terlihat selama lebih dari ttl. Mengembalikan jumlah yang dibuang."""
+        if self.ttl is None:
+            return 0
+        deadline = (time.time() if now is None else now) - self.ttl
+        entities = self._entities
+        removed = 0
+        while entities:
+            oldest = next(iter(entities.values()))
+            if oldest.last_seen >= deadline:
+                break
+            entities.popitem(last=False)
+            if self.spatial is not None:
+                self.spatial.remove(oldest.entity_id)
+            removed += 1
+        self.expired += removed
+        return removed
+
+    def clear(self):
+        """Pindah zona: semua entitas zona sebelumnya tidak berlaku lagi."""
+        self._entities.clear()
+        if self.spatial is not None:
+            self.spatial.clear()
+        self.zone_changes += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "tracked": len(self._entities),
+            "spawned": self.spawned,
+            "died": self.died,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "zone_changes": self.zone_changes,
+        }
@@ -0,0 +1,136 @@
+# file: scanner/entity_table.py
+#
+# Tabel entitas terkompilasi dari database.json. Setiap entri diubah sekali saat database dimuat
+# menjadi EntityRecord kecil berisi integer: kode kategori, kode kualitas, tier, indeks nama dan
+# faction di tabel string bersama, serta bitmask flag yang sudah dihitung ("mob yang dilaporkan",
+# "peti", "boss"). Handler cukup melakukan satu lookup dict lalu tes bit, tanpa rantai dict.get,
+# keanggotaan list, atau startswith per spawn.
+
+import json
+from enum import IntEnum
+from typing import Any, Dict, List, NamedTuple, Optional
+
+
+class EntityCategory(IntEnum):
+    """Kategori yang dikenal di database.json; kategori lain mendapat kode setelah CHEST_BOSS_GOLD."""
+    UNKNOWN = 0
+    MOB = 1
+    CHAMPION_MOB = 2
+    MINIBOSS = 3
+    BOSS = 4
+    CHEST_STANDARD = 5
+    CHEST_STANDARD_WOOD = 6
+    CHEST_STANDARD_GREEN = 7
+    CHEST_STANDARD_BLUE = 8
+    CHEST_STANDARD_GOLD = 9
+    CHEST_BOSS = 10
+    CHEST_BOSS_WOOD = 11
+    CHEST_BOSS_GREEN = 12
+    CHEST_BOSS_BLUE = 13
+    CHEST_BOSS_GOLD = 14
+
+
+class Quality(IntEnum):
+    """Kualitas peti, urut dari terendah; NONE = entri tanpa kualitas (mob)."""
+    NONE = 0
+    UNKNOWN = 1
+    WOOD = 2
+    GREEN = 3
+    BLUE = 4
+    GOLD = 5
+
+
+FLAG_MOB = 1 # Kategori yang menghasilkan MobSpawnedEvent (MOB, CHAMPION_MOB, MINIBOSS, BOSS)
+FLAG_CHEST = 2 # Kategori CHEST_*
+FLAG_BOSS = 4 # MINIBOSS dan BOSS
+FLAG_INTERESTING = FLAG_MOB | FLAG_CHEST
+
+_MOB_CATEGORIES = frozenset(("MOB", "BOSS", "MINIBOSS", "CHAMPION_MOB"))
+_BOSS_CATEGORIES = frozenset(("MINIBOSS", "BOSS"))
+
+
+class EntityRecord(NamedTuple):
+    category: int # Kode di EntityTable.categories (EntityCategory untuk kategori yang dikenal)
+    quality: int # Kode di EntityTable.qualities (Quality untuk kualitas yang dikenal)
+    tier: int
+    name: int # Indeks di EntityTable.strings
+    faction: int # Indeks di EntityTable.strings
+    flags: int
+
+
+def category_flags(category: Optional[str]) -> int:
+    flags = 0
+    if category in _MOB_CATEGORIES:
+        flags |= FLAG_MOB
+    if category in _BOSS_CATEGORIES:
+        flags |= FLAG_BOSS
+    if category and category.startswith("CHEST_"):
+        flags |= FLAG_CHEST
+    return flags
+
+
+def _intern(table: List[Optional[str]], codes: Dict[Optional[str], int], value: Optional[str]) -> int:
+    code = codes.get(value)
+    if code is None:
+        code = codes[value] = len(table)
+        table.append(value)
+    return code
+
+
+class EntityTable:
+    """
+    Peta internal_id -> EntityRecord. String (nama, faction, kategori, kualitas) disimpan sekali
+    di tabel bersama dan dirujuk lewat indeks, jadi entri yang berbagi nilai tidak menggandakannya.
+    Jalur panas membaca `records`, `strings`, `categories` dan `qualities` langsung (tanpa panggilan
+    method); get()/name()/category()/... untuk pemakaian biasa.
+    """
+
+    def __init__(self, database: Dict[str, Dict[str, Any]]):
+        self.strings: List[str] = []
+        self.categories: List[Optional[str]] = [category.name for category in EntityCategory]
+        self.qualities: List[Optional[str]] = [None] + [quality.name for quality in list(Quality)[1:]]
+        string_codes: Dict[str, int] = {}
+        category_codes: Dict[Optional[str], int] = {name: code for code, name in enumerate(self.categories)}
+        quality_codes: Dict[Optional[str], int] = {name: code for code, name in enumerate(self.qualities)}
+        self.records: Dict[str, EntityRecord] = {}
+        for key, entry in database.items():
+            category = entry.get("category") or "UNKNOWN"
+            try:
+                tier = int(entry.get("tier") or 0)
+            except (TypeError, ValueError):
+                tier = 0
+            self.records[str(key)] = EntityRecord(
+                category=_intern(self.categories, category_codes, category),
+                quality=_intern(self.qualities, quality_codes, entry.get("quality")),
+                tier=tier,
+                name=_intern(self.strings, string_codes, entry.get("name_en") or str(key)),
+                faction=_intern(self.strings, string_codes, entry.get("faction") or "UNKNOWN"),
+                flags=category_flags(category),
+            )
+
+    @classmethod
+    def from_file(cls, path: str) -> "EntityTable":
+        """Memuat dan mengompilasi database.json (OSError/ValueError diteruskan ke pemanggil)."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __contains__(self, key) -> bool:
+        return key in self.records
+
+    def get(self, key: str) -> Optional[EntityRecord]:
+        return self.records.get(key)
+
+    def name(self, record: EntityRecord) -> str:
+        return self.strings[record.name]
+
+    def faction(self, record: EntityRecord) -> str:
+        return self.strings[record.faction]
+
+    def category(self, record: EntityRecord) -> str:
+        return self.categories[record.category]
+
+    def quality(self, record: EntityRecord) -> Optional[str]:
+        return self.qualities[record.quality]
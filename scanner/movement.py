@@ -0,0 +1,177 @@
+# file: scanner/movement.py
+#
+# Riwayat posisi per entitas dari PlayerMovement (event tersibuk) tanpa objek event per update.
+# Setiap entitas mendapat satu baris di array NumPy yang dialokasikan di awal: posisi terakhir
+# (selalu diperbarui) dan ring buffer `history` sampel yang di-downsample (min_interval detik
+# antar sampel). Memori konstan: max_entities x history, berapa pun lamanya sesi; jika baris
+# penuh, entitas yang paling lama tidak bergerak digantikan.
+#
+# Query (posisi terakhir, kecepatan, arah) dihitung untuk semua entitas sekaligus di NumPy.
+
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class MovementTracker:
+    """
+    Ring buffer posisi per entitas.
+
+    - history: jumlah sampel yang disimpan per entitas.
+    - min_interval: jarak waktu minimum (detik) antar sampel ring buffer; update yang lebih rapat
+      hanya memperbarui posisi terakhir. 0 = simpan semua update.
+    - max_entities: jumlah baris; entitas yang paling lama tidak bergerak digantikan saat penuh.
+    """
+
+    def __init__(self, history: int = 32, min_interval: float = 0.25, max_entities: int = 4096):
+        if numpy is None:
+            raise ImportError("MovementTracker membutuhkan NumPy (pip install numpy).")
+        if history < 2:
+            raise ValueError("history minimal 2 sampel.")
+        self.history = history
+        self.min_interval = min_interval
+        self.max_entities = max_entities
+        # Ring buffer [entitas, sampel]
+        self._t = numpy.zeros((max_entities, history), dtype=numpy.float64)
+        self._x = numpy.zeros((max_entities, history), dtype=numpy.float32)
+        self._z = numpy.zeros((max_entities, history), dtype=numpy.float32)
+        self._head = numpy.zeros(max_entities, dtype=numpy.int32) # Posisi tulis berikutnya
+        self._count = numpy.zeros(max_entities, dtype=numpy.int32)
+        # Posisi terakhir (tidak di-downsample)
+        self._last_t = numpy.zeros(max_entities, dtype=numpy.float64)
+        self._last_x = numpy.zeros(max_entities, dtype=numpy.float32)
+        self._last_z = numpy.zeros(max_entities, dtype=numpy.float32)
+        self._ids = numpy.zeros(max_entities, dtype=numpy.int64)
+        self._active = numpy.zeros(max_entities, dtype=bool)
+        self._rows: Dict[int, int] = {}
+        self._free: List[int] = list(range(max_entities - 1, -1, -1))
+        self.updates = 0
+        self.samples = 0
+        self.replaced = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, entity_id: int) -> bool:
+        return entity_id in self._rows
+
+    def _allocate(self, entity_id: int) -> int:
+        if self._free:
+            row = self._free.pop()
+        else:
+            # Penuh: gantikan entitas yang paling lama tidak bergerak (jarang terjadi)
+            row = int(numpy.argmin(self._last_t))
+            del self._rows[int(self._ids[row])]
+            self.replaced += 1
+        self._rows[entity_id] = row
+        self._ids[row] = entity_id
+        self._active[row] = True
+        self._head[row] = 0
+        self._count[row] = 0
+        return row
+
+    def update(self, entity_id: int, timestamp: float, x: float, z: float):
+        """Satu update posisi. O(1): beberapa penulisan skalar ke array yang sudah ada."""
+        self.updates += 1
+        row = self._rows.get(entity_id)
+        if row is None:
+            row = self._allocate(entity_id)
+        self._last_t[row] = timestamp
+        self._last_x[row] = x
+        self._last_z[row] = z
+        count = self._count[row]
+        head = self._head[row]
+        if count and timestamp - self._t[row, head - 1] < self.min_interval:
+            return
+        self._t[row, head] = timestamp
+        self._x[row, head] = x
+        self._z[row, head] = z
+        self._head[row] = (head + 1) % self.history
+        if count < self.history:
+            self._count[row] = count + 1
+        self.samples += 1
+
+    def remove(self, entity_id: int) -> bool:
+        row = self._rows.pop(entity_id, None)
+        if row is None:
+            return False
+        self._active[row] = False
+        self._last_t[row] = 0.0
+        self._free.append(row)
+        return True
+
+    def clear(self):
+        """Pindah zona: semua riwayat dibuang."""
+        self._rows.clear()
+        self._active[:] = False
+        self._last_t[:] = 0.0
+        self._free = list(range(self.max_entities - 1, -1, -1))
+
+    # --- Query ---
+
+    def _active_rows(self):
+        return numpy.flatnonzero(self._active)
+
+    def last_positions(self):
+        """(ids, x, z, timestamp) posisi terakhir semua entitas aktif."""
+        rows = self._active_rows()
+        return self._ids[rows], self._last_x[rows], self._last_z[rows], self._last_t[rows]
+
+    def last_position(self, entity_id: int) -> Optional[Tuple[float, float, float]]:
+        row = self._rows.get(entity_id)
+        if row is None:
+            return None
+        return float(self._last_x[row]), float(self._last_z[row]), float(self._last_t[row])
+
+    def _displacements(self, window: Optional[float]):
+        """
+        Untuk setiap entitas aktif: perpindahan dari sampel tertua di dalam `window` detik terakhir
+        (atau sampel tertua di ring buffer jika window None) sampai posisi terakhir.
+        """
+        rows = self._active_rows()
+        t = self._t[rows]
+        count = self._count[rows]
+        # Sampel valid: kolom ring buffer yang sudah terisi (indeks relatif terhadap head)
+        age = (self._head[rows, None] - 1 - numpy.arange(self.history)[None, :]) % self.history
+        valid = age < count[:, None]
+        last_t = self._last_t[rows]
+        if window is not None:
+            valid &= t >= (last_t - window)[:, None]
+        masked = numpy.where(valid, t, numpy.inf)
+        oldest = numpy.argmin(masked, axis=1)
+        index = numpy.arange(len(rows))
+        start_t = masked[index, oldest]
+        dt = last_t - start_t
+        dx = self._last_x[rows] - self._x[rows, oldest]
+        dz = self._last_z[rows] - self._z[rows, oldest]
+        # Tanpa sampel di jendela (atau dt nol): tidak bisa diukur
+        unknown = ~numpy.isfinite(start_t) | (dt <= 0)
+        return rows, dx, dz, numpy.where(unknown, numpy.nan, dt)
+
+    def speeds(self, window: Optional[float] = 2.0):
+        """(ids, kecepatan m/s) rata-rata dalam `window` detik terakhir; NaN jika belum cukup sampel."""
+        rows, dx, dz, dt = self._displacements(window)
+        return self._ids[rows], numpy.hypot(dx, dz) / dt
+
+    def headings(self, window: Optional[float] = 2.0):
+        """(ids, arah radian atan2(dz, dx)) perpindahan dalam `window` detik terakhir; NaN jika diam/tidak diketahui."""
+        rows, dx, dz, dt = self._displacements(window)
+        heading = numpy.arctan2(dz, dx)
+        still = (dx == 0) & (dz == 0)
+        return self._ids[rows], numpy.where(still | numpy.isnan(dt), numpy.nan, heading)
+
+    def track(self, entity_id: int):
+        """Riwayat (t, x, z) satu entitas, urut waktu. Salinan kecil dari ring buffer."""
+        row = self._rows.get(entity_id)
+        if row is None:
+            return numpy.empty(0), numpy.empty(0, dtype=numpy.float32), numpy.empty(0, dtype=numpy.float32)
+        count = int(self._count[row])
+        order = (int(self._head[row]) - count + numpy.arange(count)) % self.history
+        return self._t[row, order], self._x[row, order], self._z[row, order]
+
+    def stats(self) -> Dict[str, int]:
+        return {"entities": len(self._rows), "updates": self.updates, "samples": self.samples,
+                "replaced": self.replaced}
@@ -0,0 +1,651 @@
+# file: scanner/protocol16.py
+#
+# Codec Photon Protocol16 (big-endian) yang dipakai bersama oleh sniffer (network_scanner) dan
+# PhotonParser. Setiap kode tipe dipetakan ke satu fungsi pembaca di tabel lompat `_READERS`
+# (256 entri, diindeks langsung dengan byte tipe), dan semua angka dibaca dengan struct.Struct
+# yang sudah dikompilasi lewat unpack_from, tanpa membuat slice perantara.
+#
+# Semua pembaca bertanda tangan `reader(buf, offset) -> (nilai, offset_baru)` dengan `offset`
+# menunjuk tepat setelah byte tipe. `buf` boleh bytes, bytearray, atau memoryview.
+
+from collections.abc import Mapping
+from struct import Struct, error as StructError
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+try:
+    import numpy
+except ImportError: # numpy opsional; tanpa numpy semua array bertipe dibaca dengan struct
+    numpy = None
+
+# --- Kode tipe Protocol16 ---
+TYPE_NULL = 42 # '*' (0 juga diperlakukan sebagai null)
+TYPE_DICTIONARY = 68 # 'D'
+TYPE_STRING_ARRAY = 97 # 'a'
+TYPE_BYTE = 98 # 'b'
+TYPE_CUSTOM = 99 # 'c'
+TYPE_DOUBLE = 100 # 'd'
+TYPE_EVENT_DATA = 101 # 'e'
+TYPE_FLOAT = 102 # 'f'
+TYPE_HASHTABLE = 104 # 'h'
+TYPE_INTEGER = 105 # 'i'
+TYPE_SHORT = 107 # 'k'
+TYPE_LONG = 108 # 'l'
+TYPE_INTEGER_ARRAY = 110 # 'n'
+TYPE_BOOLEAN = 111 # 'o'
+TYPE_OPERATION_RESPONSE = 112 # 'p'
+TYPE_OPERATION_REQUEST = 113 # 'q'
+TYPE_STRING = 115 # 's'
+TYPE_BYTE_ARRAY = 120 # 'x'
+TYPE_ARRAY = 121 # 'y' (array bertipe: satu byte tipe untuk semua elemen)
+TYPE_OBJECT_ARRAY = 122 # 'z' (setiap elemen membawa byte tipenya sendiri)
+
+# --- Tipe pesan (byte pertama body, setelah signature 0xF3) ---
+MSG_OPERATION_REQUEST = 2
+MSG_OPERATION_RESPONSE = 3
+MSG_EVENT_DATA = 4
+
+_BYTE = Struct(">B")
+_BOOL = Struct(">?")
+_SHORT = Struct(">h")
+_USHORT = Struct(">H")
+_INT = Struct(">i")
+_LONG = Struct(">q")
+_FLOAT = Struct(">f")
+_DOUBLE = Struct(">d")
+_RESPONSE_HEADER = Struct(">Bh") # op_code, return_code
+_DICT_HEADER = Struct(">BBH") # key_type, value_type, count
+_ARRAY_HEADER = Struct(">HB") # count, element_type
+_CUSTOM_HEADER = Struct(">BH") # custom_type, length
+
+# Tipe berukuran tetap: array bertipe dari tipe ini dibaca sekaligus dengan satu unpack_from.
+_FIXED_FORMATS = {
+    TYPE_BYTE: "B",
+    TYPE_BOOLEAN: "?",
+    TYPE_SHORT: "h",
+    TYPE_INTEGER: "i",
+    TYPE_LONG: "q",
+    TYPE_FLOAT: "f",
+    TYPE_DOUBLE: "d",
+}
+_bulk_structs: Dict[Tuple[str, int], Struct] = {}
+
+# Array bertipe berukuran tetap dengan elemen sebanyak ini atau lebih (list equipment, buff, dsb.)
+# di-decode dengan numpy.frombuffer menjadi ndarray (byte order native) alih-alih list Python.
+NUMPY_MIN_ELEMENTS = 96 # Di bawah ini struct.unpack_from + list lebih cepat (lihat bench_protocol16)
+_NUMPY_DTYPES = {}
+if numpy is not None:
+    for _code, _fmt in _FIXED_FORMATS.items():
+        _wire = numpy.dtype(">" + _fmt)
+        _NUMPY_DTYPES[_code] = (_wire, _wire.newbyteorder("="))
+    del _code, _fmt, _wire
+
+
+class Protocol16Error(ValueError):
+    """Data Protocol16 tidak valid: tipe tidak dikenal, panjang negatif, atau buffer terpotong."""
+
+
+class CustomData(NamedTuple):
+    """Nilai tipe custom ('c'): kode tipe custom dan byte mentahnya (belum di-decode)."""
+    type_code: int
+    data: bytes
+
+
+class EventData(NamedTuple):
+    code: int
+    parameters: Dict[int, Any]
+
+
+class OperationRequest(NamedTuple):
+    op_code: int
+    parameters: Dict[int, Any]
+
+
+class OperationResponse(NamedTuple):
+    op_code: int
+    return_code: int
+    debug_message: Any
+    parameters: Dict[int, Any]
+
+
+Reader = Callable[[Any, int], Tuple[Any, int]]
+_READERS: List[Optional[Reader]] = [None] * 256
+
+
+def _bulk_struct(fmt: str, count: int) -> Struct:
+    key = (fmt, count)
+    compiled = _bulk_structs.get(key)
+    if compiled is None:
+        compiled = Struct(f">{count}{fmt}")
+        if len(_bulk_structs) < 1024: # Jumlah berbeda terbatas dalam praktik; cegah cache tumbuh liar
+            _bulk_structs[key] = compiled
+    return compiled
+
+
+def _read_fixed_array(buf, offset: int, element_type: int, count: int):
+    """Array `count` elemen bertipe tetap; ndarray untuk array besar jika numpy tersedia, selain itu list."""
+    if count >= NUMPY_MIN_ELEMENTS and numpy is not None:
+        wire, native = _NUMPY_DTYPES[element_type]
+        _check_length(buf, offset, count * wire.itemsize)
+        # astype menyalin ke byte order native, jadi hasilnya tidak menahan buffer paket
+        values = numpy.frombuffer(buf, dtype=wire, count=count, offset=offset).astype(native)
+        return values, offset + count * wire.itemsize
+    bulk = _bulk_struct(_FIXED_FORMATS[element_type], count)
+    return list(bulk.unpack_from(buf, offset)), offset + bulk.size
+
+
+def _check_length(buf, offset: int, length: int):
+    if length < 0:
+        raise Protocol16Error(f"Panjang negatif ({length}) pada offset {offset}")
+    if offset + length > len(buf):
+        raise Protocol16Error(f"Data terpotong: butuh {length} byte pada offset {offset}, tersisa {len(buf) - offset}")
+
+
+def _unknown_type(type_code: int, offset: int):
+    raise Protocol16Error(f"Tipe data Photon tidak dikenal: {type_code} pada offset {offset - 1}")
+
+
+# --- Pembaca skalar ---
+
+def _read_null(buf, offset):
+    return None, offset
+
+def _read_byte(buf, offset):
+    return buf[offset], offset + 1
+
+def _read_bool(buf, offset):
+    return buf[offset] != 0, offset + 1
+
+def _read_short(buf, offset):
+    return _SHORT.unpack_from(buf, offset)[0], offset + 2
+
+def _read_int(buf, offset):
+    return _INT.unpack_from(buf, offset)[0], offset + 4
+
+def _read_long(buf, offset):
+    return _LONG.unpack_from(buf, offset)[0], offset + 8
+
+def _read_float(buf, offset):
+    return _FLOAT.unpack_from(buf, offset)[0], offset + 4
+
+def _read_double(buf, offset):
+    return _DOUBLE.unpack_from(buf, offset)[0], offset + 8
+
+def _read_string(buf, offset):
+    length = _USHORT.unpack_from(buf, offset)[0]
+    offset += 2
+    end = offset + length
+    if end > len(buf):
+        _check_length(buf, offset, length)
+    return str(buf[offset:end], "utf-8", "replace"), end
+
+def _read_byte_array(buf, offset):
+    length = _INT.unpack_from(buf, offset)[0]
+    offset += 4
+    _check_length(buf, offset, length)
+    return bytes(buf[offset:offset + length]), offset + length
+
+def _read_custom(buf, offset):
+    custom_type, length = _CUSTOM_HEADER.unpack_from(buf, offset)
+    offset += 3
+    _check_length(buf, offset, length)
+    return CustomData(custom_type, bytes(buf[offset:offset + length])), offset + length
+
+
+# --- Pembaca koleksi ---
+
+def read_value(buf, offset: int) -> Tuple[Any, int]:
+    """Membaca satu nilai bertipe (byte tipe + isi) mulai dari `offset`."""
+    type_code = buf[offset]
+    reader = _READERS[type_code]
+    if reader is None:
+        _unknown_type(type_code, offset + 1)
+    return reader(buf, offset + 1)
+
+def _read_string_array(buf, offset):
+    count = _USHORT.unpack_from(buf, offset)[0]
+    offset += 2
+    values = []
+    for _ in range(count):
+        value, offset = _read_string(buf, offset)
+        values.append(value)
+    return values, offset
+
+def _read_integer_array(buf, offset):
+    count = _INT.unpack_from(buf, offset)[0]
+    offset += 4
+    _check_length(buf, offset, count * 4)
+    return _read_fixed_array(buf, offset, TYPE_INTEGER, count)
+
+def _read_object_array(buf, offset):
+    count = _USHORT.unpack_from(buf, offset)[0]
+    offset += 2
+    values = []
+    for _ in range(count):
+        value, offset = read_value(buf, offset)
+        values.append(value)
+    return values, offset
+
+def _read_hashtable(buf, offset):
+    count = _USHORT.unpack_from(buf, offset)[0]
+    offset += 2
+    table = {}
+    for _ in range(count):
+        key, offset = read_value(buf, offset)
+        value, offset = read_value(buf, offset)
+        table[_hashable(key)] = value
+    return table, offset
+
+def _hashable(key):
+    """Kunci hashtable/dictionary bisa berupa koleksi; ubah (rekursif) menjadi tuple agar bisa di-hash."""
+    if isinstance(key, (int, str)):
+        return key
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        pass
+    if isinstance(key, dict):
+        return tuple((_hashable(k), _hashable(v)) for k, v in key.items())
+    if hasattr(key, "tolist"): # ndarray
+        key = key.tolist()
+    return tuple(_hashable(item) for item in key)
+
+def _element_reader(type_code: int, offset: int) -> Reader:
+    # Kode 0/42 pada header dictionary berarti "setiap elemen membawa byte tipenya sendiri".
+    if type_code == 0 or type_code == TYPE_NULL:
+        return read_value
+    reader = _READERS[type_code]
+    if reader is None:
+        _unknown_type(type_code, offset)
+    return reader
+
+def _read_dictionary_entries(buf, offset, key_type, value_type):
+    read_key = _element_reader(key_type, offset)
+    read_entry = _element_reader(value_type, offset)
+    count = _USHORT.unpack_from(buf, offset)[0]
+    offset += 2
+    table = {}
+    for _ in range(count):
+        key, offset = read_key(buf, offset)
+        value, offset = read_entry(buf, offset)
+        table[_hashable(key)] = value
+    return table, offset
+
+def _read_dictionary(buf, offset):
+    key_type, value_type = buf[offset], buf[offset + 1]
+    return _read_dictionary_entries(buf, offset + 2, key_type, value_type)
+
+def _read_array(buf, offset):
+    count, element_type = _ARRAY_HEADER.unpack_from(buf, offset)
+    offset += 3
+    if element_type in _FIXED_FORMATS:
+        return _read_fixed_array(buf, offset, element_type, count)
+
+    values = []
+    if element_type == TYPE_CUSTOM:
+        # Kode tipe custom ditulis sekali; setiap elemen hanya membawa panjang + data.
+        custom_type = buf[offset]
+        offset += 1
+        for _ in range(count):
+            length = _USHORT.unpack_from(buf, offset)[0]
+            offset += 2
+            _check_length(buf, offset, length)
+            values.append(CustomData(custom_type, bytes(buf[offset:offset + length])))
+            offset += length
+    elif element_type == TYPE_DICTIONARY:
+        # Tipe kunci/nilai ditulis sekali untuk seluruh array dictionary.
+        key_type, value_type = buf[offset], buf[offset + 1]
+        offset += 2
+        for _ in range(count):
+            table, offset = _read_dictionary_entries(buf, offset, key_type, value_type)
+            values.append(table)
+    else:
+        reader = _READERS[element_type]
+        if reader is None:
+            _unknown_type(element_type, offset - 2)
+        for _ in range(count):
+            value, offset = reader(buf, offset)
+            values.append(value)
+    return values, offset
+
+
+# --- Pesan ---
+
+def _read_parameters(buf, offset):
+    count = _USHORT.unpack_from(buf, offset)[0]
+    offset += 2
+    parameters = {}
+    readers = _READERS
+    for _ in range(count):
+        key = buf[offset]
+        type_code = buf[offset + 1]
+        reader = readers[type_code]
+        if reader is None:
+            _unknown_type(type_code, offset + 2)
+        parameters[key], offset = reader(buf, offset + 2)
+    return parameters, offset
+
+def _read_event_data(buf, offset):
+    parameters, end = _read_parameters(buf, offset + 1)
+    return EventData(buf[offset], parameters), end
+
+def _read_operation_request(buf, offset):
+    parameters, end = _read_parameters(buf, offset + 1)
+    return OperationRequest(buf[offset], parameters), end
+
+def _read_operation_response(buf, offset):
+    op_code, return_code = _RESPONSE_HEADER.unpack_from(buf, offset)
+    debug_message, offset = read_value(buf, offset + 3)
+    parameters, end = _read_parameters(buf, offset)
+    return OperationResponse(op_code, return_code, debug_message, parameters), end
+
+
+for _code, _reader in (
+    (0, _read_null),
+    (TYPE_NULL, _read_null),
+    (TYPE_DICTIONARY, _read_dictionary),
+    (TYPE_STRING_ARRAY, _read_string_array),
+    (TYPE_BYTE, _read_byte),
+    (TYPE_CUSTOM, _read_custom),
+    (TYPE_DOUBLE, _read_double),
+    (TYPE_EVENT_DATA, _read_event_data),
+    (TYPE_FLOAT, _read_float),
+    (TYPE_HASHTABLE, _read_hashtable),
+    (TYPE_INTEGER, _read_int),
+    (TYPE_SHORT, _read_short),
+    (TYPE_LONG, _read_long),
+    (TYPE_INTEGER_ARRAY, _read_integer_array),
+    (TYPE_BOOLEAN, _read_bool),
+    (TYPE_OPERATION_RESPONSE, _read_operation_response),
+    (TYPE_OPERATION_REQUEST, _read_operation_request),
+    (TYPE_STRING, _read_string),
+    (TYPE_BYTE_ARRAY, _read_byte_array),
+    (TYPE_ARRAY, _read_array),
+    (TYPE_OBJECT_ARRAY, _read_object_array),
+):
+    _READERS[_code] = _reader
+del _code, _reader
+
+
+# --- Lewati nilai tanpa membangun objek ---
+# Dipakai untuk tabel parameter lazy: hanya offset tiap kunci yang dicatat. Tipe berukuran tetap
+# dilewati dengan aritmetika (_FIXED_SIZES); tipe lain lewat `skipper(buf, offset) -> offset_baru`.
+
+_FIXED_SIZES: List[int] = [-1] * 256
+for _code, _size in ((0, 0), (TYPE_NULL, 0), (TYPE_BYTE, 1), (TYPE_BOOLEAN, 1), (TYPE_SHORT, 2),
+                     (TYPE_INTEGER, 4), (TYPE_LONG, 8), (TYPE_FLOAT, 4), (TYPE_DOUBLE, 8)):
+    _FIXED_SIZES[_code] = _size
+del _code, _size
+
+Skipper = Callable[[Any, int], int]
+_SKIPPERS: List[Optional[Skipper]] = [None] * 256
+
+
+def skip_value(buf, offset: int) -> int:
+    """Melewati satu nilai bertipe (byte tipe + isi) dan mengembalikan offset sesudahnya."""
+    return _skip_typed(buf, offset + 1, buf[offset])
+
+def _check_skippable(type_code: int, offset: int):
+    # Sama dengan validasi _element_reader/_read_array: tipe elemen diperiksa walau jumlahnya 0, agar
+    # tabel lazy menolak pesan yang sama dengan decode penuh (bukan gagal saat kuncinya diakses).
+    if _FIXED_SIZES[type_code] < 0 and _SKIPPERS[type_code] is None:
+        _unknown_type(type_code, offset)
+
+def _skip_typed(buf, offset, type_code):
+    size = _FIXED_SIZES[type_code]
+    if size >= 0:
+        return offset + size
+    skipper = _SKIPPERS[type_code]
+    if skipper is None:
+        _unknown_type(type_code, offset)
+    return skipper(buf, offset)
+
+def _skip_string(buf, offset):
+    return offset + 2 + _USHORT.unpack_from(buf, offset)[0]
+
+def _skip_byte_array(buf, offset):
+    length = _INT.unpack_from(buf, offset)[0]
+    _check_length(buf, offset + 4, length)
+    return offset + 4 + length
+
+def _skip_integer_array(buf, offset):
+    count = _INT.unpack_from(buf, offset)[0]
+    _check_length(buf, offset + 4, count * 4)
+    return offset + 4 + count * 4
+
+def _skip_custom(buf, offset):
+    return offset + 3 + _CUSTOM_HEADER.unpack_from(buf, offset)[1]
+
+def _skip_string_array(buf, offset):
+    count = _USHORT.unpack_from(buf, offset)[0]
+    offset += 2
+    for _ in range(count):
+        offset += 2 + _USHORT.unpack_from(buf, offset)[0]
+    return offset
+
+def _skip_object_array(buf, offset):
+    count = _USHORT.unpack_from(buf, offset)[0]
+    offset += 2
+    for _ in range(count):
+        offset = skip_value(buf, offset)
+    return offset
+
+def _skip_hashtable(buf, offset):
+    count = _USHORT.unpack_from(buf, offset)[0]
+    offset += 2
+    for _ in range(count):
+        offset = skip_value(buf, skip_value(buf, offset))
+    return offset
+
+def _skip_dictionary_entries(buf, offset, key_type, value_type):
+    key_dynamic = key_type == 0 or key_type == TYPE_NULL
+    value_dynamic = value_type == 0 or value_type == TYPE_NULL
+    if not key_dynamic:
+        _check_skippable(key_type, offset)
+    if not value_dynamic:
+        _check_skippable(value_type, offset)
+    count = _USHORT.unpack_from(buf, offset)[0]
+    offset += 2
+    for _ in range(count):
+        offset = skip_value(buf, offset) if key_dynamic else _skip_typed(buf, offset, key_type)
+        offset = skip_value(buf, offset) if value_dynamic else _skip_typed(buf, offset, value_type)
+    return offset
+
+def _skip_dictionary(buf, offset):
+    return _skip_dictionary_entries(buf, offset + 2, buf[offset], buf[offset + 1])
+
+def _skip_array(buf, offset):
+    count, element_type = _ARRAY_HEADER.unpack_from(buf, offset)
+    offset += 3
+    size = _FIXED_SIZES[element_type]
+    if size >= 0:
+        return offset + count * size
+    if element_type == TYPE_CUSTOM:
+        offset += 1
+        for _ in range(count):
+            offset += 2 + _USHORT.unpack_from(buf, offset)[0]
+    elif element_type == TYPE_DICTIONARY:
+        key_type, value_type = buf[offset], buf[offset + 1]
+        offset += 2
+        for _ in range(count):
+            offset = _skip_dictionary_entries(buf, offset, key_type, value_type)
+    else:
+        _check_skippable(element_type, offset - 2)
+        for _ in range(count):
+            offset = _skip_typed(buf, offset, element_type)
+    return offset
+
+def _skip_parameters(buf, offset):
+    count = _USHORT.unpack_from(buf, offset)[0]
+    offset += 2
+    for _ in range(count):
+        offset = skip_value(buf, offset + 1)
+    return offset
+
+def _skip_event_data(buf, offset):
+    return _skip_parameters(buf, offset + 1)
+
+def _skip_operation_response(buf, offset):
+    return _skip_parameters(buf, skip_value(buf, offset + 3))
+
+
+for _code, _skipper in (
+    (TYPE_DICTIONARY, _skip_dictionary),
+    (TYPE_STRING_ARRAY, _skip_string_array),
+    (TYPE_CUSTOM, _skip_custom),
+    (TYPE_EVENT_DATA, _skip_event_data),
+    (TYPE_HASHTABLE, _skip_hashtable),
+    (TYPE_INTEGER_ARRAY, _skip_integer_array),
+    (TYPE_OPERATION_RESPONSE, _skip_operation_response),
+    (TYPE_OPERATION_REQUEST, _skip_event_data), # Tata letak sama: kode 1 byte + tabel parameter
+    (TYPE_STRING, _skip_string),
+    (TYPE_BYTE_ARRAY, _skip_byte_array),
+    (TYPE_ARRAY, _skip_array),
+    (TYPE_OBJECT_ARRAY, _skip_object_array),
+):
+    _SKIPPERS[_code] = _skipper
+del _code, _skipper
+
+
+class LazyParameterTable(Mapping):
+    """
+    Tabel parameter yang hanya mencatat (kode tipe, offset) per kunci; nilainya di-decode saat
+    kunci itu pertama kali diakses lalu disimpan. Handler yang membaca beberapa kunci saja tidak
+    membayar decode array equipment, tabel bersarang, dsb.
+
+    Buffer sumber dirujuk (tidak disalin), jadi isinya tidak boleh berubah selama tabel dipakai.
+    Struktur seluruh tabel sudah divalidasi saat pengindeksan, sehingga akses kunci tidak gagal
+    karena tipe tak dikenal atau data terpotong. Di-pickle sebagai dict biasa.
+    """
+    __slots__ = ("_buf", "_index", "_values")
+
+    def __init__(self, buf, index: Dict[int, Tuple[int, int]]):
+        self._buf = buf
+        self._index = index
+        self._values: Dict[int, Any] = {}
+
+    def __getitem__(self, key: int) -> Any:
+        values = self._values
+        if key in values:
+            return values[key]
+        type_code, offset = self._index[key]
+        value = values[key] = _READERS[type_code](self._buf, offset)[0]
+        return value
+
+    def __contains__(self, key) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def decoded_count(self) -> int:
+        """Jumlah kunci yang sudah di-decode sejauh ini."""
+        return len(self._values)
+
+    @property
+    def buffer(self):
+        """Buffer sumber tabel (tidak disalin)."""
+        return self._buf
+
+    def locate(self, key: int) -> Optional[Tuple[int, int]]:
+        """(kode tipe, offset nilai di buffer) untuk kunci, tanpa men-decode; None jika tidak ada."""
+        return self._index.get(key)
+
+    def type_codes(self) -> Dict[int, int]:
+        """Kode tipe Protocol16 per kunci, tanpa men-decode nilai apa pun."""
+        return {key: entry[0] for key, entry in self._index.items()}
+
+    def to_dict(self) -> Dict[int, Any]:
+        return {key: self[key] for key in self._index}
+
+    def __reduce__(self):
+        return dict, (self.to_dict(),)
+
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+
+
+def _index_parameters(buf, offset):
+    count = _USHORT.unpack_from(buf, offset)[0]
+    offset += 2
+    index = {}
+    fixed_sizes = _FIXED_SIZES
+    for _ in range(count):
+        type_code = buf[offset + 1]
+        index[buf[offset]] = (type_code, offset + 2)
+        offset += 2
+        size = fixed_sizes[type_code]
+        if size >= 0:
+            offset += size
+        else:
+            skipper = _SKIPPERS[type_code]
+            if skipper is None:
+                _unknown_type(type_code, offset)
+            offset = skipper(buf, offset)
+    if offset > len(buf):
+        raise Protocol16Error(f"Data terpotong: tabel parameter berakhir di {offset}, buffer {len(buf)} byte")
+    return LazyParameterTable(buf, index), offset
+
+
+def decode_parameter_table(buf, offset: int = 0, strict: bool = True) -> Tuple[Dict[int, Any], int]:
+    """
+    Membaca tabel parameter (jumlah short, lalu pasangan kunci byte + nilai bertipe).
+    Mengembalikan (parameter, offset setelah tabel).
+
+    strict=False dipakai sniffer untuk logging: parameter yang sudah terbaca sebelum tipe tak
+    dikenal atau data terpotong tetap dikembalikan, bersama offset parameter terakhir yang utuh.
+    Untuk tabel yang di-decode saat diakses, lihat decode_lazy_parameter_table.
+    """
+    if strict:
+        try:
+            return _read_parameters(buf, offset)
+        except (StructError, IndexError) as e:
+            raise Protocol16Error(f"Tabel parameter terpotong pada offset {offset}: {e}") from None
+
+    parameters: Dict[int, Any] = {}
+    try:
+        count = _USHORT.unpack_from(buf, offset)[0]
+        offset += 2
+        for _ in range(count):
+            key = buf[offset]
+            value, end = read_value(buf, offset + 1)
+            parameters[key] = value
+            offset = end
+    except (StructError, IndexError, ValueError, TypeError):
+        pass
+    return parameters, offset
+
+
+def decode_lazy_parameter_table(buf, offset: int = 0) -> Tuple[LazyParameterTable, int]:
+    """Seperti decode_parameter_table, tetapi nilai di-decode saat kuncinya diakses."""
+    try:
+        return _index_parameters(buf, offset)
+    except (StructError, IndexError) as e:
+        raise Protocol16Error(f"Tabel parameter terpotong pada offset {offset}: {e}") from None
+
+
+def decode_message(body, lazy: bool = False) -> Any:
+    """
+    Men-decode body pesan Photon (dimulai dari byte tipe pesan, setelah signature 0xF3) menjadi
+    OperationRequest, OperationResponse, atau EventData. Melempar Protocol16Error untuk tipe pesan
+    yang tidak dikenal atau data yang tidak valid. Dengan lazy=True, `parameters` berupa
+    LazyParameterTable.
+    """
+    read_parameters = _index_parameters if lazy else _read_parameters
+    try:
+        msg_type = body[0]
+        if msg_type == MSG_EVENT_DATA:
+            return EventData(body[1], read_parameters(body, 2)[0])
+        if msg_type == MSG_OPERATION_RESPONSE:
+            op_code, return_code = _RESPONSE_HEADER.unpack_from(body, 1)
+            debug_message, offset = read_value(body, 4)
+            return OperationResponse(op_code, return_code, debug_message, read_parameters(body, offset)[0])
+        if msg_type == MSG_OPERATION_REQUEST:
+            return OperationRequest(body[1], read_parameters(body, 2)[0])
+    except (StructError, IndexError) as e:
+        raise Protocol16Error(f"Pesan Photon terpotong: {e}") from None
+    raise Protocol16Error(f"Tipe pesan Photon tidak dikenal: {msg_type}")
@@ -0,0 +1,262 @@
+# file: scanner/spatial.py
+#
+# Indeks spasial grid seragam untuk entitas yang dilacak (mob, boss, peti). Dipakai untuk routing:
+# "peti GOLD terdekat yang belum dibuka", "semua boss dalam 40 m dari saya", dijawab berkali-kali
+# per detik saat PlayerMovement datang.
+#
+# Data per entitas disimpan di array NumPy padat per slot (x, z, kind, kode kategori, kode kualitas,
+# flag); grid hanya memetakan sel -> himpunan slot. Insert/move/remove O(1). Query mengumpulkan slot
+# dari sel yang bersinggungan dengan area pencarian, lalu jarak dan filter dihitung sekaligus di
+# NumPy. Untuk area yang mencakup lebih banyak sel daripada yang terisi, seluruh slot aktif dipakai.
+
+import math
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+FLAG_OPENED = 1 # Peti sudah dibuka
+
+_NO_CODE = -1
+
+
+class SpatialIndex:
+    """
+    Grid seragam dengan sel berukuran cell_size meter. Pilih cell_size kira-kira sebesar radius
+    query yang paling sering (mis. 32-64 m untuk "dalam 40 m").
+    """
+
+    def __init__(self, cell_size: float = 32.0, capacity: int = 1024):
+        if numpy is None:
+            raise ImportError("SpatialIndex membutuhkan NumPy (pip install numpy).")
+        if cell_size <= 0:
+            raise ValueError("cell_size harus positif.")
+        self.cell_size = float(cell_size)
+        self._inverse = 1.0 / self.cell_size
+        self._ids = numpy.zeros(capacity, dtype=numpy.int64)
+        self._x = numpy.zeros(capacity, dtype=numpy.float64)
+        self._z = numpy.zeros(capacity, dtype=numpy.float64)
+        self._kind = numpy.zeros(capacity, dtype=numpy.uint8)
+        self._category = numpy.full(capacity, _NO_CODE, dtype=numpy.int16)
+        self._quality = numpy.full(capacity, _NO_CODE, dtype=numpy.int16)
+        self._flags = numpy.zeros(capacity, dtype=numpy.uint8)
+        self._active = numpy.zeros(capacity, dtype=bool)
+        self._slots: Dict[int, int] = {} # entity_id -> slot
+        self._slot_cells: Dict[int, Tuple[int, int]] = {} # slot -> sel
+        self._cells: Dict[Tuple[int, int], Set[int]] = {}
+        self._free: List[int] = []
+        self._used = 0 # Slot tertinggi yang pernah dipakai + 1
+        self._category_codes: Dict[str, int] = {}
+        self._quality_codes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, entity_id: int) -> bool:
+        return entity_id in self._slots
+
+    # --- Pemeliharaan ---
+
+    def _cell(self, x: float, z: float) -> Tuple[int, int]:
+        inverse = self._inverse
+        return (math.floor(x * inverse), math.floor(z * inverse))
+
+    def _grow(self):
+        capacity = len(self._ids) * 2
+        for name in ("_ids", "_x", "_z", "_kind", "_category", "_quality", "_flags", "_active"):
+            old = getattr(self, name)
+            fill = _NO_CODE if name in ("_category", "_quality") else 0
+            new = numpy.full(capacity, fill, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    @staticmethod
+    def _code(codes: Dict[str, int], value: Optional[str]) -> int:
+        if value is None:
+            return _NO_CODE
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+        return code
+
+    def insert(self, entity_id: int, x: float, z: float, kind: int = 0, category: Optional[str] = None,
+               quality: Optional[str] = None, flags: int = 0):
+        """Menambahkan entitas (atau menimpa jika id sudah ada)."""
+        if entity_id in self._slots:
+            self.remove(entity_id)
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self._used == len(self._ids):
+                self._grow()
+            slot = self._used
+            self._used += 1
+        self._slots[entity_id] = slot
+        self._ids[slot] = entity_id
+        self._x[slot] = x
+        self._z[slot] = z
+        self._kind[slot] = kind
+        self._category[slot] = self._code(self._category_codes, category)
+        self._quality[slot] = self._code(self._quality_codes, quality)
+        self._flags[slot] = flags
+        self._active[slot] = True
+        cell = self._cell(x, z)
+        self._slot_cells[slot] = cell
+        members = self._cells.get(cell)
+        if members is None:
+            members = self._cells[cell] = set()
+        members.add(slot)
+
+    def move(self, entity_id: int, x: float, z: float) -> bool:
+        """Memperbarui posisi. Sel grid hanya disentuh jika entitas berpindah sel."""
+        slot = self._slots.get(entity_id)
+        if slot is None:
+            return False
+        self._x[slot] = x
+        self._z[slot] = z
+        cell = self._cell(x, z)
+        old_cell = self._slot_cells[slot]
+        if cell != old_cell:
+            self._discard_from_cell(old_cell, slot)
+            self._slot_cells[slot] = cell
+            members = self._cells.get(cell)
+            if members is None:
+                members = self._cells[cell] = set()
+            members.add(slot)
+        return True
+
+    def remove(self, entity_id: int) -> bool:
+        slot = self._slots.pop(entity_id, None)
+        if slot is None:
+            return False
+        self._discard_from_cell(self._slot_cells.pop(slot), slot)
+        self._active[slot] = False
+        self._free.append(slot)
+        return True
+
+    def _discard_from_cell(self, cell: Tuple[int, int], slot: int):
+        members = self._cells[cell]
+        members.discard(slot)
+        if not members:
+            del self._cells[cell]
+
+    def set_flags(self, entity_id: int, flags: int) -> bool:
+        """Menyalakan bit flag (mis. FLAG_OPENED) untuk entitas."""
+        slot = self._slots.get(entity_id)
+        if slot is None:
+            return False
+        self._flags[slot] |= flags
+        return True
+
+    def position(self, entity_id: int) -> Optional[Tuple[float, float]]:
+        slot = self._slots.get(entity_id)
+        if slot is None:
+            return None
+        return (float(self._x[slot]), float(self._z[slot]))
+
+    def clear(self):
+        self._active[:] = False
+        self._slots.clear()
+        self._slot_cells.clear()
+        self._cells.clear()
+        self._free = []
+        self._used = 0
+
+    # --- Query ---
+
+    def _candidates(self, x: float, z: float, radius: float):
+        """Slot di sel yang bersinggungan dengan kotak [x±radius, z±radius]; (slot, lengkap?)."""
+        inverse = self._inverse
+        cx0, cx1 = math.floor((x - radius) * inverse), math.floor((x + radius) * inverse)
+        cz0, cz1 = math.floor((z - radius) * inverse), math.floor((z + radius) * inverse)
+        cells = self._cells
+        if (cx1 - cx0 + 1) * (cz1 - cz0 + 1) >= len(cells):
+            # Area mencakup lebih banyak sel dari yang terisi: lebih murah memindai semua slot aktif
+            return numpy.flatnonzero(self._active[:self._used]), True
+        members = [cells[key] for key in ((cx, cz) for cx in range(cx0, cx1 + 1) for cz in range(cz0, cz1 + 1))
+                   if key in cells]
+        count = sum(len(m) for m in members)
+        return numpy.fromiter(chain.from_iterable(members), dtype=numpy.intp, count=count), False
+
+    @staticmethod
+    def _lookup(size: int, codes: Iterable[int]):
+        """Tabel boolean per kode (+1 untuk _NO_CODE); lebih murah dari numpy.isin untuk kandidat kecil."""
+        table = numpy.zeros(size + 1, dtype=bool)
+        table[[code + 1 for code in codes]] = True
+        return table
+
+    def _filter(self, slots, kinds, categories, category_prefix, qualities, exclude_flags):
+        # Satu mask gabungan untuk semua filter, lalu satu kali pengindeksan
+        mask = None
+        if kinds is not None:
+            table = numpy.zeros(256, dtype=bool)
+            table[list(kinds)] = True
+            mask = table[self._kind[slots]]
+        if categories is not None or category_prefix is not None:
+            wanted = [code for name, code in self._category_codes.items()
+                      if (categories is None or name in categories)
+                      and (category_prefix is None or name.startswith(category_prefix))]
+            selected = self._lookup(len(self._category_codes), wanted)[self._category[slots] + 1]
+            mask = selected if mask is None else mask & selected
+        if qualities is not None:
+            wanted = [self._quality_codes[name] for name in qualities if name in self._quality_codes]
+            selected = self._lookup(len(self._quality_codes), wanted)[self._quality[slots] + 1]
+            mask = selected if mask is None else mask & selected
+        if exclude_flags:
+            selected = (self._flags[slots] & exclude_flags) == 0
+            mask = selected if mask is None else mask & selected
+        return slots if mask is None else slots[mask]
+
+    def within(self, x: float, z: float, radius: float, kinds: Optional[Iterable[int]] = None,
+               categories: Optional[Iterable[str]] = None, category_prefix: Optional[str] = None,
+               qualities: Optional[Iterable[str]] = None, exclude_flags: int = 0):
+        """
+        Entitas dalam radius dari (x, z), terurut dari yang terdekat.
+        Mengembalikan (ids, jarak) sebagai array NumPy.
+        """
+        slots, _complete = self._candidates(x, z, radius)
+        slots = self._filter(slots, kinds, categories, category_prefix, qualities, exclude_flags)
+        dx = self._x[slots] - x
+        dz = self._z[slots] - z
+        d2 = dx * dx + dz * dz
+        inside = d2 <= radius * radius
+        slots, d2 = slots[inside], d2[inside]
+        order = numpy.argsort(d2, kind="stable")
+        return self._ids[slots[order]], numpy.sqrt(d2[order])
+
+    def nearest(self, x: float, z: float, k: int = 1, kinds: Optional[Iterable[int]] = None,
+                categories: Optional[Iterable[str]] = None, category_prefix: Optional[str] = None,
+                qualities: Optional[Iterable[str]] = None, exclude_flags: int = 0,
+                max_distance: Optional[float] = None):
+        """
+        k entitas terdekat yang lolos filter, terurut. Radius pencarian dimulai dari satu sel dan
+        digandakan sampai ditemukan k kandidat di dalam radius (hasil pasti benar: semua titik dalam
+        radius pasti ada di sel yang diperiksa). Mengembalikan (ids, jarak).
+        """
+        radius = self.cell_size if max_distance is None else min(self.cell_size, max_distance)
+        while True:
+            slots, complete = self._candidates(x, z, radius)
+            slots = self._filter(slots, kinds, categories, category_prefix, qualities, exclude_flags)
+            dx = self._x[slots] - x
+            dz = self._z[slots] - z
+            d2 = dx * dx + dz * dz
+            if max_distance is not None:
+                limited = d2 <= max_distance * max_distance
+                slots, d2 = slots[limited], d2[limited]
+            if not (complete or radius == max_distance):
+                inside = d2 <= radius * radius
+                if numpy.count_nonzero(inside) < k:
+                    radius = radius * 2.0 if max_distance is None else min(radius * 2.0, max_distance)
+                    continue
+                slots, d2 = slots[inside], d2[inside]
+            if len(d2) > k:
+                top = numpy.argpartition(d2, k - 1)[:k]
+                slots, d2 = slots[top], d2[top]
+            order = numpy.argsort(d2, kind="stable")
+            return self._ids[slots[order]], numpy.sqrt(d2[order])
+
+    def stats(self) -> Dict[str, int]:
+        return {"entities": len(self._slots), "cells": len(self._cells), "capacity": len(self._ids)}
@@ -0,0 +1,117 @@
+import bisect
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Bucket bounds in seconds: 1 us .. ~1000 s, four buckets per doubling (~19% resolution).
+_BUCKET_BOUNDS: List[float] = [1e-6 * 2 ** (i / 4) for i in range(4 * 30)]
+
+
+class LatencyHistogram:
+    """
+    Fixed-size log-bucketed latency histogram.
+
+    Recording is O(log buckets) and allocation free, so it can sit on the per-packet path.
+    Percentiles are reported as the upper bound of the bucket that contains them.
+    """
+
+    __slots__ = ("counts", "count", "total", "minimum", "maximum")
+
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.minimum = float("inf")
+        self.maximum = 0.0
+
+    def record(self, seconds: float):
+        if seconds < 0:
+            seconds = 0.0
+        self.counts[bisect.bisect_left(_BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.minimum:
+            self.minimum = seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+
+    def percentile(self, fraction: float) -> float:
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target and bucket_count:
+                return min(_BUCKET_BOUNDS[index] if index < len(_BUCKET_BOUNDS) else self.maximum, self.maximum)
+        return self.maximum
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class LatencyRecorder:
+    """
+    Named latency histograms, one per pipeline stage.
+
+    Typical stages: "dequeue" (capture timestamp -> consumer), "extract", "parse", "handler",
+    and "subscriber:<name>" / "ui" (capture timestamp -> delivery). Stages measured against the
+    capture timestamp use wall-clock time, since that is what the capture backends report.
+
+    Example:
+        recorder = LatencyRecorder()
+        start = time.perf_counter()
+        ...
+        recorder.record("parse", time.perf_counter() - start)
+        print(recorder.summary())
+    """
+
+    def __init__(self):
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage: str) -> LatencyHistogram:
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(stage, LatencyHistogram())
+        return histogram
+
+    def record(self, stage: str, seconds: float):
+        self.histogram(stage).record(seconds)
+
+    def record_since_capture(self, stage: str, capture_timestamp: Optional[float]):
+        """Record wall-clock time elapsed since `capture_timestamp` (ignored when it is None)."""
+        if capture_timestamp is not None:
+            self.histogram(stage).record(time.time() - capture_timestamp)
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage statistics in seconds: count, mean, p50, p90, p99, max."""
+        result = {}
+        for stage, histogram in list(self._histograms.items()):
+            result[stage] = {
+                "count": histogram.count,
+                "mean": histogram.mean,
+                "p50": histogram.percentile(0.50),
+                "p90": histogram.percentile(0.90),
+                "p99": histogram.percentile(0.99),
+                "max": histogram.maximum,
+            }
+        return result
+
+    def summary(self) -> str:
+        """Human readable table of every stage, latencies in milliseconds."""
+        snapshot = self.snapshot()
+        if not snapshot:
+            return "Belum ada data latensi."
+        width = max(len(stage) for stage in snapshot)
+        lines = [f"{'Tahap'.ljust(width)}  {'n':>8}  {'mean':>9}  {'p50':>9}  {'p90':>9}  {'p99':>9}  {'max':>9}  (ms)"]
+        for stage, stats in snapshot.items():
+            lines.append(f"{stage.ljust(width)}  {stats['count']:>8}  " + "  ".join(
+                f"{stats[key] * 1000:>9.3f}" for key in ("mean", "p50", "p90", "p99", "max")))
+        return "\n".join(lines)
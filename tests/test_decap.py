@@ -0,0 +1,99 @@
+import struct
+
+from network_scanner.decap import (DLT_EN10MB, DLT_LINUX_SLL, DLT_LINUX_SLL2, DLT_RAW, ETHERTYPE_IPV4,
+                                   ETHERTYPE_IPV6, ETHERTYPE_QINQ, ETHERTYPE_VLAN, IPV6_EXT_DEST_OPTS,
+                                   IPV6_EXT_FRAGMENT, IPV6_EXT_HOP_BY_HOP, udp_datagram, udp_payload)
+
+SRC4, DST4 = bytes([10, 0, 0, 1]), bytes([5, 188, 125, 20])
+SRC6, DST6 = bytes(15) + b"\x01", bytes(15) + b"\x02"
+PAYLOAD = b"\x00\x01\x00\x01photon"
+
+
+def udp(src_port=50000, dst_port=5056, payload=PAYLOAD) -> bytes:
+    return struct.pack("!HHHH", src_port, dst_port, 8 + len(payload), 0) + payload
+
+
+def ipv4(segment: bytes, flags_fragment: int = 0, options: bytes = b"") -> bytes:
+    ihl = 5 + len(options) // 4
+    header = struct.pack("!BBHHHBBH4s4s", 0x40 | ihl, 0, ihl * 4 + len(segment), 0, flags_fragment,
+                         64, 17, 0, SRC4, DST4)
+    return header + options + segment
+
+
+def ipv6(segment: bytes, next_header: int = 17) -> bytes:
+    return struct.pack("!IHBB16s16s", 0x60000000, len(segment), next_header, 64, SRC6, DST6) + segment
+
+
+def extension(next_header: int, body_len: int = 6) -> bytes:
+    # Hop-by-hop / destination options: panjang dalam unit 8 byte, tidak termasuk 8 byte pertama
+    return bytes([next_header, 0]) + bytes(body_len)
+
+
+def ethernet(ethertype: int, packet: bytes, vlans=()) -> bytes:
+    header = b"\x00\x11\x22\x33\x44\x55" + b"\x66\x77\x88\x99\xaa\xbb"
+    for tpid, vid in vlans:
+        header += struct.pack("!HH", tpid, vid)
+    return header + struct.pack("!H", ethertype) + packet
+
+
+def test_plain_ethernet_ipv4():
+    datagram = udp_datagram(ethernet(ETHERTYPE_IPV4, ipv4(udp())))
+    assert (datagram.src, datagram.src_port, datagram.dst, datagram.dst_port) == (SRC4, 50000, DST4, 5056)
+    assert bytes(datagram.payload) == PAYLOAD
+
+
+def test_ethernet_padding_is_trimmed():
+    frame = ethernet(ETHERTYPE_IPV4, ipv4(udp())) + b"\0" * 12
+    assert bytes(udp_payload(frame)) == PAYLOAD
+
+
+def test_vlan_and_qinq():
+    single = ethernet(ETHERTYPE_IPV4, ipv4(udp()), vlans=[(ETHERTYPE_VLAN, 42)])
+    stacked = ethernet(ETHERTYPE_IPV4, ipv4(udp()), vlans=[(ETHERTYPE_QINQ, 7), (ETHERTYPE_VLAN, 42)])
+    assert bytes(udp_payload(single)) == PAYLOAD
+    assert bytes(udp_payload(stacked)) == PAYLOAD
+
+
+def test_ipv4_options():
+    frame = ethernet(ETHERTYPE_IPV4, ipv4(udp(), options=b"\x01\x01\x01\x00"))
+    assert bytes(udp_payload(frame)) == PAYLOAD
+
+
+def test_ipv4_fragment_is_skipped():
+    assert udp_payload(ethernet(ETHERTYPE_IPV4, ipv4(udp(), flags_fragment=0x2000))) is None # MF
+    assert udp_payload(ethernet(ETHERTYPE_IPV4, ipv4(udp(), flags_fragment=0x0010))) is None # offset
+
+
+def test_ipv6_extension_headers():
+    segment = extension(IPV6_EXT_DEST_OPTS) + extension(17) + udp()
+    datagram = udp_datagram(ethernet(ETHERTYPE_IPV6, ipv6(segment, next_header=IPV6_EXT_HOP_BY_HOP)))
+    assert (datagram.src, datagram.dst, datagram.dst_port) == (SRC6, DST6, 5056)
+    assert bytes(datagram.payload) == PAYLOAD
+
+
+def test_ipv6_first_fragment_accepted_later_fragment_skipped():
+    first = bytes([17, 0]) + struct.pack("!HI", 0, 1) + udp()
+    later = bytes([17, 0]) + struct.pack("!HI", 185 << 3, 1) + udp()
+    assert bytes(udp_payload(ethernet(ETHERTYPE_IPV6, ipv6(first, IPV6_EXT_FRAGMENT)))) == PAYLOAD
+    assert udp_payload(ethernet(ETHERTYPE_IPV6, ipv6(later, IPV6_EXT_FRAGMENT))) is None
+
+
+def test_linux_sll_and_sll2():
+    sll = struct.pack("!HHH8sH", 0, 1, 6, bytes(8), ETHERTYPE_IPV4) + ipv4(udp())
+    sll2 = struct.pack("!HHIHBB8s", ETHERTYPE_IPV6, 0, 2, 1, 0, 6, bytes(8)) + ipv6(udp())
+    assert bytes(udp_payload(sll, DLT_LINUX_SLL)) == PAYLOAD
+    datagram = udp_datagram(sll2, DLT_LINUX_SLL2)
+    assert datagram.src == SRC6 and bytes(datagram.payload) == PAYLOAD
+
+
+def test_raw_ip_and_non_udp():
+    assert bytes(udp_payload(ipv4(udp()), DLT_RAW)) == PAYLOAD
+    tcp = bytearray(ipv4(udp()))
+    tcp[9] = 6
+    assert udp_payload(bytes(tcp), DLT_RAW) is None
+
+
+def test_truncated_frames():
+    frame = ethernet(ETHERTYPE_IPV4, ipv4(udp()))
+    for cut in (10, 20, 33, 41):
+        assert udp_payload(frame[:cut]) is None
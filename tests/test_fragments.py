@@ -0,0 +1,65 @@
+from network_scanner.fragments import FragmentReassembler
+
+MESSAGE = bytes(range(256)) * 3
+
+
+def fragments(message: bytes, size: int):
+    pieces = [(offset, message[offset:offset + size]) for offset in range(0, len(message), size)]
+    return [(number, offset, data, len(pieces)) for number, (offset, data) in enumerate(pieces)]
+
+
+def feed(reassembler, pieces, peer="p", start_seq=10, now=0.0):
+    results = []
+    for number, offset, data, count in pieces:
+        result = reassembler.add(peer, 0, start_seq, count, number, len(MESSAGE), offset, data, now=now)
+        if result is not None:
+            results.append(bytes(result))
+    return results
+
+
+def test_in_order():
+    reassembler = FragmentReassembler()
+    assert feed(reassembler, fragments(MESSAGE, 200)) == [MESSAGE]
+    assert len(reassembler) == 0
+
+
+def test_out_of_order():
+    reassembler = FragmentReassembler()
+    pieces = fragments(MESSAGE, 100)
+    assert feed(reassembler, pieces[::-1]) == [MESSAGE]
+    assert reassembler.completed == 1
+
+
+def test_duplicate_fragments_are_ignored():
+    reassembler = FragmentReassembler()
+    pieces = fragments(MESSAGE, 100)
+    assert feed(reassembler, [pieces[0], pieces[2], pieces[0], pieces[2]]) == []
+    assert reassembler.duplicates == 2
+    assert feed(reassembler, pieces) == [MESSAGE] # Fragmen yang sudah ada dihitung duplikat lagi
+    assert reassembler.duplicates == 4
+
+
+def test_interleaved_peers_do_not_mix():
+    reassembler = FragmentReassembler()
+    other = bytes(reversed(MESSAGE))
+    a, b = fragments(MESSAGE, 300), fragments(other, 300)
+    results = []
+    for piece_a, piece_b in zip(a, b):
+        results += feed(reassembler, [piece_a], peer="a")
+        results += feed(reassembler, [piece_b], peer="b")
+    assert results == [MESSAGE, other]
+
+
+def test_incomplete_message_expires():
+    reassembler = FragmentReassembler(timeout=5.0)
+    pieces = fragments(MESSAGE, 100)
+    feed(reassembler, pieces[:2], now=0.0)
+    assert len(reassembler) == 1
+    feed(reassembler, pieces[:1], start_seq=99, now=10.0)
+    assert reassembler.evicted_timeout == 1
+
+
+def test_fragment_past_total_length_rejected():
+    reassembler = FragmentReassembler()
+    assert reassembler.add("p", 0, 1, 2, 1, 100, 90, b"x" * 20, now=0.0) is None
+    assert reassembler.rejected == 1
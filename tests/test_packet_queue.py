@@ -0,0 +1,58 @@
+import pytest
+
+from network_scanner.packet_queue import (DROP_ACKS_FIRST, DROP_OLDEST, KIND_ACK, KIND_EVENT, KIND_OTHER,
+                                          NEVER_DROP_EVENTS, PacketQueue)
+
+
+def fill(queue, items):
+    return [queue.put(item, kind) for item, kind in items]
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        PacketQueue(4, "drop-newest")
+
+
+def test_drop_oldest():
+    queue = PacketQueue(3, DROP_OLDEST)
+    fill(queue, [("e1", KIND_EVENT), ("a1", KIND_ACK), ("o1", KIND_OTHER), ("e2", KIND_EVENT)])
+    assert queue.get_batch(10, timeout=0) == ["a1", "o1", "e2"]
+    assert queue.dropped[KIND_EVENT] == 1
+
+
+def test_drop_acks_first():
+    queue = PacketQueue(3, DROP_ACKS_FIRST)
+    fill(queue, [("e1", KIND_EVENT), ("a1", KIND_ACK), ("o1", KIND_OTHER), ("e2", KIND_EVENT)])
+    assert queue.get_batch(10, timeout=0) == ["e1", "o1", "e2"]
+    # Tanpa ACK tersisa, kembali membuang yang tertua
+    fill(queue, [("e3", KIND_EVENT), ("o2", KIND_OTHER), ("e4", KIND_EVENT), ("e5", KIND_EVENT)])
+    assert queue.get_batch(10, timeout=0) == ["o2", "e4", "e5"]
+    assert queue.stats()["dropped_acks"] == 1 and queue.stats()["dropped_events"] == 1
+
+
+def test_never_drop_events():
+    queue = PacketQueue(3, NEVER_DROP_EVENTS)
+    fill(queue, [("o1", KIND_OTHER), ("a1", KIND_ACK), ("e1", KIND_EVENT)])
+    assert queue.put("e2", KIND_EVENT) # Membuang ACK
+    assert queue.put("e3", KIND_EVENT) # Membuang paket lain
+    assert queue.put("e4", KIND_EVENT) # Tidak ada yang bisa dibuang: overflow
+    assert not queue.put("a2", KIND_ACK) # Non-event yang datang saat penuh dibuang sendiri
+    assert queue.get_batch(10, timeout=0) == ["e1", "e2", "e3", "e4"]
+    stats = queue.stats()
+    assert stats["overflow"] == 1 and stats["dropped_events"] == 0
+    assert stats["dropped_acks"] == 2 and stats["dropped_other"] == 1
+
+
+def test_batch_keeps_capture_order_across_kinds():
+    queue = PacketQueue(10)
+    items = [("o1", KIND_OTHER), ("e1", KIND_EVENT), ("a1", KIND_ACK), ("e2", KIND_EVENT), ("o2", KIND_OTHER)]
+    fill(queue, items)
+    assert queue.get_batch(2, timeout=0) == ["o1", "e1"]
+    assert queue.get_batch(10, timeout=0) == ["a1", "e2", "o2"]
+
+
+def test_closed_queue():
+    queue = PacketQueue(4)
+    queue.close()
+    assert not queue.put("e1", KIND_EVENT)
+    assert queue.get_batch(10, timeout=None) == []
@@ -0,0 +1,69 @@
+from network_scanner.pipeline import ReorderBuffer
+
+
+def test_in_order_results_pass_through():
+    buffer = ReorderBuffer(timeout=1.0)
+    for seq in (2, 0, 1):
+        buffer.add(seq, seq)
+    assert list(buffer.ready()) == [0, 1, 2]
+    assert len(buffer) == 0 and buffer.skipped == 0
+
+
+def test_stall_skips_gap_after_timeout():
+    buffer = ReorderBuffer(timeout=1.0)
+    for seq in (0, 2, 3):
+        buffer.add(seq, seq)
+    assert list(buffer.ready()) == [0]
+    assert buffer.check_stall(10.0) == 0 # Awal tertahan
+    assert buffer.check_stall(10.5) == 0
+    assert list(buffer.ready()) == []
+    assert buffer.check_stall(11.5) == 1
+    assert list(buffer.ready()) == [2, 3]
+    assert buffer.skipped == 1 and buffer.next_seq == 4
+
+
+def test_steady_progress_only_skips_the_real_gap():
+    # Dua worker (seq genap/ganjil); worker ganjil selalu tertinggal satu batch sehingga buffer
+    # tidak pernah kosong. Hanya seq 1001 yang benar-benar hilang.
+    buffer = ReorderBuffer(timeout=1.0)
+    missing, total, batch = 1001, 2048, 64
+    now, delivered = 0.0, []
+    evens = [seq for seq in range(0, total, 2)]
+    odds = [seq for seq in range(1, total, 2) if seq != missing]
+    for i in range(0, len(evens) + batch, batch):
+        arrived = evens[i:i + batch] + odds[max(i - batch, 0):i]
+        for seq in arrived:
+            buffer.add(seq, seq)
+        delivered += buffer.ready()
+        buffer.check_stall(now)
+        now += 0.2
+    for _ in range(10):
+        delivered += buffer.ready()
+        buffer.check_stall(now)
+        now += 0.2
+    delivered += buffer.drain()
+    assert buffer.skipped == 1 and buffer.late == 0
+    assert delivered == [seq for seq in range(total) if seq != missing]
+
+
+def test_late_result_is_dropped_and_cursor_never_moves_back():
+    buffer = ReorderBuffer(timeout=0.0)
+    buffer.add(0, 0)
+    buffer.add(3, 3)
+    list(buffer.ready())
+    buffer.check_stall(0.0)
+    buffer.check_stall(1.0)
+    assert list(buffer.ready()) == [3]
+    assert not buffer.add(1, 1)
+    assert not buffer.add(3, 3)
+    assert buffer.late == 2 and buffer.next_seq == 4
+    buffer.add(4, 4)
+    assert list(buffer.ready()) == [4]
+
+
+def test_drain_skips_remaining_gaps():
+    buffer = ReorderBuffer()
+    for seq in (5, 1, 3):
+        buffer.add(seq, seq)
+    assert list(buffer.drain()) == [1, 3, 5]
+    assert buffer.skipped == 3 and buffer.next_seq == 6
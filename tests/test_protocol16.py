@@ -0,0 +1,146 @@
+import struct
+
+import pytest
+
+from scanner import protocol16 as p16
+from scanner.protocol16 import (MSG_EVENT_DATA, MSG_OPERATION_RESPONSE, NUMPY_MIN_ELEMENTS, EventData,
+                                LazyParameterTable, OperationResponse, Protocol16Error, decode_message,
+                                decode_parameter_table)
+
+
+# --- Encoder kecil untuk membangun pesan uji ---
+
+def string(value: str) -> bytes:
+    data = value.encode("utf-8")
+    return bytes([p16.TYPE_STRING]) + struct.pack(">H", len(data)) + data
+
+
+def integer(value: int) -> bytes:
+    return bytes([p16.TYPE_INTEGER]) + struct.pack(">i", value)
+
+
+def typed_array(element_type: int, fmt: str, values) -> bytes:
+    return bytes([p16.TYPE_ARRAY]) + struct.pack(">HB", len(values), element_type) + \
+        struct.pack(f">{len(values)}{fmt}", *values)
+
+
+def integer_array(values) -> bytes:
+    return bytes([p16.TYPE_INTEGER_ARRAY]) + struct.pack(f">i{len(values)}i", len(values), *values)
+
+
+def hashtable(items) -> bytes:
+    return bytes([p16.TYPE_HASHTABLE]) + struct.pack(">H", len(items)) + b"".join(k + v for k, v in items)
+
+
+def parameter_table(parameters: dict) -> bytes:
+    return struct.pack(">H", len(parameters)) + b"".join(bytes([key]) + value for key, value in parameters.items())
+
+
+def event(code: int, parameters: dict) -> bytes:
+    return bytes([MSG_EVENT_DATA, code]) + parameter_table(parameters)
+
+
+def as_list(value):
+    return value.tolist() if hasattr(value, "tolist") else value
+
+
+def test_event_round_trip():
+    body = event(23, {0: integer(7), 1: string("T4_CHEST"), 2: typed_array(p16.TYPE_FLOAT, "f", [1.5, -2.0]),
+                      5: bytes([p16.TYPE_NULL])})
+    message = decode_message(body)
+    assert isinstance(message, EventData) and message.code == 23
+    assert message.parameters == {0: 7, 1: "T4_CHEST", 2: [1.5, -2.0], 5: None}
+
+
+def test_operation_response_round_trip():
+    body = bytes([MSG_OPERATION_RESPONSE, 2]) + struct.pack(">h", -1) + string("gagal") + \
+        struct.pack(">H", 1) + bytes([0]) + integer(3)
+    message = decode_message(body)
+    assert isinstance(message, OperationResponse)
+    assert (message.op_code, message.return_code, message.debug_message) == (2, -1, "gagal")
+    assert message.parameters == {0: 3}
+
+
+def test_truncated_message_raises():
+    body = event(1, {0: typed_array(p16.TYPE_INTEGER, "i", [1, 2, 3])})
+    with pytest.raises(Protocol16Error):
+        decode_message(body[:-2])
+
+
+def test_non_strict_table_keeps_complete_parameters():
+    table = parameter_table({0: integer(1), 1: string("ok"), 2: typed_array(p16.TYPE_INTEGER, "i", [1, 2])})
+    parameters, _ = decode_parameter_table(table[:-2], strict=False)
+    assert parameters == {0: 1, 1: "ok"}
+
+
+@pytest.mark.parametrize("key", [
+    hashtable([(integer(1), string("a"))]), # kunci berupa dict
+    bytes([p16.TYPE_OBJECT_ARRAY]) + struct.pack(">H", 2) + typed_array(p16.TYPE_INTEGER, "i", [1, 2]) + integer(3),
+    typed_array(p16.TYPE_INTEGER, "i", list(range(p16.NUMPY_MIN_ELEMENTS))), # ndarray jika numpy ada
+], ids=["dict", "nested-list", "large-array"])
+def test_collection_keys_are_hashable(key):
+    table = parameter_table({0: hashtable([(key, integer(5)), (integer(2), integer(6))])})
+    for parameters in (decode_parameter_table(table)[0], decode_parameter_table(table, strict=False)[0]):
+        (converted, value), extra = parameters[0].items()
+        assert hash(converted) is not None and value == 5 and extra == (2, 6)
+    assert decode_message(bytes([MSG_EVENT_DATA, 1]) + table).parameters[0][2] == 6
+
+
+def test_lazy_decodes_on_access_and_matches_strict():
+    body = event(23, {0: integer(7), 1: string("T4_CHEST"), 2: typed_array(p16.TYPE_FLOAT, "f", [1.5, -2.0]),
+                      3: hashtable([(integer(1), string("a"))]), 5: bytes([p16.TYPE_NULL])})
+    lazy = decode_message(body, lazy=True).parameters
+    assert isinstance(lazy, LazyParameterTable)
+    assert lazy.decoded_count == 0
+    assert lazy[1] == "T4_CHEST"
+    assert lazy.decoded_count == 1
+    assert 4 not in lazy and lazy.get(4) is None
+    assert lazy.to_dict() == decode_message(body).parameters
+
+
+def test_lazy_truncated_message_raises():
+    body = event(1, {0: typed_array(p16.TYPE_INTEGER, "i", [1, 2, 3])})
+    with pytest.raises(Protocol16Error):
+        decode_message(body[:-2], lazy=True)
+
+
+@pytest.mark.parametrize("count", [0, 1])
+def test_unknown_array_element_type_rejected_by_both_decoders(count):
+    bad = bytes([p16.TYPE_ARRAY]) + struct.pack(">HB", count, 200) + b"\0" * 8
+    body = event(1, {0: integer(1), 1: bad})
+    with pytest.raises(Protocol16Error):
+        decode_message(body)
+    with pytest.raises(Protocol16Error):
+        decode_message(body, lazy=True)
+
+
+def test_unknown_dictionary_value_type_rejected_by_both_decoders():
+    bad = bytes([p16.TYPE_DICTIONARY, p16.TYPE_INTEGER, 200]) + struct.pack(">H", 0)
+    body = event(1, {0: bad})
+    with pytest.raises(Protocol16Error):
+        decode_message(body)
+    with pytest.raises(Protocol16Error):
+        decode_message(body, lazy=True)
+
+
+@pytest.mark.parametrize("count", [1, NUMPY_MIN_ELEMENTS - 1, NUMPY_MIN_ELEMENTS, NUMPY_MIN_ELEMENTS * 4])
+@pytest.mark.parametrize("element_type,fmt", [(p16.TYPE_INTEGER, "i"), (p16.TYPE_FLOAT, "f"),
+                                              (p16.TYPE_SHORT, "h"), (p16.TYPE_LONG, "q")])
+def test_typed_arrays_around_numpy_threshold(count, element_type, fmt):
+    values = [(-1) ** i * i for i in range(count)]
+    body = event(1, {3: typed_array(element_type, fmt, values), 4: integer(9)})
+    strict = decode_message(body).parameters
+    lazy = decode_message(body, lazy=True).parameters
+    assert as_list(strict[3]) == values
+    assert as_list(lazy[3]) == values
+    assert lazy[4] == strict[4] == 9
+    if count < NUMPY_MIN_ELEMENTS:
+        assert isinstance(strict[3], list)
+
+
+@pytest.mark.parametrize("count", [3, NUMPY_MIN_ELEMENTS + 10])
+def test_integer_array_around_numpy_threshold(count):
+    values = list(range(-count // 2, count - count // 2))
+    body = event(1, {0: integer_array(values)})
+    assert as_list(decode_message(body).parameters[0]) == values
+    assert as_list(decode_message(body, lazy=True).parameters[0]) == values
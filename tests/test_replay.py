@@ -0,0 +1,47 @@
+import struct
+
+from network_scanner.replay import PcapReplay
+
+# Satu command reliable (tipe 6) berisi EventData kode 1 tanpa parameter
+EVENT_MESSAGE = b"\xf3\x04\x01\x00\x00"
+COMMAND = struct.pack(">BBBBII", 6, 0, 1, 0, 12 + len(EVENT_MESSAGE), 1) + EVENT_MESSAGE
+
+
+def photon_payload(reliable_seq: int) -> bytes:
+    command = COMMAND[:8] + struct.pack(">I", reliable_seq) + COMMAND[12:]
+    return struct.pack(">HBBII", 1, 0, 1, 0, 0) + command
+
+
+def udp_frame(payload: bytes) -> bytes:
+    udp = struct.pack("!HHHH", 5056, 50000, 8 + len(payload), 0) + payload
+    ip = struct.pack("!BBHHHBBH4s4s", 0x45, 0, 20 + len(udp), 0, 0, 64, 17, 0,
+                     bytes([5, 188, 125, 20]), bytes([10, 0, 0, 1]))
+    return b"\0" * 12 + b"\x08\x00" + ip + udp
+
+
+def write_pcap(path, frames):
+    with open(path, "wb") as f:
+        f.write(struct.pack("<IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, 65535, 1))
+        for i, frame in enumerate(frames):
+            f.write(struct.pack("<IIII", 1000 + i, 0, len(frame), len(frame)) + frame)
+
+
+def test_decode_only_by_default_and_commands_timed_separately(tmp_path):
+    path = tmp_path / "sesi.pcap"
+    write_pcap(path, [udp_frame(photon_payload(seq)) for seq in (1, 2, 2, 3)])
+    stats = PcapReplay([str(path)]).run()
+    assert (stats.packets, stats.events, stats.retransmits) == (4, 3, 1)
+    assert stats.commands == 0 and stats.extract_elapsed == 0.0
+
+    stats = PcapReplay([str(path)], extract_commands=True).run()
+    assert (stats.events, stats.retransmits) == (3, 1) # State jalur decode tidak tercampur
+    assert stats.commands == 4 and stats.extract_elapsed > 0.0 # Kiriman ulang tetap dicatat sebagai command
+
+
+def test_replay_object_can_be_reused_after_stop(tmp_path):
+    path = tmp_path / "sesi.pcap"
+    write_pcap(path, [udp_frame(photon_payload(seq)) for seq in (1, 2, 3)])
+    replay = PcapReplay([str(path)])
+    replay.stop()
+    assert replay.run().events == 3
+    assert replay.run().events == 3 # Sequence tracker baru per run: tidak dianggap kiriman ulang
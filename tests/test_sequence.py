@@ -0,0 +1,74 @@
+from network_scanner.sequence import ReliableSequenceTracker, connection_key
+from network_scanner.decap import UdpDatagram
+
+
+def test_retransmit_and_reorder():
+    tracker = ReliableSequenceTracker(window=64)
+    assert [tracker.accept("p", 0, seq) for seq in (1, 2, 4, 3, 3, 2)] == [True, True, True, True, False, False]
+    assert tracker.duplicates == 2
+    assert tracker.reordered == 1
+    assert tracker.lost == 0
+
+
+def test_channels_are_independent():
+    tracker = ReliableSequenceTracker()
+    assert tracker.accept("p", 0, 5)
+    assert tracker.accept("p", 1, 5)
+    assert not tracker.accept("p", 0, 5)
+
+
+def test_loss_counted_when_gap_leaves_window():
+    tracker = ReliableSequenceTracker(window=8)
+    tracker.accept("p", 0, 1)
+    tracker.accept("p", 0, 3) # 2 belum terlihat, masih di dalam jendela
+    assert tracker.lost == 0 and tracker.pending_gaps() == 1
+    tracker.accept("p", 0, 11)
+    assert tracker.lost == 1
+
+
+def test_huge_forward_jump_is_bounded():
+    tracker = ReliableSequenceTracker(window=1024)
+    tracker.accept("p", 0, 1)
+    assert tracker.accept("p", 0, 0x7FFFFFF0) # Selesai seketika, tanpa bitmask raksasa
+    assert tracker.lost == 0
+    assert tracker.resets == 1
+    assert not tracker.accept("p", 0, 0x7FFFFFF0)
+
+
+def test_forward_jump_beyond_window_counts_at_most_window():
+    tracker = ReliableSequenceTracker(window=16, max_jump=10000)
+    tracker.accept("p", 0, 1)
+    tracker.accept("p", 0, 3)
+    tracker.accept("p", 0, 5000)
+    assert tracker.lost <= 16
+    assert tracker.accept("p", 0, 4999)
+
+
+def test_wrap_to_start_is_a_new_stream():
+    tracker = ReliableSequenceTracker(window=1024)
+    for seq in range(0x7FFFFF00, 0x7FFFFFFF):
+        tracker.accept("p", 0, seq)
+    assert tracker.accept("p", 0, 1)
+    assert tracker.accept("p", 0, 2)
+    assert tracker.resets == 1
+    assert tracker.lost == 0
+
+
+def test_reconnect_below_window_is_not_dropped():
+    tracker = ReliableSequenceTracker(window=1024)
+    for seq in range(1, 301):
+        tracker.accept("p", 0, seq)
+    assert [tracker.accept("p", 0, seq) for seq in range(1, 6)] == [True] * 5
+    assert tracker.resets == 1
+    assert not tracker.accept("p", 0, 3)
+
+
+def test_connection_key_separates_client_ports():
+    server = b"\x05\x05\x05\x05"
+    first = UdpDatagram(server, 5056, b"\x0a\x00\x00\x01", 50000, memoryview(b""))
+    second = UdpDatagram(server, 5056, b"\x0a\x00\x00\x01", 50001, memoryview(b""))
+    tracker = ReliableSequenceTracker()
+    for seq in range(1, 50):
+        tracker.accept(connection_key(first), 0, seq)
+    assert tracker.accept(connection_key(second), 0, 1)
+    assert len(tracker) == 2